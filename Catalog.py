@@ -0,0 +1,177 @@
+"""Process-wide access to the course data."""
+
+import threading
+
+from instrumentation import stage
+
+DEFAULT_PATH = "courses.catalog"
+
+class Catalog:
+    def __init__(self, path=DEFAULT_PATH):
+        """The course dataframe, loaded once and shared by everything in the process.
+
+        The dataframe is loaded lazily the first time it is needed, and then kept until
+        reload() is called or another dataframe is given with set_dataframe(). Indexes
+        made from the dataframe are kept in the catalog as well, see derived().
+
+        When the data is in a catalog file, the file is opened first, and quick lookups
+        can be answered from it through column(), row() and derived(), without importing
+        pandas or making the dataframe at all.
+
+        :param path: Path to a catalog file with course data, see CatalogFile, or to a
+                     pickled pandas.DataFrame if it ends with '.pkl'.
+        """
+        self.path = path
+        self._file = None
+        self._df = None
+        self._derived = {}
+        self._lock = threading.RLock()
+
+    @property
+    def df(self):
+        """The pandas.DataFrame with course data. Loads it, if it hasn't already been done."""
+
+        if self._df is None:
+            with self._lock:
+                if self._df is None:
+                    if self.file is not None:
+                        self._df = self._dataframe(self._file)
+                    else:
+                        self.load()
+
+        return self._df
+
+    @property
+    def file(self):
+        """The CatalogFile the data is read from, opened if needed.
+
+        None if the data is from a pickle, or was given with set_dataframe().
+        """
+        if self._file is None and self._df is None and not self.path.endswith('.pkl'):
+            with self._lock:
+                if self._file is None and self._df is None:
+                    self.open()
+
+        return self._file
+
+    @property
+    def is_loaded(self):
+        """True if a dataframe has been loaded or set."""
+        return self._df is not None
+
+    @staticmethod
+    @stage()
+    def _dataframe(catalog_file):
+        course_df = catalog_file.to_dataframe()
+        course_df.set_index('coursecode', drop=False, inplace=True)
+        return course_df
+
+    @stage()
+    def open(self, path=None):
+        """Opens a catalog file, replacing whatever was there before, without making the dataframe.
+
+        The graph of the precursors, and the index of the courses that have each course as
+        a precursor, are used from the file instead of being made again.
+
+        :param path: Path to catalog file. Uses the path of the catalog by default.
+
+        :return: CatalogFile instance.
+        """
+        from CatalogFile import CatalogFile
+
+        with self._lock:
+            if path is not None:
+                self.path = path
+
+            catalog_file = CatalogFile(self.path)
+            self._df = None
+            self._file = catalog_file
+            self._derived = {'graph': catalog_file.graph(), 'dependents': catalog_file.dependents()}
+
+        return catalog_file
+
+    @stage()
+    def load(self, path=None):
+        """Loads the dataframe from file, replacing whatever was there before.
+
+        The dataframe is indexed by course code, but keeps the coursecode column.
+
+        :param path: Path to catalog file or pickled dataframe. Uses the path of the catalog by default.
+
+        :return: pandas.DataFrame instance with data.
+        """
+        with self._lock:
+            if path is not None:
+                self.path = path
+
+            if self.path.endswith('.pkl'):
+                import pandas as pd
+                course_df = pd.read_pickle(self.path)
+                course_df.set_index('coursecode', drop=False, inplace=True)
+                self.set_dataframe(course_df)
+            else:
+                self._df = self._dataframe(self.open())
+
+        return self._df
+
+    def reload(self):
+        """Loads the dataframe from the catalog path again, dropping everything derived from it.
+
+        :return: pandas.DataFrame instance with data.
+        """
+        return self.load()
+
+    def set_dataframe(self, course_df):
+        """Use an already loaded dataframe, instead of reading it from file.
+
+        :param course_df: pandas.DataFrame instance with data.
+        """
+        with self._lock:
+            self._df = course_df
+            self._file = None
+            self._derived = {}
+
+    def column(self, name):
+        """The values in a column of the data, from the file if the dataframe isn't made.
+
+        :param name: String name of column.
+
+        :return: Sequence with a value for each row.
+        """
+        if self._df is None and self.file is not None:
+            return self._file.column(name)
+        return self.df[name].values
+
+    def row(self, position):
+        """A row of the data, from the file if the dataframe isn't made.
+
+        :param position: Int position of row.
+
+        :return: Dict or pandas.Series, with the columns of the row.
+        """
+        if self._df is None and self.file is not None:
+            return self._file.row(position)
+        return self.df.iloc[position]
+
+    def derived(self, name, builder):
+        """Gets something made from the data, making it only the first time it is asked for.
+
+        Whatever is made is dropped when the data is reloaded or replaced.
+
+        :param name: String key identifying what is made.
+        :param builder: Callable taking the dataframe and returning what is to be stored.
+                        When the data is in a catalog file and the dataframe isn't made yet,
+                        it is given None instead, and should read the data through column()
+                        and row().
+
+        :return: Whatever builder returned.
+        """
+        course_df = self._df if self.file is not None else self.df
+        if name not in self._derived:
+            with self._lock:
+                if name not in self._derived:
+                    self._derived[name] = builder(course_df)
+
+        return self._derived[name]
+
+catalog = Catalog()
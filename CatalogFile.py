@@ -0,0 +1,258 @@
+"""Columnar file format for the course data, that is memory mapped instead of unpickled.
+
+A catalog file is a small header, a JSON manifest, and then a number of sections, each a
+flat array of integers or bytes:
+    strings.offsets, strings.data: Every distinct string in the data, as UTF-8. The first
+        strings are the course codes, in the order of the ids of CourseGraph.
+    coursecode, coursename, faculty, institute: One string id for each row.
+    <kind>.group_offsets, <kind>.member_offsets, <kind>.members: The arrays of the
+        CourseGraph.Requirements of each kind, ready to be used as they are.
+    dependents.offsets, dependents.rows, dependents.kinds: For each course id, the rows
+        that have it as a precursor, and whether it is obligatory (bit 1) and recommended
+        (bit 2) there. See Dependents.
+
+Convert the pickled dataframe with 'python CatalogFile.py [courses.pkl] [courses.catalog]'.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+
+from CourseGraph import CourseGraph, Requirements, KINDS
+
+DEFAULT_PATH = "courses.catalog"
+MAGIC = b"COURSES\0"
+VERSION = 2
+COLUMNS = ("coursecode", "coursename", "faculty", "institute")
+REQUIREMENT_ARRAYS = ("group_offsets", "member_offsets", "members")
+
+# Magic bytes, version and length of the manifest
+HEADER = struct.Struct("<8sII")
+ALIGNMENT = 8
+
+def aligned(position):
+    return -(-position // ALIGNMENT) * ALIGNMENT
+
+class Dependents(Mapping):
+    def __init__(self, ids, offsets, rows, kinds):
+        """Index from course codes to the rows that have them as precursors, read from a catalog file.
+
+        Looks like the dict made by search.make_dependents_index(), but nothing is made
+        until a course is looked up.
+
+        :param ids: Dict from course code to id.
+        :param offsets: Sequence of ints, where the entries for course id i are offsets[i]
+                        up to offsets[i+1] in rows and kinds.
+        :param rows: Sequence of row positions.
+        :param kinds: Sequence of ints, with bit 1 set if the course is an obligatory
+                      precursor in the row, and bit 2 if it is a recommended one.
+        """
+        self._ids = ids
+        self._offsets = offsets
+        self._rows = rows
+        self._kinds = kinds
+
+    def __getitem__(self, code):
+        """List of 3-tuples with row position, and whether code is an obligatory and a recommended precursor."""
+        course_id = self._ids[code]
+        start, end = self._offsets[course_id], self._offsets[course_id + 1]
+        if start == end:
+            raise KeyError(code)
+        return [(position, bool(kinds & 1), bool(kinds & 2))
+                for position, kinds in zip(self._rows[start:end], self._kinds[start:end])]
+
+    def __iter__(self):
+        return (code for code, course_id in self._ids.items()
+                if self._offsets[course_id] != self._offsets[course_id + 1])
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+class CatalogFile:
+    def __init__(self, path=DEFAULT_PATH):
+        """The course data in a catalog file, read straight from the memory mapped file.
+
+        Nothing is read until it is used, and then only the parts that are needed.
+
+        :param path: Path to catalog file.
+
+        :raise ValueError: If the file isn't a catalog file, or has a version or byte order
+                           this version of the code can't read.
+        """
+        self.path = path
+        with open(path, "rb") as catalog_file:
+            self._map = mmap.mmap(catalog_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, manifest_length = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"'{path}' is not a catalog file.")
+        if version != VERSION:
+            raise ValueError(f"'{path}' is a version {version} catalog file, "
+                             f"but only version {VERSION} can be read. Convert it again.")
+
+        self.manifest = json.loads(self._map[HEADER.size:HEADER.size + manifest_length])
+        if self.manifest["byteorder"] != sys.byteorder:
+            raise ValueError(f"'{path}' was written on a {self.manifest['byteorder']} endian machine.")
+
+        self.rows = self.manifest["rows"]
+        self.num_codes = self.manifest["codes"]
+        self.num_known = self.manifest["known"]
+
+        data = memoryview(self._map)[aligned(HEADER.size + manifest_length):]
+        self._sections = {name: data[offset:offset + length].cast(typecode)
+                          for name, (offset, length, typecode) in self.manifest["sections"].items()}
+        self._strings = [None] * (len(self._sections["strings.offsets"]) - 1)
+        self._rows = {}
+        self._graph = None
+
+    def string(self, string_id):
+        """The string with some id, decoded the first time it is asked for."""
+        string = self._strings[string_id]
+        if string is None:
+            offsets = self._sections["strings.offsets"]
+            string = str(self._sections["strings.data"][offsets[string_id]:offsets[string_id + 1]], "utf-8")
+            self._strings[string_id] = string
+        return string
+
+    @property
+    def codes(self):
+        """List of all course codes, where the index is the id of the course in graph()."""
+        return [self.string(code_id) for code_id in range(self.num_codes)]
+
+    def column(self, name):
+        """List with the value of a column in every row.
+
+        :param name: One of COLUMNS or KINDS.
+
+        :return: List of strings, or for KINDS, nested lists as described in
+                 CourseGraph.nested_list(), or "" if there are no requirements.
+        """
+        if name in KINDS:
+            graph = self.graph()
+            return [graph.nested_list(code_id, name) or "" for code_id in self._sections["coursecode"]]
+        return [self.string(string_id) for string_id in self._sections[name]]
+
+    def row(self, position):
+        """Dict with the value of every column in a row, like a row of to_dataframe().
+
+        Made the first time it is asked for, and then shared, so it must not be changed.
+
+        :param position: Int position of row.
+
+        :return: Dict from column name to value.
+        """
+        row = self._rows.get(position)
+        if row is None:
+            row = {column: self.string(self._sections[column][position]) for column in COLUMNS}
+            for kind in KINDS:
+                row[kind] = self.graph().nested_list(self._sections["coursecode"][position], kind) or ""
+            self._rows[position] = row
+        return row
+
+    def graph(self):
+        """The CourseGraph of the data, using the arrays in the file as they are.
+
+        :return: CourseGraph instance.
+        """
+        if self._graph is None:
+            known = [True] * self.num_known + [False] * (self.num_codes - self.num_known)
+            requirements = [Requirements(*[self._sections[f"{kind}.{name}"] for name in REQUIREMENT_ARRAYS])
+                            for kind in KINDS]
+            self._graph = CourseGraph(self.codes, known, *requirements)
+        return self._graph
+
+    def dependents(self):
+        """Dependents index of the data, using the arrays in the file as they are.
+
+        :return: Dependents instance.
+        """
+        sections = [self._sections[f"dependents.{name}"] for name in ("offsets", "rows", "kinds")]
+        return Dependents(self.graph().ids, *sections)
+
+    def to_dataframe(self):
+        """Makes a dataframe like the one in courses.pkl.
+
+        :return: pandas.DataFrame instance, with columns COLUMNS and KINDS. The requirements
+                 are nested lists, or "" if there are none.
+        """
+        import pandas as pd
+
+        return pd.DataFrame({column: self.column(column) for column in COLUMNS + KINDS}, dtype=object)
+
+def write_catalog(course_df, path=DEFAULT_PATH):
+    """Writes course data to a catalog file.
+
+    If a course code is in several rows, the requirements of the first one are used for
+    all of them, like in CourseGraph.
+
+    :param course_df: pandas.DataFrame instance with columns COLUMNS and KINDS.
+    :param path: Path to write to. Replaced in one go, so readers never see half a file.
+    """
+    graph = CourseGraph.from_dataframe(course_df)
+    strings, string_ids = list(graph.codes), dict(graph.ids)
+
+    def string_id(string):
+        if string not in string_ids:
+            string_ids[string] = len(strings)
+            strings.append(string)
+        return string_ids[string]
+
+    sections = {}
+    for column in COLUMNS:
+        sections[column] = array("i", [string_id(value) for value in course_df[column].values])
+    for kind in KINDS:
+        requirements = graph.requirements[kind]
+        for name in REQUIREMENT_ARRAYS:
+            sections[f"{kind}.{name}"] = array("i", getattr(requirements, name))
+
+    # Rows are gone through in order, so every course gets its rows in increasing order
+    row_kinds = [{} for _ in range(len(graph))]
+    for position, code_id in enumerate(sections["coursecode"]):
+        for bit, kind in ((1, "obligatory"), (2, "recommended")):
+            for precursor in graph.requirements[kind].precursors(code_id):
+                row_kinds[precursor][position] = row_kinds[precursor].get(position, 0) | bit
+    offsets, rows, kinds = array("i", [0]), array("i"), array("B")
+    for dependents in row_kinds:
+        rows.extend(dependents.keys())
+        kinds.extend(dependents.values())
+        offsets.append(len(rows))
+    sections.update({"dependents.offsets": offsets, "dependents.rows": rows, "dependents.kinds": kinds})
+
+    encoded = [string.encode() for string in strings]
+    offsets = array("i", [0])
+    for string in encoded:
+        offsets.append(offsets[-1] + len(string))
+    sections["strings.offsets"] = offsets
+    sections["strings.data"] = array("B", b"".join(encoded))
+
+    layout, position = {}, 0
+    for name, section in sections.items():
+        layout[name] = [position, len(section) * section.itemsize, section.typecode]
+        position = aligned(position + len(section) * section.itemsize)
+
+    manifest = json.dumps({
+        "version": VERSION, "byteorder": sys.byteorder, "rows": len(course_df.index),
+        "codes": len(graph), "known": sum(graph.known), "sections": layout,
+    }).encode()
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as catalog_file:
+        catalog_file.write(HEADER.pack(MAGIC, VERSION, len(manifest)) + manifest)
+        catalog_file.write(bytes(aligned(HEADER.size + len(manifest)) - HEADER.size - len(manifest)))
+        for name, section in sections.items():
+            catalog_file.write(section.tobytes())
+            catalog_file.write(bytes(aligned(catalog_file.tell()) - catalog_file.tell()))
+    os.replace(temporary_path, path)
+
+if __name__ == '__main__':
+    import pandas as pd
+
+    pickle_path = sys.argv[1] if len(sys.argv) > 1 else "courses.pkl"
+    catalog_path = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_PATH
+
+    write_catalog(pd.read_pickle(pickle_path), catalog_path)
+    print(f"Converted '{pickle_path}' to '{catalog_path}'.")
@@ -0,0 +1,90 @@
+"""Append-only file of finished work, so an interrupted scrape can go on where it stopped."""
+
+import json
+import os
+import threading
+
+# Records to write between each time the file is forced to disk
+SYNC_EVERY = 64
+
+class Checkpoint:
+    def __init__(self, path, sync_every=SYNC_EVERY):
+        """Results by key, appended to a file of JSON lines as soon as they are added.
+
+        Results already in the file are read when it is opened. A last line that was only
+        half written, because the process was killed while writing it, is cut off, and
+        that result is done again.
+
+        :param path: Path to checkpoint file. Made if it doesn't exist.
+        :param sync_every: How many results to add between each time the file is synced
+                           to disk. Results are flushed to the operating system right
+                           away either way, so only a crash of the machine can lose them.
+        """
+        self.path = path
+        self.sync_every = sync_every
+        self._results = {}
+        self._lock = threading.Lock()
+        self._unsynced = 0
+
+        good_length = 0
+        if os.path.exists(path):
+            with open(path, "rb") as checkpoint_file:
+                for line in checkpoint_file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self._results[record["key"]] = record["result"]
+                    good_length += len(line)
+            if good_length != os.path.getsize(path):
+                os.truncate(path, good_length)
+
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, key):
+        return key in self._results
+
+    def get(self, key, default=None):
+        """The result added with a key, in this run or an earlier one.
+
+        :param key: String key.
+        :param default: What to return if there is no result with the key.
+
+        :return: The result, as it comes back from JSON, so tuples are lists.
+        """
+        return self._results.get(key, default)
+
+    def add(self, key, result=True):
+        """Adds a result, and appends it to the file. Can be called from several threads.
+
+        :param key: String key, like the url of a page.
+        :param result: Anything that can be made into JSON.
+        """
+        line = json.dumps({"key": key, "result": result}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._results[key] = result
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced += 1
+            if self._unsynced >= self.sync_every:
+                os.fsync(self._file.fileno())
+                self._unsynced = 0
+
+    def close(self):
+        """Syncs the file to disk and closes it. The results are kept for the next run."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+
+    def remove(self):
+        """Closes and deletes the file, when what it was for is done and saved elsewhere."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,164 @@
+"""Sorted index of course codes, for checking, completing and correcting typed in codes."""
+
+import bisect
+import re
+
+# The letters a course code starts with, like 'MAT' or 'FYS-MEK', that similar courses share
+FAMILY = re.compile(r"[A-ZÆØÅ\-]*")
+
+# A course code in upper case. Leaves out what the parser took for codes in the text
+# of course pages, like '-1' and '-10'
+COURSE_CODE = re.compile(r"[A-ZÆØÅ][A-ZÆØÅ\d\-]*")
+
+# Largest edit distance of a suggestion
+MAX_DISTANCE = 2
+
+def edit_distance(first, second, limit):
+    """Number of insertions, deletions, substitutions and swaps of neighbours between two strings.
+
+    Stops early when the distance is sure to be more than limit.
+
+    :param first: String.
+    :param second: String.
+    :param limit: Int. Largest distance that is of interest.
+
+    :return: Int distance, or limit + 1 if it is more than limit.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+
+    # What the strings start and end with in common doesn't change the distance
+    start = 0
+    while start < min(len(first), len(second)) and first[start] == second[start]:
+        start += 1
+    end = 0
+    while end < min(len(first), len(second)) - start and first[-1 - end] == second[-1 - end]:
+        end += 1
+    first, second = first[start:len(first) - end], second[start:len(second) - end]
+    if not first or not second:
+        return min(len(first) + len(second), limit + 1)
+
+    before, previous = None, list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            distance = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (first_char != second_char))
+            if (before is not None and j > 1 and first_char == second[j - 2]
+                    and first[i - 2] == second_char):
+                distance = min(distance, before[j - 2] + 1)
+            current.append(distance)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+
+    return min(previous[-1], limit + 1)
+
+def is_course_code(code):
+    """Whether a string, in any case, looks like a course code, with letters first."""
+    return COURSE_CODE.fullmatch(code.upper()) is not None
+
+def deletions(string, depth):
+    """Set of the strings made by deleting up to depth characters from string, string included."""
+    strings = {string}
+    for _ in range(depth):
+        strings |= {other[:i] + other[i + 1:] for other in strings for i in range(len(other))}
+    return strings
+
+class CodeIndex:
+    def __init__(self, codes, max_distance=MAX_DISTANCE):
+        """Index of course codes, that doesn't care about case.
+
+        The codes are kept sorted in upper case, so all codes starting with some letters
+        are found by bisecting, like the branch of a trie. Every string made by deleting
+        up to max_distance characters from a code is indexed up front, so suggestions
+        take the same short time for every code. Strings that aren't course codes, see
+        is_course_code(), are left out.
+
+        :param codes: Iterable of course codes.
+        :param max_distance: Int. Largest edit distance that suggestions can be found for.
+        """
+        self._codes = {}
+        for code in codes:
+            if is_course_code(code):
+                self._codes.setdefault(code.upper(), code)
+        self._keys = sorted(self._codes)
+
+        self.max_distance = max_distance
+        self._deleted = {}
+        for key in self._keys:
+            for variant in deletions(key, max_distance):
+                self._deleted.setdefault(variant, []).append(key)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, code):
+        return code.upper() in self._codes
+
+    def get(self, code):
+        """The course code as it is written in the data, or None if it isn't a course code.
+
+        :param code: String, in any case.
+        """
+        return self._codes.get(code.upper())
+
+    def _range(self, prefix):
+        """Start and end of the keys that start with prefix, which must be in upper case."""
+        start = bisect.bisect_left(self._keys, prefix)
+        return start, bisect.bisect_left(self._keys, prefix + "\uffff", start)
+
+    def complete(self, prefix, limit=None):
+        """Course codes starting with some letters, in sorted order.
+
+        :param prefix: String, in any case.
+        :param limit: Int. Most codes to return, or None for all of them.
+
+        :return: List of course codes, as written in the data.
+        """
+        start, end = self._range(prefix.upper())
+        if limit is not None:
+            end = min(end, start + limit)
+        return [self._codes[key] for key in self._keys[start:end]]
+
+    def suggestions(self, code, limit=5, max_distance=None):
+        """Course codes that are close to one that doesn't exist, closest first.
+
+        Among codes as close as each other, those that start with code come first, so a
+        partial code gets its completions.
+
+        Only codes in the same family, starting with the same letters, are compared. If
+        there are none, the letters are shortened until there are some, so that a typo in
+        the letters still finds something.
+
+        :param code: String, in any case.
+        :param limit: Int. Most codes to return.
+        :param max_distance: Int. Largest edit distance of a suggestion, up to the one
+                             the index was made for, which is used if None. Codes are
+                             found by deleting characters, so codes that are only this
+                             close when counting swaps as one edit may not be found.
+
+        :return: List of course codes, as written in the data.
+
+        :raise ValueError: If max_distance is more than the index was made for.
+        """
+        if max_distance is None:
+            max_distance = self.max_distance
+        elif max_distance > self.max_distance:
+            raise ValueError(f"Suggestions are indexed up to a distance of {self.max_distance}, not {max_distance}")
+
+        code = code.upper()
+        family = FAMILY.match(code).group()
+        while family and self._range(family)[0] == self._range(family)[1]:
+            family = family[:-1]
+
+        candidates = set()
+        for variant in deletions(code, max_distance):
+            candidates.update(key for key in self._deleted.get(variant, ()) if key.startswith(family))
+
+        distances = []
+        for key in candidates:
+            distance = edit_distance(code, key, max_distance)
+            if distance <= max_distance:
+                distances.append((distance, not key.startswith(code), key))
+
+        return [self._codes[key] for _, _, key in sorted(distances)[:limit]]
@@ -0,0 +1,295 @@
+"""Compiled graph of the precursors between courses."""
+
+from array import array
+
+KINDS = ("obligatory", "recommended")
+
+class Requirements:
+    def __init__(self, group_offsets, member_offsets, members):
+        """Requirements of one kind for all courses, stored as flat arrays.
+
+        The requirements of course i are the groups group_offsets[i] up to
+        group_offsets[i+1], and group g consists of the course ids members[member_offsets[g]]
+        up to members[member_offsets[g+1]]. Any one course in a group fulfills it, and
+        every group has to be fulfilled. A course that is just required is a group of one.
+
+        :param group_offsets: array.array of ints, one longer than the number of courses.
+        :param member_offsets: array.array of ints, one longer than the number of groups.
+        :param members: array.array of course ids.
+        """
+        self.group_offsets = group_offsets
+        self.member_offsets = member_offsets
+        self.members = members
+
+    def groups(self, course_id):
+        """List of groups for a course, each a list of course ids."""
+        member_offsets, members = self.member_offsets, self.members
+        return [members[member_offsets[group]:member_offsets[group + 1]].tolist()
+                for group in range(self.group_offsets[course_id], self.group_offsets[course_id + 1])]
+
+    def precursors(self, course_id):
+        """array.array with ids of all courses mentioned in the requirements of a course."""
+        start = self.member_offsets[self.group_offsets[course_id]]
+        end = self.member_offsets[self.group_offsets[course_id + 1]]
+        return self.members[start:end]
+
+class CourseGraph:
+    def __init__(self, codes, known, obligatory, recommended):
+        """Graph with courses as integer ids, and their precursors as edges.
+
+        Usually made with CourseGraph.from_dataframe().
+
+        :param codes: List of course codes, where the index is the id of the course.
+                      Includes codes that are mentioned as precursors, but aren't in the data.
+        :param known: List of bools, whether the course with that id is in the data.
+        :param obligatory: Requirements instance with obligatory precursors.
+        :param recommended: Requirements instance with recommended precursors.
+        """
+        self.codes = codes
+        self.known = known
+        self.ids = {code: course_id for course_id, code in enumerate(codes)}
+        self.requirements = {"obligatory": obligatory, "recommended": recommended}
+
+    @classmethod
+    def from_dataframe(cls, course_df):
+        """Factory method for compiling the graph from the course data.
+
+        If a course code is in several rows, the first one is used.
+
+        :param course_df: pandas.DataFrame instance with data.
+
+        :return: CourseGraph instance.
+        """
+        codes, ids, rows = [], {}, []
+
+        def course_id(code):
+            if code not in ids:
+                ids[code] = len(codes)
+                codes.append(code)
+            return ids[code]
+
+        columns = zip(course_df['coursecode'].values,
+                      course_df['obligatory'].values,
+                      course_df['recommended'].values)
+        for code, obligatory_list, recommended_list in columns:
+            if code not in ids:
+                course_id(code)
+                rows.append((obligatory_list, recommended_list))
+        num_known = len(rows)
+
+        requirements = []
+        for kind_index in range(len(KINDS)):
+            group_offsets, member_offsets, members = array('l', [0]), array('l', [0]), array('l')
+            for row in rows:
+                for element in row[kind_index]:
+                    for member in (element if isinstance(element, list) else [element]):
+                        members.append(course_id(member))
+                    member_offsets.append(len(members))
+                group_offsets.append(len(member_offsets) - 1)
+            requirements.append((group_offsets, member_offsets, members))
+
+        # Courses only mentioned as precursors have no requirements themselves
+        for group_offsets, member_offsets, members in requirements:
+            group_offsets.extend([group_offsets[-1]] * (len(codes) - num_known))
+
+        known = [True] * num_known + [False] * (len(codes) - num_known)
+        return cls(codes, known, *[Requirements(*arrays) for arrays in requirements])
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        """Check if a course code is in the data."""
+        return code in self.ids and self.known[self.ids[code]]
+
+    def nested_list(self, course_id, kind="obligatory"):
+        """Makes the requirements of a course into the old style nested list.
+
+        :param course_id: Int id of course.
+        :param kind: 'obligatory' or 'recommended'.
+
+        :return: List of coursecodes in a nested list, as described in
+                 CompoundCourseList.from_nested_list().
+        """
+        nested_list = []
+        for group in self.requirements[kind].groups(course_id):
+            if len(group) == 1:
+                nested_list.append(self.codes[group[0]])
+            else:
+                nested_list.append([self.codes[member] for member in group])
+        return nested_list
+
+    def walk(self, course_ids, kinds=("obligatory",), visited=None):
+        """Finds all courses that can be reached by following precursors from some courses.
+
+        Iterative depth first search, so deep chains of precursors are no problem.
+
+        :param course_ids: Iterable of int ids to start from.
+        :param kinds: Tuple with kinds of precursors to follow.
+        :param visited: Set of ids to not walk through. Is updated with the ids visited.
+
+        :return: List of ids visited, in the order they were first reached, starting
+                 courses included.
+        """
+        visited = set() if visited is None else visited
+        requirements = [self.requirements[kind] for kind in kinds]
+        order = []
+        stack = list(reversed(list(course_ids)))
+        while stack:
+            course_id = stack.pop()
+            if course_id in visited:
+                continue
+            visited.add(course_id)
+            order.append(course_id)
+            for kind_requirements in requirements:
+                stack.extend(reversed(kind_requirements.precursors(course_id)))
+
+        return order
+
+def bit_ids(bits):
+    """Makes a bitset into a list of the ids that are set, in increasing order."""
+    ids = []
+    while bits:
+        lowest = bits & -bits
+        ids.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return ids
+
+class Reachability:
+    def __init__(self, graph, kinds=("obligatory",)):
+        """Transitive closure of a CourseGraph, with ancestors and descendants as bitsets.
+
+        Ancestors of a course are all courses that can be reached by following precursors,
+        and descendants are all courses that the course leads to, one or more steps ahead.
+        Bit i of a bitset is set if the course with id i is in it.
+
+        Courses in loops are merged into strongly connected components first, so every
+        component is only visited once in each direction.
+
+        :param graph: CourseGraph instance.
+        :param kinds: Tuple with kinds of precursors to follow.
+        """
+        self.graph = graph
+        self.kinds = kinds
+
+        components, component_of = self._components()
+        component_bits = [sum(1 << course_id for course_id in component) for component in components]
+        self._component_of = component_of
+        self._cyclic = [len(component) > 1 or course_id in self._edges(course_id)
+                        for component in components for course_id in component[:1]]
+
+        precursor_components = [
+            {component_of[precursor] for course_id in component
+             for precursor in self._edges(course_id)} - {index}
+            for index, component in enumerate(components)
+        ]
+
+        # Components come precursors first, so all precursors are done when they are needed
+        ancestors = []
+        for index in range(len(components)):
+            bits = 0
+            for precursor in precursor_components[index]:
+                bits |= component_bits[precursor] | ancestors[precursor]
+            ancestors.append(bits)
+
+        descendants = [0] * len(components)
+        for index in reversed(range(len(components))):
+            bits = component_bits[index] | descendants[index]
+            for precursor in precursor_components[index]:
+                descendants[precursor] |= bits
+
+        self._ancestors = ancestors
+        self._descendants = descendants
+        self._component_bits = component_bits
+
+    def _edges(self, course_id):
+        """All precursors of a course, of the kinds followed."""
+        edges = []
+        for kind in self.kinds:
+            edges.extend(self.graph.requirements[kind].precursors(course_id))
+        return edges
+
+    def _components(self):
+        """Finds the strongly connected components with an iterative version of Tarjan's algorithm.
+
+        :return: 2-tuple with a list of components, each a list of ids, in an order where
+                 precursors come before the courses that need them, and a list with the
+                 index of the component each course is in.
+        """
+        num_courses = len(self.graph)
+        index_of, lowlink = [-1] * num_courses, [0] * num_courses
+        on_stack = [False] * num_courses
+        stack, components = [], []
+        component_of = [-1] * num_courses
+        counter = 0
+
+        for root in range(num_courses):
+            if index_of[root] != -1:
+                continue
+            work = [(root, iter(self._edges(root)))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while work:
+                course_id, edges = work[-1]
+                for precursor in edges:
+                    if index_of[precursor] == -1:
+                        index_of[precursor] = lowlink[precursor] = counter
+                        counter += 1
+                        stack.append(precursor)
+                        on_stack[precursor] = True
+                        work.append((precursor, iter(self._edges(precursor))))
+                        break
+                    elif on_stack[precursor]:
+                        lowlink[course_id] = min(lowlink[course_id], index_of[precursor])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        lowlink[parent] = min(lowlink[parent], lowlink[course_id])
+                    if lowlink[course_id] == index_of[course_id]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            component_of[member] = len(components)
+                            component.append(member)
+                            if member == course_id:
+                                break
+                        components.append(component)
+
+        return components, component_of
+
+    def ancestors(self, course_id):
+        """Bitset of all courses upstream of a course. Only includes itself if in a loop."""
+        component = self._component_of[course_id]
+        bits = self._ancestors[component]
+        if self._cyclic[component]:
+            bits |= self._component_bits[component]
+        return bits
+
+    def descendants(self, course_id):
+        """Bitset of all courses downstream of a course. Only includes itself if in a loop."""
+        component = self._component_of[course_id]
+        bits = self._descendants[component]
+        if self._cyclic[component]:
+            bits |= self._component_bits[component]
+        return bits
+
+    def upstream(self, code):
+        """List of codes of all courses that have to or should be taken before a course."""
+        if code not in self.graph.ids:
+            return []
+        course_id = self.graph.ids[code]
+        return [self.graph.codes[other] for other in bit_ids(self.ancestors(course_id))
+                if other != course_id]
+
+    def downstream(self, code):
+        """List of codes of all courses a course leads to, one or more steps ahead."""
+        if code not in self.graph.ids:
+            return []
+        course_id = self.graph.ids[code]
+        return [self.graph.codes[other] for other in bit_ids(self.descendants(course_id))
+                if other != course_id]
@@ -1,11 +1,26 @@
-import pandas as pd
 import re
 import itertools
+import threading
+import weakref
+
+from Catalog import catalog
+from ParameterIndex import ParameterIndex
+import requirementEngine
+from instrumentation import stage
+
+# Parameters selecting courses, in the order they are kept in
+PARAMETERS = ("faculty", "institute", "coursecode", "search")
 
 # TODO: Make iterator special method (for course in CourseListPrimitive())
 
 class CourseListPrimitive:
-    def __init__(self, **course_parameters):
+    __slots__ = ("_quantity", "_courses", "_key", "_hash", "__weakref__")
+
+    # Every primitive that is in use, by its parameters, so equal primitives are one object
+    _interned = weakref.WeakValueDictionary()
+    _intern_lock = threading.Lock()
+
+    def __new__(cls, **course_parameters):
         """A list of courses, along with a quantity of courses.
 
         The quantity is a number up to the number of courses, and is usually interpreted
@@ -17,6 +32,11 @@ class CourseListPrimitive:
             'course_list_primitive1*2 | course_list_primitive2'
         where the requirements are a CompoundCourseList instance that represents a
         requirement of two courses from the first list, and all in the second.
+
+        Primitives can't be changed after they are made, and are interned: making a
+        primitive with the same parameters as one that is already in use gives that same
+        object back. Two primitives are therefore equal only if they are the same object,
+        and the hash is made once, from the parameters, without looking up the courses.
         
         :param **course_parameters: Keyword arguments dictating what to search for.
                faculty: List of faculties to search for courses in.
@@ -39,19 +59,16 @@ class CourseListPrimitive:
                quantity: This one is a bit different. If not given it defauls to the amount
                          of courses. If an int is given, it specifies how many courses among
                          the results that have to be taken for the list to be fulfilled.
-               parent: CompoundCourseList instance that houses this primitive.
 
         :raise ValueError: If invalid course_parameter keys are given.
         :raise TypeError: If course_parameter values aren't of correct types.
         """
-        self._course_parameters = course_parameters
-
-        for param_name, param in self._course_parameters.items():
+        for param_name, param in course_parameters.items():
             if param_name not in ["faculty", "institute", "coursecode", "search", "quantity"]:
                 raise ValueError("Only valid course parameter names are faculty, institute,"
                                  f"coursecode, and search, not {param_name}")
-            if param_name in ["faculty", "institute", "coursecode", "search"]:
-                if not isinstance(param, list):
+            if param_name in PARAMETERS:
+                if not isinstance(param, (list, tuple)):
                     raise TypeError(f"Parameters must be of type list, not {type(param)}")
                 for element in param:
                     if not isinstance(element, str):
@@ -59,17 +76,42 @@ class CourseListPrimitive:
             elif param_name == "quantity":
                 if not (param is None or isinstance(param, int)):
                     raise TypeError(f"Quantity must be of type str or None, not {type(param)}")
-            elif param_name == "parent":
-                if not isinstance(param, CompoundCourseList):
-                    raise TypeError(f"Parent must be of type CompoundCourseList, not {type(param)}")
-        
-        if "quantity" in self._course_parameters:
-            self._quantity = self._course_parameters["quantity"]
 
-        if "parent" in self._course_parameters:
-            self.parent = self._course_parameterrs["parent"]
-        else:
-            self.parent = None
+        quantity = course_parameters.get("quantity")
+        key = tuple(tuple(course_parameters[name]) if name in course_parameters else None
+                    for name in PARAMETERS) + (quantity,)
+
+        with cls._intern_lock:
+            primitive = cls._interned.get(key)
+            if primitive is None:
+                primitive = object.__new__(cls)
+                for name, value in [("_quantity", quantity), ("_courses", None),
+                                    ("_key", key), ("_hash", hash(key))]:
+                    object.__setattr__(primitive, name, value)
+                cls._interned[key] = primitive
+
+        return primitive
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CourseListPrimitive instances can't be changed, make a new one instead")
+
+    def __delattr__(self, name):
+        raise AttributeError("CourseListPrimitive instances can't be changed, make a new one instead")
+
+    @property
+    def _course_parameters(self):
+        """Dict with the parameters the primitive was made with, as tuples, and the quantity if given."""
+        course_parameters = {name: value for name, value in zip(PARAMETERS, self._key) if value is not None}
+        if self._quantity is not None:
+            course_parameters["quantity"] = self._quantity
+        return course_parameters
+
+    def __reduce__(self):
+        return (self._from_parameters, (self._course_parameters,))
+
+    @classmethod
+    def _from_parameters(cls, course_parameters):
+        return cls(**course_parameters)
 
     @classmethod
     def from_str(cls, str_course_parameters):
@@ -98,63 +140,65 @@ class CourseListPrimitive:
 
     @property
     def courses(self):
-        """List of courses. Makes it by searching, if it hasn't already been done."""
-        
-        if "_courses" not in self.__dict__:
-            self._courses = []
-            courses_to_exclude = []
-
-            course_df = pd.read_pickle("courses.pkl")
-
-            for parameter in ["faculty", "institute"]:
-                if parameter in self._course_parameters:
-                    for element in self._course_parameters[parameter]:
-                        if element[0] == "-":
-                            course_list = courses_to_exclude
-                            parameter_value = element[1:]
-                        else:
-                            course_list = self._courses
-                            parameter_value = element
-                        
-                        indexes = course_df[parameter] == parameter_value
-                        course_list.extend(
-                            list(course_df.loc[indexes, "coursecode"].values)
-                        )
-
-            if "coursecode" in self._course_parameters:
-                for course in self._course_parameters["coursecode"]:
-                    if course[0] == "-":
-                        courses_to_exclude.append(course[1:])
-                    else:
-                        self._courses.append(course)
-
-            # Remove duplicates
-            self._courses = list(dict.fromkeys(self._courses))
-
-            for course_to_exclude in courses_to_exclude:
-                if course_to_exclude in self._courses:
-                    self._courses.remove(course_to_exclude)
-
-            if "search" in self._course_parameters:
-                for search_query in self._course_parameters["search"]:
-                    if search_query[0] == "-":
-                        course_list = courses_to_exclude
-                        regex = self.regexpify(search_query[1:])
-                    else:
-                        course_list = self._courses
-                        regex = self.regexpify(search_query)
-
-                    indexes = course_df["coursecode"].str.contains(regex)
-                    course_list.extend(list(course_df["coursecode"].loc[indexes]))
+        """List of courses. Makes it by searching, if it hasn't already been done.
 
-        return self._courses
+        The list is a copy, so changing it doesn't change the primitive, which is shared.
+        """
+        return list(self._course_tuple())
+
+    def _course_tuple(self):
+        """Tuple of courses, as it is kept, without copying it.
+
+        Courses found in the catalog are kept with the catalog, and found again if it is
+        reloaded, while a plain list of course codes is kept with the primitive.
+        """
+        if self._courses is not None:
+            return self._courses
+
+        if not any(name in self._course_parameters for name in ["faculty", "institute", "search"]):
+            courses = self._find_courses()
+            object.__setattr__(self, "_courses", courses)
+            return courses
+
+        found = catalog.derived('primitive_courses', lambda course_df: {})
+        if self not in found:
+            found[self] = self._find_courses()
+        return found[self]
+
+    @stage()
+    def _find_courses(self):
+        """Finds the courses selected by the parameters, as a tuple.
+
+        Faculties, institutes and searches are looked up as bitsets in the ParameterIndex of
+        the catalog, so the courses are the union of what is selected, without what is
+        excluded, in the order of the catalog.
+        """
+        course_parameters = self._course_parameters
+        if not any(name in course_parameters for name in ["faculty", "institute", "search"]):
+            codes = course_parameters.get("coursecode", ())
+            excluded = {code[1:] for code in codes if code[0] == "-"}
+            return tuple(code for code in dict.fromkeys(codes) if code[0] != "-" and code not in excluded)
+
+        included, excluded = [], []
+        for parameter in PARAMETERS:
+            for element in course_parameters.get(parameter, ()):
+                if element[0] == "-":
+                    selected, value = excluded, element[1:]
+                else:
+                    selected, value = included, element
+                if parameter == "search":
+                    value = self.regexpify(value)
+                selected.append((parameter, value))
+
+        index = catalog.derived('parameter_index', lambda course_df: ParameterIndex.from_catalog(catalog))
+        return index.select(included, excluded)
 
     @property
     def quantity(self):
         """How many of the courses selected by parameters have to be included"""
         
-        if "_quantity" not in self.__dict__:
-            self._quantity = len(self.courses)
+        if self._quantity is None:
+            return len(self._course_tuple())
         
         return self._quantity
 
@@ -162,7 +206,7 @@ class CourseListPrimitive:
     def course_combinations(self):
         """An iterable with all combinations of courses, that satisfy parameters."""
 
-        return itertools.combinations(self.courses, self.quantity)
+        return itertools.combinations(self._course_tuple(), self.quantity)
 
     @staticmethod
     def regexpify(search_query):
@@ -189,7 +233,7 @@ class CourseListPrimitive:
             if other == 0:
                 return CourseListPrimitive()
             else:
-                return CourseListPrimitive(**self._course_parameters, quantity=other)
+                return CourseListPrimitive(**{**self._course_parameters, "quantity": other})
         else:
             raise TypeError("CourseListPrimitive instance can only be multiplied with "
                             f"int, not {type(other)}")
@@ -224,7 +268,7 @@ class CourseListPrimitive:
         found in self.
         """
         if isinstance(other, str):
-            return other in self.courses
+            return other in self._course_tuple()
         elif isinstance(other, (CourseListPrimitive, CompoundCourseList)):
             for course in other.courses:
                 if course not in self:
@@ -234,17 +278,12 @@ class CourseListPrimitive:
         return False
 
     def __hash__(self):
-        """Hashes, makes a unique int, that represents the courses and quantity"""
-        return hash((", ".join(self.courses), self.quantity))
+        """Hash of the parameters, made once when the primitive was made"""
+        return self._hash
 
     def __eq__(self, other):
-        """Checks equality, by checking the hashes are the same"""
-
-        if isinstance(other, CourseListPrimitive):
-            if hash(self) == hash(other):
-                return True
-                
-        return False
+        """Checks equality. Equal primitives are interned, so only the same object is equal"""
+        return self is other
 
     @property
     def is_simple(self):
@@ -253,7 +292,7 @@ class CourseListPrimitive:
         This means, if the quantity is just the default, the same as the amount of courses,
         this evaluates as True.
         """
-        return len(self.courses) == self.quantity
+        return len(self._course_tuple()) == self.quantity
 
     def implies(self, other):
         """Like __contains__, just harder. Other HAS to be done for self to fulfill.
@@ -266,30 +305,29 @@ class CourseListPrimitive:
          not fulfilled |      True     |      True      |
                        ----------------------------------
 
-        Called recursively by CompoundCourseList.
+        Decided by requirementEngine.implies(), without going through course combinations.
 
         :param other: String, CourseListPrimitive or CompoundCourseList.
 
         :return: Bool.
         """
-        if isinstance(other, str):
-            return other in self and self.is_simple
-
-        elif isinstance(other, (CourseListPrimitive, CompoundCourseList)):
-            for other_combo in other.course_combinations:
-                for self_combo in self.course_combinations:
-                    for course in other_combo:
-                        if course not in self_combo:
-                            break
-                    return True
-
-            return False
-
-        else:
+        if not isinstance(other, (str, CourseListPrimitive, CompoundCourseList)):
             raise TypeError("Only accepts other in the form of "
                             "CourseListPrimitive or CompoundCourseList instances, "
                             f"not {type(other)}")
 
+        return requirementEngine.implies(self, other)
+
+    def is_fulfilled_by(self, courses):
+        """Checks if taking some courses fulfills the requirements.
+
+        :param courses: Iterable of course codes.
+
+        :return: Bool.
+        """
+        return requirementEngine.is_fulfilled(self, set(courses))
+
+    @stage()
     def requirements_not_implied_by(self, other):
         """Makes a list of courses that would need to be taken to fulfill requirements.
 
@@ -299,6 +337,9 @@ class CourseListPrimitive:
         The CourseListPrimitive returned is therefore either a copy of this with the same
         or a lower quantity value, or empty.
 
+        Done by requirementEngine.requirements_left(), without going through course
+        combinations.
+
         :param other: CourseListPrimitive or CompoundCourseList specifying what courses are
                       to be checked if fulfill requirements set up by this primitive.
 
@@ -309,23 +350,7 @@ class CourseListPrimitive:
                             "CourseListPrimitive or CompoundCourseList instances, "
                             f"not {type(other)}")
 
-        not_fulfilled = []
-        for other_combo in other.course_combinations:
-            for self_combo in self.course_combinations:
-                part = [course for course in self_combo if course not in other_combo]
-                if part:
-                    not_fulfilled.append(part)
-                else:
-                    return CourseListPrimitive()
-
-        if len(not_fulfilled) == 1:
-            course_list = CourseListPrimitive(coursecode=not_fulfilled[0])
-        else:
-            course_list = CompoundCourseList.from_nested_list(not_fulfilled,
-                                                              relationship="or")
-            course_list.simplify()
-            
-        return course_list
+        return requirementEngine.requirements_left(self, other)
 
     def combinations_that_fulfill(self, other):
         """Finds the course combinations from another list, that fulfills self.
@@ -342,45 +367,55 @@ class CourseListPrimitive:
                             "CourseListPrimitive or CompoundCourseList instances, "
                             f"not {type(other)}")
 
-        valid_combinations = []
-        for other_combo in other.course_combinations:
-            for self_combo in self.course_combinations:
-                for course in other_combo:
-                    if course not in self_combo:
-                        break
-                valid_combinations.append(other_combo)
-
-        return CompoundCourseList.from_nested_list(valid_combinations, relationship="or")
+        valid_combinations = [
+            CourseListPrimitive(coursecode=list(other_combo))
+            for other_combo in other.course_combinations
+            if requirementEngine.is_fulfilled(self, set(other_combo))
+        ]
 
+        return CompoundCourseList(*valid_combinations, relationship="or")
 
     def assume_taken(self, course):
         """Assume a course has been taken, removing it, and reducing quantity by one.
 
+        Primitives can't be changed, so the result is a new one.
+
         :param course: String course code.
+
+        :return: CourseListPrimitive instance, self if course isn't in it.
         """
         if course in self:
-            self.remove(course)
-            self._quantity -= 1
+            return requirementEngine.residual(self, {course})
+        return self
 
     def __str__(self):
         """Prints out courses"""
+        course_parameters = self._course_parameters
         properties = []
-        if "faculty" in self._course_parameters:
-            properties.append(f"Faculty: {', '.join(self._course_parameters['faculty'])}")
-        if "institute" in self._course_parameters:
-            properties.append(f"Institute: {', '.join(self._course_parameters['institute'])}")
-        if "coursecode" in self._course_parameters:
-            properties.append(f"Coursecode: {', '.join(self._course_parameters['coursecode'])}")
-        if "search" in self._course_parameters:
-            properties.append(f"Regexp requirement: {self._course_parameters['search']}")
-        if "quantity" in self._course_parameters:
-            quantity = f"{self._course_parameters['quantity']} of "
+        if "faculty" in course_parameters:
+            properties.append(f"Faculty: {', '.join(course_parameters['faculty'])}")
+        if "institute" in course_parameters:
+            properties.append(f"Institute: {', '.join(course_parameters['institute'])}")
+        if "coursecode" in course_parameters:
+            properties.append(f"Coursecode: {', '.join(course_parameters['coursecode'])}")
+        if "search" in course_parameters:
+            properties.append(f"Regexp requirement: {list(course_parameters['search'])}")
+        if "quantity" in course_parameters:
+            quantity = f"{course_parameters['quantity']} of "
         else:
             quantity = "all of "
 
 
         return f"{quantity}[{'. '.join(properties)}]"
 
+    def to_dict(self):
+        """Makes a dict with the courses and quantity, that can be written as JSON.
+
+        :return: Dict with list of course codes, and int quantity.
+        """
+        return {"courses": self.courses, "quantity": self.quantity}
+
+    @stage()
     def simplify(self):
         """Simplifies the primitive, making its parameters simpler if possible"""
         # TODO: Make primitives version of this method do course parameter
@@ -415,14 +450,14 @@ class CompoundCourseList:
                                 f" or CourseListPrimitives, not {type(course_list)}")
 
         self.children = list(course_lists)
-        for child in self.children:
-            child.parent = self
+        self._adopt_children()
 
         self.relationship = relationship
 
         self.parent = parent
 
     @classmethod
+    @stage()
     def from_nested_list(cls, nested_list, **kwargs):
         """Factory method for instantiating through the old style nested lists.
 
@@ -458,9 +493,7 @@ class CompoundCourseList:
         course_parameters = {}
         regex = r"\[([\w\: ,.]+)\] ?(and|or)?"
         for match in re.finditer(regex, str_course_parameters):
-            new_primitive = CourseListPrimitive.from_str(match.group(1))
-            new_primitive.parent = self
-            primitives.append(new_primitive)
+            primitives.append(CourseListPrimitive.from_str(match.group(1)))
             if len(match.groups()) == 2:
                 relationship = match.group(2)
 
@@ -469,10 +502,11 @@ class CompoundCourseList:
     @property
     def courses(self):
         if "_courses" not in self.__dict__:
-            self._courses = []
-
+            # Made whole before it is assigned, so other threads never see part of it
+            courses = []
             for child in self.children:
-                self._courses.extend(child.courses)
+                courses.extend(child.courses)
+            self._courses = courses
 
         return self._courses
 
@@ -534,6 +568,13 @@ class CompoundCourseList:
         """Prints out relationships between all children, and their contents"""
         return f"{f' {self.relationship} '.join([str(child) for child in self.children])}"
 
+    def to_dict(self):
+        """Makes a dict with the relationship and children, that can be written as JSON.
+
+        :return: Dict with relationship, and list of children as dicts.
+        """
+        return {"relationship": self.relationship, "children": [child.to_dict() for child in self.children]}
+
     def __len__(self):
         """Returns number of primitives and compounds in this compound.
 
@@ -546,7 +587,7 @@ class CompoundCourseList:
 
     def __hash__(self):
         """Hashes, makes a unique int, that represents the courses and quantity"""
-        return hash(tuple([child.hash for child in self.children] + [self.relationship]))
+        return hash(tuple([hash(child) for child in self.children] + [self.relationship]))
 
     @property
     def is_simple(self):
@@ -563,6 +604,7 @@ class CompoundCourseList:
         else:
             return False
 
+    @stage()
     def requirements_not_implied_by(self, course_list):
         """Makes a list of courses that would need to be taken to fulfill requirements.
 
@@ -573,16 +615,14 @@ class CompoundCourseList:
         means finding the subset of this object, that isn't at all fulfilled by the courses
         in the course_list parameter.
 
-        Works recursively.
+        Done by requirementEngine.requirements_left(), without going through course
+        combinations.
 
-        :param course_list: CourseListPrimitive. Assumes quantity == len(course_list._courses).
+        :param course_list: CourseListPrimitive or CompoundCourseList.
 
         :return: CompoundCourseList of unfulfilled requirements.
         """
-        new_compound = CompoundCourseList(
-            *[child.requirements_not_implied_by(course_list) for child in self.children],
-            relationship=self.relationship
-        )
+        new_compound = requirementEngine.requirements_left(self, course_list)
         new_compound.simplify()
         return new_compound
 
@@ -597,35 +637,31 @@ class CompoundCourseList:
          not fulfilled |      True     |      True      |
                        ----------------------------------
 
+        Decided by requirementEngine.implies(), without going through course combinations.
+
         :param other: String, CourseListPrimitive or CompoundCourseList.
 
         :return: Bool.
-    
-        :raise ValueError: if other is a string representing an unknown course code.
+
         :raise TypeError: if other isn't either a string, CourseListPrimitive or 
                           CompoundCourseList.
         """
-        if isinstance(other, str):
-            other = CourseListPrimitive(coursecode=other)
-            if not other:
-                raise ValueError(f"Not valid course.")
-            self.implies(other)
-
-        elif isinstance(other, (CourseListPrimitive, CompoundCourseList)):
-            for other_combo in other.course_combinations:
-                for self_combo in self.course_combinations:
-                    for course in other_combo:
-                        if course not in self_combo:
-                            break
-                    return True
-
-            return False
-
-        else:
+        if not isinstance(other, (str, CourseListPrimitive, CompoundCourseList)):
             raise TypeError("Only accepts other in the form of "
                             "CourseListPrimitive or CompoundCourseList instances, "
                             f"not {type(other)}")
 
+        return requirementEngine.implies(self, other)
+
+    def is_fulfilled_by(self, courses):
+        """Checks if taking some courses fulfills the requirements.
+
+        :param courses: Iterable of course codes.
+
+        :return: Bool.
+        """
+        return requirementEngine.is_fulfilled(self, set(courses))
+
     @property
     def primitives(self):
         """List of all CourseListPrimitives at the leaves of the tree"""
@@ -653,61 +689,82 @@ class CompoundCourseList:
     def relationships(self):
         """List of all relationships between itself and the root"""
         relationships = []
-        if parent is not none:
-            relationships = [parent.relationship]
-            relationships.extend(parent.relationships)
+        if self.parent is not None:
+            relationships = [self.parent.relationship]
+            relationships.extend(self.parent.relationships)
 
         return relationships
 
+    @stage()
     def simplify(self):
-        """Simplifies the tree structure, removing redundancy."""
+        """Simplifies the tree structure, removing redundancy.
+
+        Works from the leaves and up, and in each compound:
+         - Children fulfilled without taking anything are removed. In an 'or' that
+           means the compound itself is fulfilled, so all children are removed.
+         - Compounds with only one child are replaced by the child, and compounds with the
+           same relationship as this one are merged into it.
+         - In an 'and', primitives where all courses have to be taken are merged into one,
+           and the other children are reduced to what is left when those are taken.
+         - In an 'and', children implied by another child are removed, and in an 'or',
+           children implying another child are removed.
+        """
+        children = []
+        for child in self.children:
+            if isinstance(child, CompoundCourseList):
+                child.simplify()
+                if len(child) == 1:
+                    child = child.children[0]
+            if isinstance(child, CompoundCourseList) and child.relationship == self.relationship:
+                children.extend(child.children)
+            else:
+                children.append(child)
 
-        for compound in self.compounds:
-            # Makes compounds that could be represented as primitives, primitives
-            if compound.is_simple:
-                compound.parent.add(
-                    CourseListPrimitive(coursecode=compound.courses)
-                )
-                compound.parent.remove(compound)
-            elif len(compound) == 1:
-                compound.parent.add(compound.children[0])
-                compound.parent.remove(compound)
-            # Merges primitives where possible, and removes low hanging redundancy
+        fulfilled = [requirementEngine.is_fulfilled(child, set()) for child in children]
+        if self.relationship == "or" and any(fulfilled):
+            children = []
+        else:
+            children = [child for child, done in zip(children, fulfilled) if not done]
+
+        if self.relationship == "and":
+            simples = [child for child in children
+                       if isinstance(child, CourseListPrimitive) and child.is_simple]
+            if len(simples) > 1 or (simples and len(children) > 1):
+                simple_courses = list(dict.fromkeys(
+                    course for simple in simples for course in simple.courses
+                ))
+                taken = set(simple_courses)
+                children = [requirementEngine.residual(child, taken) for child in children
+                            if not any(child is simple for simple in simples)]
+                children = [child for child in children
+                            if not requirementEngine.is_fulfilled(child, set())]
+                for child in children:
+                    if isinstance(child, CompoundCourseList):
+                        child.simplify()
+                children.append(CourseListPrimitive(coursecode=simple_courses))
+
+        kept = []
+        for index, child in enumerate(children):
+            others = kept + children[index + 1:]
+            if self.relationship == "and":
+                redundant = any(other.implies(child) for other in others)
             else:
-                simples = [child for child in compound.children if child.is_simple]
-                if len(simples) > 1:
-                    simple_courses = []
-                    for simple in simples:
-                        compound.remove(simple)
-                        simple_courses.extend(simple.courses)
-
-                    simple_course_list = CourseListPrimitive(coursecode=simple_courses)
-                    
-                    for child in compound.children:
-                        child.assume_taken(simple_course_list)
-
-                    compound.children.append(simple_course_list)
-
-        # If one compound implies another, and the implying one has to be fulfilled
-        # for the root to be fulfilled, assume the implied one is also fulfilled
-        for compound_1, compound_2 in itertools.combinations(self.compounds, 2):
-            if "or" not in compound_1.relations:
-                consecutive_ors = 0
-                for rel in compound_2.relationships:
-                    if rel == "or":
-                        consecutive_ors += 1
-                    else:
-                        break
-                if consecutive_ors and compound_1.implies(compound_2):
-                    for level in range(consecutive_ors):
-                        compound_2.parent.remove(compound_2)
-                        compound_2 = compound_2.parent
-
-        # Tries to make course parameters tighter
-        for primitive in self.primitives:
-            primitive.simplify()
-            if not primitive:
-                self.remove(primitive)
+                redundant = any(child.implies(other) for other in others)
+            if not redundant:
+                kept.append(child)
+
+        self.children = kept
+        self._adopt_children()
+        self.__dict__.pop("_courses", None)
+
+    def _adopt_children(self):
+        """Makes this the parent of the compounds among its children.
+
+        Primitives are shared between compounds, so they don't have a parent.
+        """
+        for child in self.children:
+            if isinstance(child, CompoundCourseList):
+                child.parent = self
 
     def add(self, child):
         """Add a child"""
@@ -719,22 +776,30 @@ class CompoundCourseList:
 
         :param child: CourseListPrimitive or CompoundCourseList, in self.children.
 
-        :raise AttributeError: if child has no parent property.
+        :raise ValueError: if child isn't one of the children.
         """
-        if child.parent is not None:
-            child.parent.children.remove(child)
-        else:
-            raise AttributeError("Child has no parent, and can't be deleted from anywhere")
+        for index, existing in enumerate(self.children):
+            if existing is child:
+                del self.children[index]
+                self.__dict__.pop("_courses", None)
+                return
+        raise ValueError("Child isn't in this compound, and can't be deleted from it")
 
     def assume_taken(self, course):
         """Assume a course has been taken, removing it from children.
 
         :param course: String course code.
         """
+        children = []
         for child in self.children:
-            child.assume_taken(course)
-            if not child:
-                self.remove(child)
+            if isinstance(child, CourseListPrimitive):
+                child = child.assume_taken(course)
+            else:
+                child.assume_taken(course)
+            if child:
+                children.append(child)
+        self.children = children
+        self.__dict__.pop("_courses", None)
 
     def __eq__(self, other):
         """Checks equality, by checking that all children are the same"""
@@ -0,0 +1,98 @@
+"""Fetching of web pages for the scrapers."""
+
+import concurrent.futures
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_TIMEOUT = 20
+DEFAULT_RETRIES = 3
+
+class Fetcher:
+    def __init__(self, workers=1, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, backoff=0.5,
+                 cache=None, archive=None):
+        """Fetches pages through one shared session, that keeps connections alive.
+
+        :param workers: How many pages map() fetches at the same time. The connection pool
+                        is made big enough for all of them.
+        :param timeout: Seconds to wait for a server to connect or send data.
+        :param retries: How many times to retry when a connection fails, or the server
+                        answers with a temporary error.
+        :param backoff: Factor for how long to wait between retries. Doubles for each retry.
+        :param cache: HttpCache instance to store pages in and revalidate them with, or None.
+        :param archive: PageArchive instance to keep every page that is fetched in, or None.
+        """
+        self.workers = workers
+        self.timeout = timeout
+        self.cache = cache
+        self.archive = archive
+
+        retry = Retry(total=retries, backoff_factor=backoff, allowed_methods=["GET"],
+                      status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(workers, 1), max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url):
+        """Fetches the content of an url, through the cache if there is one.
+
+        The content is stored in the archive if there is one, so that replaying the archive
+        gives what the scrapers got. Pages the server answers with an error for are neither
+        cached nor archived.
+
+        :param url: String url.
+
+        :return: Bytes with the content of the page.
+
+        :raise requests.RequestException: If the page couldn't be fetched, the server kept
+                                          answering with a temporary error, even after
+                                          retrying, or it answered with an error, like 404.
+        """
+        headers = {} if self.cache is None else self.cache.conditional_headers(url)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        revalidated = response.status_code == 304 and bool(headers)
+        if not (revalidated or 200 <= response.status_code < 300):
+            raise requests.HTTPError(f"{response.status_code} answered for '{url}'", response=response)
+
+        if revalidated:
+            content = self.cache.body(url)
+        else:
+            if self.cache is not None:
+                self.cache.store(url, response)
+            content = response.content
+
+        if self.archive is not None:
+            self.archive.put(url, content)
+        return content
+
+    def map(self, function, iterable):
+        """Calls function on every element, with up to self.workers calls at the same time.
+
+        Meant for functions that fetch pages with this fetcher.
+
+        :param function: Callable taking one element.
+        :param iterable: Iterable with elements.
+
+        :return: Iterator with the results, in the same order as the elements. If it is
+                 closed before the end, or the caller is interrupted while waiting for a
+                 result, the calls not started yet are cancelled, and the calls that are
+                 running are waited for, so none of them run after it is done.
+        """
+        if self.workers <= 1:
+            return map(function, iterable)
+        return self._threaded_map(function, iterable)
+
+    def _threaded_map(self, function, iterable):
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            yield from executor.map(function, iterable)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def close(self):
+        self.session.close()
+
+default_fetcher = Fetcher()
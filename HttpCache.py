@@ -0,0 +1,102 @@
+"""On-disk cache of fetched pages, revalidated with conditional requests."""
+
+import hashlib
+import json
+import os
+import threading
+
+DEFAULT_DIRECTORY = ".http_cache"
+
+class HttpCache:
+    def __init__(self, directory=DEFAULT_DIRECTORY):
+        """Pages stored on disk along with their ETag and Last-Modified headers.
+
+        A stored page is not used as is, but sent along as If-None-Match and
+        If-Modified-Since headers, so the server can answer with '304 Not Modified'
+        instead of the whole page if it hasn't changed.
+
+        Counts how the cache has been used:
+            misses: Pages that weren't stored, and had to be fetched.
+            revalidations: Pages that were stored, and checked with the server.
+            hits: Revalidated pages that hadn't changed, and were read from disk.
+
+        :param directory: Path to directory to store pages in. Made if it doesn't exist.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self.hits = self.misses = self.revalidations = 0
+        self._lock = threading.Lock()
+
+    def _path(self, url, extension):
+        return os.path.join(self.directory, hashlib.sha256(url.encode()).hexdigest() + extension)
+
+    def _write(self, path, content):
+        """Writes a file through a temporary file, so readers never see half of it."""
+        temporary_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as temporary_file:
+            temporary_file.write(content)
+        os.replace(temporary_path, path)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def conditional_headers(self, url):
+        """Headers that ask the server to only send the page if it has changed.
+
+        :param url: String url.
+
+        :return: Dict with headers. Empty if the page isn't stored.
+        """
+        try:
+            with open(self._path(url, ".json")) as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            self._count("misses")
+            return {}
+
+        if not os.path.exists(self._path(url, ".body")):
+            self._count("misses")
+            return {}
+
+        self._count("revalidations")
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def body(self, url):
+        """The stored content of a page, after the server has said it hasn't changed.
+
+        :param url: String url.
+
+        :return: Bytes with the content of the page.
+        """
+        with open(self._path(url, ".body"), "rb") as body_file:
+            content = body_file.read()
+        self._count("hits")
+        return content
+
+    def store(self, url, response):
+        """Stores a page, if the server sent headers it can be revalidated with.
+
+        :param url: String url.
+        :param response: requests.Response with status 200.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        self._write(self._path(url, ".body"), response.content)
+        self._write(self._path(url, ".json"), json.dumps(meta).encode())
+
+    def summary(self):
+        """String with how the cache has been used."""
+        changed = self.revalidations - self.hits
+        return (f"Cache: {self.hits} hits, {self.misses} misses, "
+                f"{self.revalidations} revalidations ({changed} changed).")
@@ -0,0 +1,66 @@
+"""Bounded in-memory cache, that drops what was used longest ago."""
+
+import threading
+from collections import OrderedDict
+
+class LRUCache:
+    def __init__(self, maxsize=1024):
+        """Cache with at most maxsize entries, safe to use from several threads.
+
+        When it is full, the entry that was used longest ago is dropped to make room.
+
+        Counts how the cache has been used:
+            hits: Lookups that found an entry.
+            misses: Lookups that didn't.
+
+        :param maxsize: Int. Largest number of entries.
+        """
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Looks up an entry, and marks it as the one used last.
+
+        :param key: Hashable key.
+        :param default: Returned if there is no entry with the key.
+
+        :return: The value of the entry, or default.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Adds or replaces an entry, dropping the one used longest ago if the cache is full.
+
+        :param key: Hashable key.
+        :param value: Anything.
+        """
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drops all entries, but keeps the counts."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def hit_rate(self):
+        """Share of lookups that were hits, between 0 and 1. 0 if there have been none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
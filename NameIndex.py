@@ -0,0 +1,113 @@
+"""Inverted index of the words in course names, for finding courses without knowing their codes."""
+
+import bisect
+import heapq
+import math
+import re
+import unicodedata
+
+WORD = re.compile(r"\w+")
+
+# Written out the way they are typed on keyboards without them, before other accents are removed
+NORWEGIAN = str.maketrans({"æ": "ae", "ø": "o", "å": "a"})
+
+# How much a word counts when the query term is only the start of it, times the share of it
+# that is typed, or when it only matches with æ, ø, å and accents folded away, compared to
+# matching the whole word as written
+PREFIX_WEIGHT = 0.6
+FOLDED_WEIGHT = 0.9
+
+def words(text):
+    """List of the words in text, in lower case, with æ, ø, å and other letters kept as they are."""
+    return WORD.findall(unicodedata.normalize("NFC", text).casefold())
+
+def fold(word):
+    """A word without æ, ø, å or accents, like 'okonomi' for 'økonomi' and 'idee' for 'idée'."""
+    if word.isascii():
+        return word
+    decomposed = unicodedata.normalize("NFD", word.translate(NORWEGIAN))
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+class NameIndex:
+    def __init__(self, codes, names):
+        """Index from the words in course names to the courses with them in their name.
+
+        The words are kept sorted after they are folded, see fold(), so all words that
+        start with a query term are found by bisecting, and no names are gone through
+        when searching.
+
+        :param codes: Course code of each row of the data.
+        :param names: Course name of each row of the data. If a code is in several rows,
+                      the first name is used.
+        """
+        self.codes, self.names = [], []
+        seen, postings = set(), {}
+        for code, name in zip(codes, names):
+            if code in seen:
+                continue
+            seen.add(code)
+            course = len(self.codes)
+            self.codes.append(code)
+            self.names.append(name or "")
+            for word in dict.fromkeys(words(name or "")):
+                postings.setdefault(word, []).append(course)
+
+        self._postings = postings
+        self._idf = {word: math.log(1 + len(self.codes) / len(courses)) for word, courses in postings.items()}
+        self._words = {}
+        for word in postings:
+            self._words.setdefault(fold(word), []).append(word)
+        self._folded = sorted(self._words)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _term_scores(self, term):
+        """Dict from course to the score of its best matching word, for one query term."""
+        folded = fold(term)
+        start = bisect.bisect_left(self._folded, folded)
+        end = bisect.bisect_left(self._folded, folded + "\uffff", start)
+
+        scores = {}
+        for folded_word in self._folded[start:end]:
+            for word in self._words[folded_word]:
+                score = self._idf[word]
+                if folded_word != folded:
+                    score *= PREFIX_WEIGHT * len(folded) / len(folded_word)
+                if not word.startswith(term):
+                    score *= FOLDED_WEIGHT
+                for course in self._postings[word]:
+                    if score > scores.get(course, 0):
+                        scores[course] = score
+        return scores
+
+    def search(self, query, limit=10):
+        """Courses with names that have words starting with every word in query, best first.
+
+        Each query term scores a course by the rarest word in its name that the term
+        matches, more if the term is the whole word or most of it, and the scores of the
+        terms are added.
+        Among courses that score the same, the ones with the shortest names come first.
+
+        :param query: String, like 'lineær alg'. Case, and æ, ø, å written as ae, o, a,
+                      don't matter.
+        :param limit: Int. Most courses to return.
+
+        :return: List of 3-tuples with course code, course name and score.
+        """
+        scores = None
+        for term in dict.fromkeys(words(query)):
+            term_scores = self._term_scores(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {course: score + term_scores[course] for course, score in scores.items()
+                          if course in term_scores}
+            if not scores:
+                return []
+
+        if scores is None:
+            return []
+        best = heapq.nlargest(limit, scores.items(),
+                              key=lambda item: (round(item[1], 9), -len(self.names[item[0]]), -item[0]))
+        return [(self.codes[course], self.names[course], score) for course, score in best]
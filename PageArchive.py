@@ -0,0 +1,172 @@
+"""Archive of every page the scrapers have fetched, compressed and stored once per content."""
+
+import datetime
+import hashlib
+import sqlite3
+import threading
+import zlib
+
+import requests
+
+from Fetcher import Fetcher
+
+DEFAULT_PATH = "pages.archive"
+
+# Pages to store between each commit to the file
+COMMIT_EVERY = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS contents (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT NOT NULL,
+    scrape TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES contents(hash),
+    PRIMARY KEY (url, scrape)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pages_by_scrape ON pages (scrape);
+"""
+
+class PageArchive:
+    def __init__(self, path=DEFAULT_PATH, scrape=None, commit_every=COMMIT_EVERY):
+        """Pages stored by url and the date they were scraped, in an SQLite file.
+
+        The content of a page is compressed with zlib, and stored under its SHA-256 hash,
+        so a page that is the same as in an earlier scrape, or as another page, takes no
+        more space. Every scrape only adds the pages that have changed, and a row with
+        url, scrape and hash for each page.
+
+        :param path: Path to archive file. Made if it doesn't exist.
+        :param scrape: String naming the scrape that pages are stored in, like
+                       '2026-10-18'. Today's date by default.
+        :param commit_every: How many pages to store between each commit. Pages not
+                             committed yet are found by this instance, and are committed
+                             by flush() and close().
+        """
+        self.path = path
+        self.scrape = scrape or datetime.date.today().isoformat()
+        self.commit_every = commit_every
+        self._uncommitted = 0
+
+        # One connection shared by the threads of a Fetcher, one at a time
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def put(self, url, content):
+        """Stores a page in the current scrape, replacing it if it is already there.
+
+        :param url: String url.
+        :param content: Bytes with the content of the page.
+
+        :return: String hash of the content.
+        """
+        # Hashing and compressing are the slow part, so the threads of a Fetcher do it at the same time
+        digest = hashlib.sha256(content).hexdigest()
+        compressed = zlib.compress(content, 9)
+        with self._lock:
+            self._connection.execute("INSERT OR IGNORE INTO contents VALUES (?, ?, ?)",
+                                     (digest, len(content), compressed))
+            self._connection.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", (url, self.scrape, digest))
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self._commit()
+        return digest
+
+    def _commit(self):
+        """Commits the pages stored since the last commit. The lock has to be held."""
+        self._connection.commit()
+        self._uncommitted = 0
+
+    def flush(self):
+        """Commits the pages stored since the last commit to the file."""
+        with self._lock:
+            self._commit()
+
+    def get(self, url, scrape=None):
+        """The content of a page, as it was in a scrape.
+
+        :param url: String url.
+        :param scrape: String name of scrape. If the page isn't in that scrape, it is taken
+                       from the latest scrape before it. The latest scrape if None.
+
+        :return: Bytes with the content of the page, or None if it isn't archived.
+        """
+        query = ("SELECT data FROM pages JOIN contents USING (hash) WHERE url = ?"
+                 + (" AND scrape <= ?" if scrape else "") + " ORDER BY scrape DESC LIMIT 1")
+        with self._lock:
+            row = self._connection.execute(query, (url, scrape) if scrape else (url,)).fetchone()
+        return None if row is None else zlib.decompress(row[0])
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._connection.execute("SELECT 1 FROM pages WHERE url = ?", (url,)).fetchone() is not None
+
+    def scrapes(self):
+        """List of the names of all scrapes, oldest first."""
+        with self._lock:
+            return [scrape for scrape, in self._connection.execute("SELECT DISTINCT scrape FROM pages ORDER BY scrape")]
+
+    def urls(self, scrape=None):
+        """List of the urls of the pages in a scrape, sorted. The latest scrape if None."""
+        scrape = scrape or (self.scrapes() or [None])[-1]
+        with self._lock:
+            return [url for url, in self._connection.execute(
+                "SELECT url FROM pages WHERE scrape = ? ORDER BY url", (scrape,))]
+
+    def replay(self, scrape=None, workers=1):
+        """Makes a fetcher that gets pages from the archive instead of the network.
+
+        :param scrape: String name of scrape to get pages as they were in, like in get().
+        :param workers: How many pages map() gets at the same time.
+
+        :return: ReplayFetcher instance.
+        """
+        return ReplayFetcher(self, scrape, workers)
+
+    def summary(self):
+        """String with how many pages and contents there are, and how much space they take."""
+        with self._lock:
+            pages, scrapes = self._connection.execute("SELECT COUNT(*), COUNT(DISTINCT scrape) FROM pages").fetchone()
+            contents, size, stored = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM contents").fetchone()
+        return (f"Archive: {pages} pages in {scrapes} scrapes, {contents} different contents, "
+                f"{size / 2**20:.1f} MiB compressed to {stored / 2**20:.1f} MiB.")
+
+    def close(self):
+        """Commits the pages not committed yet, and closes the file."""
+        with self._lock:
+            self._commit()
+            self._connection.close()
+
+class ReplayFetcher(Fetcher):
+    def __init__(self, archive, scrape=None, workers=1):
+        """Fetcher that gets pages from a PageArchive, without the network.
+
+        Usually made with PageArchive.replay().
+
+        :param archive: PageArchive instance.
+        :param scrape: String name of scrape to get pages as they were in, or None for the latest.
+        :param workers: How many pages map() gets at the same time.
+        """
+        super().__init__(workers=workers)
+        self.replayed = archive
+        self.scrape = scrape
+
+    def get(self, url):
+        """Gets the content of a page from the archive.
+
+        :param url: String url.
+
+        :return: Bytes with the content of the page.
+
+        :raise requests.ConnectionError: If the page isn't in the archive, like a page that
+                                         couldn't be fetched.
+        """
+        content = self.replayed.get(url, self.scrape)
+        if content is None:
+            raise requests.ConnectionError(f"'{url}' is not in the archive '{self.replayed.path}'")
+        return content
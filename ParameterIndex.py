@@ -0,0 +1,121 @@
+"""Bitsets of the courses selected by each value of the parameters of CourseListPrimitive."""
+
+import itertools
+import re
+
+from CourseGraph import CourseGraph
+
+# Bytes of a bitset written out in binary, to one byte for each course that is 1 if it is set
+_DIGIT_FLAGS = bytes.maketrans(b"01", b"\0\1")
+_FLAG_DIGITS = bytes.maketrans(b"\0\1", b"01")
+
+def bitset(flags):
+    """Makes a sequence of bools, where index i is whether course id i is set, into a bitset."""
+    return int(bytes(map(bool, flags))[::-1].translate(_FLAG_DIGITS) or b"0", 2)
+
+class ParameterIndex:
+    def __init__(self, graph, codes, columns):
+        """Index from parameter values to the courses they select, as bitsets.
+
+        Bit i of a bitset is set if the course with id i in the graph is selected, like in
+        CourseGraph.Reachability. Unions and exclusions of parameters are then just | and &~
+        of ints, and the courses are only written out as codes at the end.
+
+        Search patterns are matched against every course code the first time they are
+        used, and the matches are kept.
+
+        :param graph: CourseGraph instance of the data.
+        :param codes: Course code of each row of the data.
+        :param columns: Dict from parameter name, like 'faculty', to the value of it in each row.
+        """
+        self.graph = graph
+        self.postings = {}
+        for name, values in columns.items():
+            course_ids = {}
+            for code, value in zip(codes, values):
+                course_ids.setdefault(value, []).append(graph.ids[code])
+            self.postings[name] = {value: self.from_ids(ids) for value, ids in course_ids.items()}
+
+        self._known_codes = [code for code, known in zip(graph.codes, graph.known) if known]
+        self._patterns = {}
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Factory method for making the index from the data in a Catalog.
+
+        :param catalog: Catalog instance.
+
+        :return: ParameterIndex instance.
+        """
+        graph = catalog.derived('graph', CourseGraph.from_dataframe)
+        return cls(graph, catalog.column('coursecode'),
+                   {name: catalog.column(name) for name in ("faculty", "institute")})
+
+    def from_ids(self, course_ids):
+        """Bitset with the given course ids set."""
+        flags = bytearray(len(self.graph))
+        for course_id in course_ids:
+            flags[course_id] = 1
+        return bitset(flags)
+
+    def codes(self, bits):
+        """List of the codes of the courses in a bitset, in the order of their ids."""
+        return list(itertools.compress(self.graph.codes, bin(bits)[:1:-1].encode().translate(_DIGIT_FLAGS)))
+
+    def matching(self, regex):
+        """Bitset of the courses in the data with codes matching a regex, like re.search().
+
+        :param regex: String regular expression.
+
+        :return: Int bitset.
+        """
+        bits = self._patterns.get(regex)
+        if bits is None:
+            pattern = re.compile(regex)
+            bits = bitset([pattern.search(code) is not None for code in self._known_codes])
+            self._patterns[regex] = bits
+        return bits
+
+    def bits(self, parameter, value):
+        """Bitset of the courses selected by one value of a parameter.
+
+        :param parameter: 'faculty', 'institute', 'coursecode', or 'search', where the value
+                          is a regex.
+        :param value: String value, without any leading '-'.
+
+        :return: Int bitset. 0 if nothing is selected.
+        """
+        if parameter == "search":
+            return self.matching(value)
+        if parameter == "coursecode":
+            course_id = self.graph.ids.get(value)
+            return 0 if course_id is None else 1 << course_id
+        return self.postings[parameter].get(value, 0)
+
+    def select(self, included, excluded):
+        """Courses selected by some parameter values, without those selected by others.
+
+        Course codes that aren't in the graph at all can't be in a bitset, so they are put
+        last, in the order they were given.
+
+        :param included: List of 2-tuples with parameter name and value, as in bits().
+        :param excluded: List of 2-tuples with parameter name and value, as in bits().
+
+        :return: Tuple of course codes.
+        """
+        included_bits, unknown = self._union(included)
+        excluded_bits, unknown_excluded = self._union(excluded)
+
+        courses = self.codes(included_bits & ~excluded_bits)
+        courses.extend(code for code in dict.fromkeys(unknown) if code not in unknown_excluded)
+        return tuple(courses)
+
+    def _union(self, pairs):
+        """Bitset of the courses selected by any of the pairs, and list of codes not in the graph."""
+        bits, unknown = 0, []
+        for parameter, value in pairs:
+            if parameter == "coursecode" and value not in self.graph.ids:
+                unknown.append(value)
+            else:
+                bits |= self.bits(parameter, value)
+        return bits, unknown
@@ -0,0 +1,250 @@
+"""Local HTTP service answering searches with JSON, keeping the catalog and its indexes in memory.
+
+Start it with 'python search.py --serve', and ask it things like
+    GET /course/MAT1100              Courses MAT1100 leads to, like search.py -m
+    GET /course/MAT1100?flags=r,l    The same, with roots and leaves, like the flags of search.py
+    GET /names?q=lineær%20alg        Courses with names matching the words, like search.py -n
+    GET /stats                       Latency percentiles, and how the cache is used, and with
+                                     --timing the calls and time of each stage since it started
+"""
+
+import collections
+import concurrent.futures
+import json
+import os
+import threading
+import time
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs, unquote
+
+import instrumentation
+import search
+from CourseGraph import KINDS
+from LRUCache import LRUCache
+
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 8
+DEFAULT_CACHE_SIZE = 1024
+LATENCY_SAMPLES = 10000
+NAME_LIMIT = 10
+
+# Seconds a connection kept alive can be idle before it is closed, since it holds a worker
+IDLE_TIMEOUT = 5
+
+# Short and long names of the flags that change what is answered
+FLAGS = {"c": "compact", "r": "roots", "l": "leaves", "f": "forest"}
+
+def canonical_flags(flags):
+    """Frozenset with the long names of the known flags among flags, so both 'r' and 'roots' give the same."""
+    return frozenset(FLAGS.get(flag, flag) for flag in flags if flag in FLAGS or flag in FLAGS.values())
+
+def answer(course, flags):
+    """Makes the JSON answer to a search for a course.
+
+    :param course: Course code, string.
+    :param flags: Frozenset of flags, as made by canonical_flags().
+
+    :return: Dict, as made by search.course_record(), with the residual requirements left
+             out if flags has 'compact'. With 'roots', it also has the simplified obligatory
+             and recommended requirements of all courses leading up to the course, and with
+             'leaves' or 'forest', the courses downstream, and with 'forest' upstream, of it.
+    """
+    record = search.course_record(course)
+    if "compact" in flags:
+        for dependent in record["dependents"]:
+            del dependent["residual"]
+
+    if "roots" in flags:
+        record["roots"] = {}
+        for kind, compound in zip(KINDS, search.root_trees(course)):
+            record["roots"][kind] = compound.to_dict() if compound else None
+
+    directions = ["upstream"] if "forest" in flags else []
+    if "leaves" in flags or "forest" in flags:
+        directions.append("downstream")
+    for direction in directions:
+        record[direction] = [{"coursecode": other, "obligatory": obligatory}
+                             for other, obligatory in search.reachable_courses(course, None, direction)]
+
+    return record
+
+class SearchHandler(BaseHTTPRequestHandler):
+    """Answers GET requests for /course/<code> and /stats."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    timeout = IDLE_TIMEOUT
+
+    def do_GET(self):
+        """Answers a request, and records how long searches take."""
+        start = time.perf_counter()
+        url = urlsplit(self.path)
+        parts = [part for part in url.path.split("/") if part]
+
+        if parts == ["stats"]:
+            self.respond(200, self.server.stats())
+            return
+
+        if len(parts) == 2 and parts[0] == "course":
+            flags = [flag for value in parse_qs(url.query).get("flags", []) for flag in value.split(",")]
+            status, body = self.server.search(unquote(parts[1]).upper(), canonical_flags(flags))
+            # Recorded before answering, so /stats asked for right after includes it
+            self.server.record_latency(time.perf_counter() - start)
+            self.respond(status, body)
+        elif parts == ["names"]:
+            query = parse_qs(url.query)
+            limit = query.get("limit", [""])[0]
+            body = self.server.search_names(query.get("q", [""])[0], int(limit) if limit.isdigit() else None)
+            self.server.record_latency(time.perf_counter() - start)
+            self.respond(200, body)
+        else:
+            self.respond(404, {"error": f"Unknown path '{url.path}'. Use /course/<code>, /names?q= or /stats."})
+
+    def respond(self, status, body):
+        content = json.dumps(body, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+class SearchServer(HTTPServer):
+    def __init__(self, address=("127.0.0.1", DEFAULT_PORT), workers=DEFAULT_WORKERS,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        """HTTP server answering searches from the catalog of search.py, with a pool of workers.
+
+        Answers are cached by course code and flags. The catalog file is checked before
+        every search, and if it has changed, the catalog is opened again and the cache
+        emptied.
+
+        :param address: 2-tuple with host and port. Only listens on localhost by default.
+        :param workers: How many requests are handled at the same time.
+        :param cache_size: How many answers are cached.
+        """
+        super().__init__(address, SearchHandler)
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        self.workers = workers
+        self.cache = LRUCache(cache_size)
+
+        self.catalog_changes = 0
+        self._catalog_signature = self._signature()
+        self._latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+        self._requests = 0
+        self._lock = threading.Lock()
+        self._catalog_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        """Hands the request to a worker, instead of handling it in the thread that accepts requests."""
+        self.executor.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+    def _signature(self):
+        """Modification time and size of the catalog file, or None if it can't be read."""
+        try:
+            stat = os.stat(search.catalog.path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def check_catalog(self):
+        """Opens the catalog again and empties the cache, if the catalog file has changed.
+
+        :return: The signature of the catalog file that answers are made from.
+        """
+        signature = self._signature()
+        if signature != self._catalog_signature:
+            with self._catalog_lock:
+                if signature != self._catalog_signature:
+                    catalog = search.catalog
+                    if catalog.path.endswith('.pkl'):
+                        catalog.load()
+                    else:
+                        catalog.open()
+                    self.cache.clear()
+                    self._catalog_signature = signature
+                    self.catalog_changes += 1
+        return signature
+
+    def search(self, course, flags):
+        """Answers a search, from the cache if it has been answered before.
+
+        The signature of the catalog file is part of the key, so answers made while the
+        file changes are never used after.
+
+        :param course: Course code, string.
+        :param flags: Frozenset of flags, as made by canonical_flags().
+
+        :return: 2-tuple with HTTP status, and dict to answer with.
+        """
+        key = (self.check_catalog(), course, flags)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        codes = search.code_index()
+        if course not in codes:
+            result = 404, {"error": f"Couldn't find a course with course code '{course}'.",
+                           "suggestions": codes.suggestions(course)}
+        else:
+            result = 200, answer(codes.get(course), flags)
+        self.cache.put(key, result)
+        return result
+
+    def search_names(self, query, limit=None):
+        """Finds courses by name. Not cached, since the name index answers in well under a millisecond.
+
+        :param query: String with words, or the start of words, in the course name.
+        :param limit: Int. Most courses to answer with.
+
+        :return: Dict with the query, and a list of courses, each a dict with the code,
+                 name and score of the course, best first.
+        """
+        self.check_catalog()
+        found = search.name_index().search(query, limit or NAME_LIMIT)
+        return {"query": query, "courses": [{"coursecode": code, "coursename": name, "score": round(score, 4)}
+                                            for code, name, score in found]}
+
+    def record_latency(self, seconds):
+        """Records how long a search took, keeping the last LATENCY_SAMPLES."""
+        with self._lock:
+            self._latencies.append(seconds)
+            self._requests += 1
+
+    def stats(self):
+        """Dict with latency percentiles of the last requests, how the cache is used, and the
+        stages of all requests so far if timing is on."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            requests = self._requests
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000, 3)
+
+        stats = {
+            "requests": requests,
+            "latency_ms": {"p50": percentile(0.5), "p90": percentile(0.9), "p99": percentile(0.99),
+                           "max": percentile(1.0)},
+            "cache": {"size": len(self.cache), "maxsize": self.cache.maxsize, "hits": self.cache.hits,
+                      "misses": self.cache.misses, "hit_rate": round(self.cache.hit_rate, 4)},
+            "catalog": {"path": search.catalog.path, "changes": self.catalog_changes},
+            "workers": self.workers,
+        }
+        if instrumentation.is_enabled():
+            stats["stages"] = instrumentation.report()
+        return stats
@@ -0,0 +1,43 @@
+"""Benchmark of starting up with the pickled dataframe, against the memory mapped catalog file.
+
+Every case is run in a fresh process, so imports and reading the file are counted, and
+reports the time from start until the data is ready, and the resident memory at the end.
+Run with 'python benchmarkCatalog.py [repeats]'.
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+
+MEASURE = """
+import json, resource, time
+start = time.perf_counter()
+{code}
+print(json.dumps([time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]))
+"""
+
+CASES = {
+    "nothing": "pass",
+    "pickle, dataframe": "import pandas as pd\ncourse_df = pd.read_pickle('courses.pkl')",
+    "pickle, dataframe and graph": ("import pandas as pd\nfrom CourseGraph import CourseGraph\n"
+                                    "graph = CourseGraph.from_dataframe(pd.read_pickle('courses.pkl'))"),
+    "catalog file, graph": "from CatalogFile import CatalogFile\ngraph = CatalogFile().graph()",
+    "catalog file, dataframe and graph": ("from CatalogFile import CatalogFile\ncatalog_file = CatalogFile()\n"
+                                          "course_df, graph = catalog_file.to_dataframe(), catalog_file.graph()"),
+}
+
+def run(code):
+    output = subprocess.run([sys.executable, "-c", MEASURE.format(code=code)],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"Median of {repeats} cold starts:")
+    for name, code in CASES.items():
+        results = [run(code) for _ in range(repeats)]
+        seconds = statistics.median(result[0] for result in results)
+        resident = statistics.median(result[1] for result in results)
+        print(f"  {name:36} {seconds*1000:8.1f} ms  {resident/1024:7.1f} MiB resident")
@@ -0,0 +1,62 @@
+"""Benchmark of grow_roots on the compiled CourseGraph, against the old recursive walk.
+
+Run with 'python benchmarkGraph.py' from the repository root.
+"""
+
+import sys
+import time
+
+from Catalog import catalog
+from CourseGraph import CourseGraph
+from search import grow_roots
+
+def recursive_grow_roots(course, checked_courses, course_df):
+    """The recursive walk grow_roots used to do, with DataFrame lookups and a visited list."""
+    if course in course_df.index and course not in checked_courses:
+        checked_courses.append(course)
+        obligatory_list = course_df.at[course, 'obligatory']
+        recommended_list = course_df.at[course, 'recommended']
+        for obligatory_element in list(obligatory_list):
+            for obligatory_course in (obligatory_element if isinstance(obligatory_element, list)
+                                      else [obligatory_element]):
+                obligatory_list, recommended_list, checked_courses = recursive_new_root(
+                    obligatory_course, obligatory_list, recommended_list, checked_courses, course_df
+                )
+        return obligatory_list, recommended_list, checked_courses
+    return [], [], checked_courses
+
+def recursive_new_root(course, obligatory_list, recommended_list, checked_courses, course_df):
+    """Grows the roots of a precursor, and adds them to the lists already found."""
+    new_obligatory, new_recommended, checked_courses = \
+        recursive_grow_roots(course, checked_courses, course_df)
+    return (list(obligatory_list) + list(new_obligatory),
+            list(recommended_list) + list(new_recommended),
+            checked_courses)
+
+def time_all(function, courses, course_df):
+    """Runs function on every course, and returns the time it took in seconds."""
+    start = time.perf_counter()
+    for course in courses:
+        function(course, [], course_df)
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(10000)
+
+    course_df = catalog.df
+    course_df = course_df[~course_df.index.duplicated()]
+    catalog.set_dataframe(course_df)
+    courses = list(course_df.index)
+
+    start = time.perf_counter()
+    catalog.derived('graph', CourseGraph.from_dataframe)
+    compile_time = time.perf_counter() - start
+
+    recursive_time = time_all(recursive_grow_roots, courses, course_df)
+    compiled_time = time_all(grow_roots, courses, course_df)
+
+    print(f"Roots of all {len(courses)} courses:")
+    print(f"  recursive, DataFrame lookups: {recursive_time*1000:9.1f} ms")
+    print(f"  compiled CourseGraph:         {compiled_time*1000:9.1f} ms"
+          f" (+ {compile_time*1000:.1f} ms to compile once)")
+    print(f"  speedup: {recursive_time/compiled_time:.1f}x")
@@ -0,0 +1,73 @@
+"""Benchmark of resolving faculty, institute and search parameters with bitsets, against masks.
+
+Resolves a set of broad primitives, like '2 of faculty matnat, search MAT3...', the old way
+with a boolean mask over the dataframe for each value, and with the ParameterIndex of the
+catalog, the first time a pattern is used and after. Run with 'python benchmarkParameters.py [rounds]'.
+"""
+
+import sys
+import time
+
+from Catalog import catalog
+from CourseList import CourseListPrimitive
+from ParameterIndex import ParameterIndex
+
+PRIMITIVES = [
+    {"faculty": ["matnat"], "search": ["MAT3..."], "quantity": 2},
+    {"faculty": ["hf"], "institute": ["-ilos"]},
+    {"institute": ["ifi", "math"], "search": ["-IN1..."], "quantity": 3},
+    {"search": ["STKdddd", "MATdddd"], "quantity": 1},
+    {"faculty": ["sv", "uv"], "coursecode": ["MAT1100", "-ECON1210"]},
+]
+
+def mask_courses(primitive):
+    """The courses the way CourseListPrimitive used to find them, with masks and list.remove()."""
+    course_df = catalog.df
+    course_parameters = primitive._course_parameters
+    courses, courses_to_exclude = [], []
+    for parameter in ["faculty", "institute"]:
+        for element in course_parameters.get(parameter, ()):
+            course_list = courses_to_exclude if element[0] == "-" else courses
+            indexes = course_df[parameter] == element.lstrip("-")
+            course_list.extend(list(course_df.loc[indexes, "coursecode"].values))
+    for course in course_parameters.get("coursecode", ()):
+        (courses_to_exclude if course[0] == "-" else courses).append(course.lstrip("-"))
+    courses = list(dict.fromkeys(courses))
+    for course_to_exclude in courses_to_exclude:
+        if course_to_exclude in courses:
+            courses.remove(course_to_exclude)
+    for search_query in course_parameters.get("search", ()):
+        course_list = courses_to_exclude if search_query[0] == "-" else courses
+        indexes = course_df["coursecode"].str.contains(primitive.regexpify(search_query.lstrip("-")))
+        course_list.extend(list(course_df["coursecode"].loc[indexes]))
+    return courses
+
+def best_of(function, primitives, rounds):
+    """Fewest seconds it took to resolve every primitive once, out of rounds tries."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for primitive in primitives:
+            function(primitive)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    primitives = [CourseListPrimitive(**parameters) for parameters in PRIMITIVES]
+    catalog.df
+
+    masks = best_of(mask_courses, primitives, rounds)
+
+    start = time.perf_counter()
+    catalog.derived('parameter_index', lambda course_df: ParameterIndex.from_catalog(catalog))
+    build = time.perf_counter() - start
+    cold = best_of(CourseListPrimitive._find_courses, primitives, 1)
+    warm = best_of(CourseListPrimitive._find_courses, primitives, rounds)
+
+    per = 1e6 / len(primitives)
+    print(f"{len(primitives)} broad primitives, time per primitive:")
+    print(f"  boolean masks over the dataframe:  {masks*per:9.1f} us")
+    print(f"  bitsets, first time each pattern:  {cold*per:9.1f} us  (index built in {build*1000:.1f} ms)")
+    print(f"  bitsets, patterns seen before:     {warm*per:9.1f} us  ({masks / warm:.0f}x)")
@@ -0,0 +1,95 @@
+"""Benchmark of parsing saved pages fully, against extracting only the parts that are used.
+
+Runs over the pages in fixtures/, or the directory given as argument, and reports time
+and peak memory per page, and how the time to parse the prerequisites grows with the text.
+Run with 'python benchmarkParsing.py [directory]'.
+"""
+
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import htmlExtract
+import prerequisiteParser
+from scrapeEachCourse import get_prerequisites
+
+def full_course(content, parser='html.parser'):
+    """What scraping a course page used to do: parse everything, then find the content."""
+    return get_prerequisites(BeautifulSoup(content, parser).find(id='vrtx-course-content'))
+
+def targeted_course(content):
+    with htmlExtract.region(content, id='vrtx-course-content') as course_content:
+        return get_prerequisites(course_content)
+
+def full_listing(content, parser='html.parser'):
+    soup = BeautifulSoup(content, parser)
+    return [(link.get('href'), link.string) for link in soup.tbody.find_all('a')]
+
+def measure(function, pages):
+    """Average seconds and peak bytes of memory per page, and the results."""
+    tracemalloc.start()
+    peak = 0
+    results = []
+    for content in pages:
+        tracemalloc.reset_peak()
+        results.append(function(content))
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    repeats = max(1, 200 // len(pages))
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for content in pages:
+            function(content)
+    elapsed = (time.perf_counter() - start) / (repeats * len(pages))
+
+    return elapsed, peak, results
+
+def parse_scaling(text, factors=(1, 4, 16, 64)):
+    """Time per kilobyte to parse text repeated more and more times. Should stay flat."""
+    for factor in factors:
+        long_text = ' '.join([text] * factor)
+        repeats = max(1, 200 // factor)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            prerequisiteParser.parse(long_text)
+        elapsed = (time.perf_counter() - start) / repeats
+        print(f"  {len(long_text):9} characters {elapsed*1000:8.3f} ms  {elapsed*1e6/(len(long_text)/1024):8.1f} µs/KiB")
+
+if __name__ == '__main__':
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'fixtures'
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'rb') as page_file:
+            kind = 'listing' if 'listing' in os.path.basename(path) else 'course'
+            pages.setdefault(kind, []).append(page_file.read())
+
+    cases = {
+        'course': [('full, html.parser', full_course), ('targeted, ' + htmlExtract.PARSER, targeted_course)],
+        'listing': [('full, html.parser', full_listing), ('targeted, ' + htmlExtract.PARSER,
+                                                          htmlExtract.listing_links)],
+    }
+    if htmlExtract.PARSER != 'html.parser':
+        cases['course'].insert(1, ('full, ' + htmlExtract.PARSER,
+                                   lambda content: full_course(content, htmlExtract.PARSER)))
+
+    for kind, kind_pages in pages.items():
+        if kind == 'listing':
+            kind_pages = [content for content in kind_pages if b'<tbody' in content]
+        print(f"{len(kind_pages)} {kind} pages, {sum(map(len, kind_pages))//len(kind_pages)} bytes on average:")
+        expected = None
+        for name, function in cases[kind]:
+            elapsed, peak, results = measure(function, kind_pages)
+            same = "" if expected is None or results == expected else "  DIFFERENT RESULTS"
+            expected = results if expected is None else expected
+            print(f"  {name:24} {elapsed*1000:8.3f} ms/page  {peak/1024:8.1f} KiB peak{same}")
+
+    if 'course' in pages:
+        with htmlExtract.region(pages['course'][0], id='vrtx-course-content') as course_content:
+            text = prerequisiteParser.content_text(course_content)
+        print("Prerequisites of the first course page, repeated:")
+        parse_scaling(text)
@@ -0,0 +1,104 @@
+"""Benchmark of the interned, slotted CourseListPrimitive, against the old one with a __dict__.
+
+Makes the requirement trees of every course in the catalog with both, and compares the
+memory each primitive takes, and the time it takes to put the trees and primitives in sets
+and dicts and look them up again. Run with 'python benchmarkPrimitives.py [rounds]'.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from Catalog import catalog
+from CourseGraph import KINDS
+from CourseList import CourseListPrimitive
+
+class DictPrimitive:
+    """The parts of the old CourseListPrimitive that decide its size, hash and equality."""
+
+    def __init__(self, **course_parameters):
+        self._course_parameters = course_parameters
+        if "quantity" in course_parameters:
+            self._quantity = course_parameters["quantity"]
+        self.parent = None
+
+    @property
+    def courses(self):
+        if "_courses" not in self.__dict__:
+            self._courses = list(dict.fromkeys(self._course_parameters.get("coursecode", [])))
+        return self._courses
+
+    @property
+    def quantity(self):
+        if "_quantity" not in self.__dict__:
+            self._quantity = len(self.courses)
+        return self._quantity
+
+    def __hash__(self):
+        return hash((", ".join(self.courses), self.quantity))
+
+    def __eq__(self, other):
+        return isinstance(other, DictPrimitive) and hash(self) == hash(other)
+
+def make_trees(primitive_class, nested_lists):
+    """Requirement trees as tuples of primitives, made like CompoundCourseList.from_nested_list()."""
+    trees = []
+    for nested_list in nested_lists:
+        primitives, obligatory = [], []
+        for element in nested_list:
+            if isinstance(element, list):
+                primitives.append(primitive_class(coursecode=element, quantity=1))
+            else:
+                obligatory.append(element)
+        primitives.append(primitive_class(coursecode=obligatory))
+        for primitive in primitives:
+            primitive.courses
+        trees.append(tuple(primitives))
+    return trees
+
+def memory(primitive_class, nested_lists):
+    """Trees, and bytes allocated while making them, with the nested lists already in memory."""
+    gc.collect()
+    tracemalloc.start()
+    trees = make_trees(primitive_class, nested_lists)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return trees, allocated
+
+def set_and_dict(trees, rounds):
+    """Seconds to put every tree and primitive in a set and a dict, and look them all up."""
+    primitives = [primitive for tree in trees for primitive in tree]
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        tree_set, primitive_set = set(trees), set(primitives)
+        counts = {}
+        for primitive in primitives:
+            counts[primitive] = counts.get(primitive, 0) + 1
+        assert all(tree in tree_set for tree in trees)
+        assert all(primitive in primitive_set for primitive in primitives)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    nested_lists = [nested_list for kind in KINDS for nested_list in catalog.column(kind)
+                    if nested_list]
+
+    old_trees, old_bytes = memory(DictPrimitive, nested_lists)
+    new_trees, new_bytes = memory(CourseListPrimitive, nested_lists)
+    primitives = sum(len(tree) for tree in new_trees)
+    distinct = len({id(primitive) for tree in new_trees for primitive in tree})
+
+    old_time = set_and_dict(old_trees, rounds)
+    new_time = set_and_dict(new_trees, rounds)
+
+    print(f"{len(new_trees)} requirement trees, with {primitives} primitives ({distinct} distinct):")
+    print(f"  memory, __dict__ and no sharing:  {old_bytes / primitives:7.0f} bytes per primitive")
+    print(f"  memory, __slots__ and interning:  {new_bytes / primitives:7.0f} bytes per primitive"
+          f"  ({old_bytes / new_bytes:.1f}x less)")
+    print(f"  sets and dicts, hash of courses:  {old_time*1000:7.1f} ms")
+    print(f"  sets and dicts, hash made once:   {new_time*1000:7.1f} ms"
+          f"  ({old_time / new_time:.1f}x)")
@@ -0,0 +1,50 @@
+"""Benchmark of answering the same queries again, with the requirement trees made once and shared.
+
+Answers a set of popular courses, with and without roots, in a cold process and then once
+more, and compares with making every requirement tree again for each query, like before.
+Run with 'python benchmarkQueries.py [rounds]'.
+"""
+
+import contextlib
+import io
+import sys
+import time
+
+import search
+from Catalog import catalog
+from LRUCache import LRUCache
+
+COURSES = ["MAT1100", "MAT1110", "MAT1120", "IN1000", "IN1010", "IN2010", "FYS-MEK1110", "STK1100"]
+COMMANDS = [f"{course}{flags}" for course in COURSES for flags in ["", " -r"]]
+
+def answer_all():
+    """Seconds to answer every command once, with the answers thrown away."""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for command in COMMANDS:
+            search.run_command(command)
+    return time.perf_counter() - start
+
+class Uncached(LRUCache):
+    """Cache that never keeps anything, so every tree is made again."""
+
+    def put(self, key, value):
+        pass
+
+if __name__ == '__main__':
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    catalog.derived('requirement_trees', lambda _: Uncached(0))
+    answer_all()
+    uncached = min(answer_all() for _ in range(rounds))
+
+    catalog.open()
+    cold = answer_all()
+    warm = min(answer_all() for _ in range(rounds))
+    cache = catalog.derived('requirement_trees', None)
+
+    print(f"{len(COMMANDS)} queries:")
+    print(f"  trees made every time:   {uncached*1000:8.2f} ms")
+    print(f"  shared trees, first time: {cold*1000:7.2f} ms")
+    print(f"  shared trees, again:     {warm*1000:8.2f} ms  ({uncached/warm:.0f}x)")
+    print(f"  {len(cache)} trees cached, hit rate {cache.hit_rate:.1%}")
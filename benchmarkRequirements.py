@@ -0,0 +1,82 @@
+"""Scaling benchmark of requirementEngine against enumerating course combinations.
+
+Uses synthetic trees of 'k of n' primitives, alone and in an 'and' compound, so the
+course data isn't needed. Run with 'python benchmarkRequirements.py'.
+"""
+
+import math
+import time
+
+from CourseList import CourseListPrimitive, CompoundCourseList
+import requirementEngine
+
+MAX_COMBINATIONS = 2 * 10**6
+
+def synthetic_primitive(n, k, prefix="C"):
+    """CourseListPrimitive with n made up courses, k of which have to be taken."""
+    return CourseListPrimitive(coursecode=[f"{prefix}{i:04}" for i in range(n)], quantity=k)
+
+def synthetic_compound(width, n, k):
+    """'and' compound of width 'k of n' primitives with different courses."""
+    return CompoundCourseList(
+        *[synthetic_primitive(n, k, prefix=f"C{j}X") for j in range(width)], relationship="and"
+    )
+
+def combinations_count(course_list):
+    """Number of combinations course_combinations would go through."""
+    if isinstance(course_list, CourseListPrimitive):
+        return math.comb(len(course_list.courses), course_list.quantity)
+    return math.prod(combinations_count(child) for child in course_list.children)
+
+def enumerated_implies(course_list, other):
+    """Implication the way it is done with combinations: other holds for every combination."""
+    return all(requirementEngine.is_fulfilled(other, set(combo))
+               for combo in course_list.course_combinations)
+
+def enumerated_residual(course_list, taken):
+    """The parts left of every combination, the way requirements_not_implied_by used to do it."""
+    not_fulfilled = []
+    for combo in course_list.course_combinations:
+        part = [course for course in combo if course not in taken]
+        if not part:
+            return []
+        not_fulfilled.append(part)
+    return not_fulfilled
+
+def time_call(function, *args):
+    """Seconds one call takes, averaged over enough calls to take about 0.2 seconds."""
+    calls, elapsed = 1, 0
+    while elapsed < 0.2:
+        start = time.perf_counter()
+        for _ in range(calls):
+            function(*args)
+        elapsed = time.perf_counter() - start
+        calls *= 4
+    return elapsed / (calls // 4)
+
+def format_count(count):
+    return f"{count:,}" if count < 10**7 else f"~1e{len(str(count)) - 1}"
+
+def format_time(seconds):
+    return "skipped" if seconds is None else f"{seconds*1e3:10.3f} ms"
+
+if __name__ == '__main__':
+    cases = [(f"{n//2} of {n}", synthetic_primitive(n, n // 2)) for n in [10, 20, 26, 100, 1000, 10000]]
+    cases += [(f"and of {width} x ({n//2} of {n})", synthetic_compound(width, n, n // 2))
+              for width, n in [(2, 10), (3, 10), (4, 12), (10, 100), (100, 100)]]
+
+    print(f"{'tree':28} {'combinations':>14} {'operation':>10} {'combinations':>14} {'engine':>14}")
+    for name, course_list in cases:
+        count = combinations_count(course_list)
+        taken = set(course_list.courses[::3])
+        weaker = requirementEngine.residual(course_list, set(course_list.courses[:1]))
+
+        operations = [
+            ("implies", enumerated_implies, requirementEngine.implies, (course_list, weaker)),
+            ("residual", enumerated_residual, requirementEngine.residual, (course_list, taken)),
+        ]
+        for operation, enumerated, engine, args in operations:
+            enumerated_time = time_call(enumerated, *args) if count <= MAX_COMBINATIONS else None
+            engine_time = time_call(engine, *args)
+            print(f"{name:28} {format_count(count):>14} {operation:>10} {format_time(enumerated_time):>14}"
+                  f" {format_time(engine_time):>14}")
@@ -0,0 +1,48 @@
+"""Benchmark of the time from launching search.py until it has answered a lookup.
+
+Every lookup is a fresh process, like when search.py is called from a script. Compares
+answering straight from the catalog file with loading the whole dataframe first, like
+search.py used to. Run with 'python benchmarkStartup.py [repeats]'.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+LOOKUPS = ["IN2010", "MAT1100 -c", "MAT1110 -r", "IN1000 -l"]
+
+DATAFRAME_FIRST = """
+import sys
+import pandas as pd
+from Catalog import catalog
+import search
+course_df = pd.read_pickle('courses.pkl')
+course_df.set_index('coursecode', drop=False, inplace=True)
+catalog.set_dataframe(course_df)
+search.run_command(' '.join(sys.argv[1:]), course_df)
+"""
+
+CASES = {
+    "dataframe first": [sys.executable, "-c", DATAFRAME_FIRST],
+    "python search.py": [sys.executable, "search.py"],
+    "python -m search": [sys.executable, "-m", "search"],
+}
+
+def launch(command):
+    """Seconds from launching a process until it has exited."""
+    start = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"Median of {repeats} launches, from launch until answered:")
+    seconds = statistics.median(launch([sys.executable, "-c", "pass"]) for _ in range(repeats))
+    print(f"  python doing nothing   {seconds*1000:8.1f} ms")
+    for lookup in LOOKUPS:
+        print(f"  search.py {lookup}")
+        for name, command in CASES.items():
+            seconds = statistics.median(launch(command + lookup.split()) for _ in range(repeats))
+            print(f"    {name:20} {seconds*1000:8.1f} ms")
@@ -0,0 +1,181 @@
+"""Benchmark suite of the query path, that fails when something has become slower.
+
+Times search_single_course, grow_roots, CourseListPrimitive.courses,
+CompoundCourseList.simplify and studyPlanner.plan on popular courses, and on the courses
+that are the most work for each of them, and measures how much memory each allocates.
+Everything runs on the course data in the repository, without network.
+
+    python benchmarkSuite.py                                  Writes benchmarkResults.json
+    python benchmarkSuite.py --baseline old.json              Exits with 1 if anything got slower
+    python benchmarkSuite.py --baseline old.json --threshold 0.5 --output new.json
+
+A case has regressed when its fastest time or its peak allocation is more than threshold
+larger than in the baseline. The fastest time is compared, since it varies least between
+runs, and times below --noise-ms are never counted as regressions. Timings of the same
+code can differ by more than a third between processes on a busy or virtual machine, so
+compare runs made on the same machine, and don't make the threshold much tighter than 0.5.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import search
+from Catalog import catalog
+from CourseGraph import CourseGraph, Reachability, bit_ids
+from CourseList import CourseListPrimitive, CompoundCourseList
+from LRUCache import LRUCache
+import studyPlanner
+
+# Popular courses to search for, and popular courses with precursors to grow roots of
+HOT_COURSES = ["MAT1100", "IN1000", "STK1100", "FYS-MEK1110"]
+HOT_ROOTS = ["MAT1120", "IN2010", "STK2100", "FYS2140"]
+WORST_CASES = 3
+PRIMITIVES = {
+    "codes": {"coursecode": ["MAT1100", "MAT1110", "MAT1120", "-MAT1110"]},
+    "faculty": {"faculty": ["matnat"], "search": ["MAT3..."], "quantity": 2},
+    "exclusions": {"faculty": ["hf", "sv"], "institute": ["-ilos"], "search": ["-ECONdddd"]},
+}
+
+def quiet(function):
+    """Runs function with its printing thrown away."""
+    def run(*args):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return function(*args)
+    return run
+
+def most_dependents(count, exclude=()):
+    """Codes of the courses that are precursors to the most rows."""
+    dependents = search.indexed('dependents', search.make_dependents_index, None)
+    codes = [code for code in dependents if code not in exclude]
+    return sorted(codes, key=lambda code: (-len(dependents[code]), code))[:count]
+
+def most_ancestors(count):
+    """Codes of the courses in the data with the most courses upstream of them."""
+    graph = search.indexed('graph', CourseGraph.from_dataframe, None)
+    reachability = Reachability(graph)
+    known = [course_id for course_id in range(len(graph)) if graph.known[course_id]]
+    known.sort(key=lambda course_id: (-len(bit_ids(reachability.ancestors(course_id))), graph.codes[course_id]))
+    return [graph.codes[course_id] for course_id in known[:count]]
+
+def cases():
+    """Dict from case name to 2-tuple of setup and run functions. Setup is called before
+    each run, and what it returns is given to run, so only run is measured."""
+    def drop_requirement_trees():
+        catalog.derived('requirement_trees', lambda _: LRUCache(search.REQUIREMENT_CACHE_SIZE)).clear()
+
+    cases = {}
+    for group, courses in [("hot", HOT_COURSES), ("worst", most_dependents(WORST_CASES, HOT_COURSES))]:
+        for course in courses:
+            cases[f"search_single_course/{group}/{course}"] = (
+                drop_requirement_trees, lambda _, course=course: quiet(search.search_single_course)(course, None, []))
+            cases[f"search_single_course/{group}/{course}/roots"] = (
+                drop_requirement_trees, lambda _, course=course: quiet(search.search_single_course)(course, None, ["r"]))
+
+    for group, courses in [("hot", HOT_ROOTS), ("worst", most_ancestors(WORST_CASES))]:
+        for course in courses:
+            cases[f"grow_roots/{group}/{course}"] = (
+                lambda: None, lambda _, course=course: search.grow_roots(course, [], None))
+
+            def unsimplified(course=course):
+                return CompoundCourseList.from_nested_list(search.grow_roots(course, [], None)[0])
+            cases[f"CompoundCourseList.simplify/{group}/{course}"] = (unsimplified, CompoundCourseList.simplify)
+            cases[f"studyPlanner.plan/{group}/{course}"] = (
+                lambda: search.indexed('graph', CourseGraph.from_dataframe, None),
+                lambda graph, course=course: studyPlanner.plan(graph, course))
+
+    for name, parameters in PRIMITIVES.items():
+        # The courses are kept once found, so finding them is measured directly
+        cases[f"CourseListPrimitive.courses/{name}"] = (
+            lambda parameters=parameters: CourseListPrimitive(**parameters), CourseListPrimitive._find_courses)
+
+    return cases
+
+def measure(setup, run, repeats):
+    """Times run repeats times, after a warm up, and measures what it allocates once.
+
+    :return: Dict with median and fastest time in milliseconds, and peak allocation in KiB.
+    """
+    run(setup())
+    times = []
+    for _ in range(repeats):
+        argument = setup()
+        # Like timeit, so a collection that happens to start during a run isn't measured
+        gc.disable()
+        start = time.perf_counter()
+        run(argument)
+        times.append(time.perf_counter() - start)
+        gc.enable()
+
+    argument = setup()
+    tracemalloc.start()
+    run(argument)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"median_ms": round(statistics.median(times) * 1000, 4), "min_ms": round(min(times) * 1000, 4),
+            "peak_kib": round(peak / 1024, 1)}
+
+def regressions(results, baseline, threshold, noise_ms=0.05):
+    """Finds the cases that have become slower or allocate more than in a baseline.
+
+    :param results: Dict from case name to measurement, as made by measure().
+    :param baseline: Dict like results. Cases only in one of them are left out.
+    :param threshold: Float. Largest increase that is accepted, like 0.25 for 25 %.
+    :param noise_ms: Float. Times below this are never regressions.
+
+    :return: List of 4-tuples with case name, what regressed ('min_ms' or 'peak_kib'),
+             the baseline value and the new value.
+    """
+    found = []
+    for name, measured in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        if measured["min_ms"] > before["min_ms"] * (1 + threshold) and measured["min_ms"] > noise_ms:
+            found.append((name, "min_ms", before["min_ms"], measured["min_ms"]))
+        if measured["peak_kib"] > before["peak_kib"] * (1 + threshold) + 1:
+            found.append((name, "peak_kib", before["peak_kib"], measured["peak_kib"]))
+    return found
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks the query path, and compares with a baseline.")
+    parser.add_argument('--catalog', default='courses.pkl', help="Course data, a pickle or catalog file.")
+    parser.add_argument('--output', default='benchmarkResults.json', help="File to write results to.")
+    parser.add_argument('--baseline', help="Results from before, to compare with.")
+    parser.add_argument('--threshold', type=float, default=0.5,
+                        help="Largest accepted increase in time or memory, 0.5 by default.")
+    parser.add_argument('--noise-ms', type=float, default=0.05,
+                        help="Times below this many milliseconds are never regressions.")
+    parser.add_argument('--repeats', type=int, default=15, help="Times to run each case.")
+    args = parser.parse_args()
+
+    catalog.load(args.catalog)
+
+    results = {}
+    for name, (setup, run) in cases().items():
+        results[name] = measure(setup, run, args.repeats)
+        print(f"{name:52} {results[name]['min_ms']:9.3f} ms fastest {results[name]['median_ms']:9.3f} ms median"
+              f" {results[name]['peak_kib']:9.1f} KiB")
+
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump({"catalog": args.catalog, "python": platform.python_version(), "repeats": args.repeats,
+                   "results": results}, output, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}.")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        found = regressions(results, baseline, args.threshold, args.noise_ms)
+        for name, measure_name, before, after in found:
+            print(f"Regression in {name}: {measure_name} {before} -> {after}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+        print(f"No regressions over {args.threshold:.0%} against {args.baseline}.")
@@ -0,0 +1,75 @@
+import hashlib
+import os
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+import pandas as pd
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """Serves fixture pages like the course pages at UiO, and fails when asked to."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        course_match = re.search(r"/studier/emner/\w+/\w+/([\w\-]+)/$", self.path)
+        listing_match = re.search(r"/studier/emner/alle/\?page=(\d+)$", self.path)
+        if course_match:
+            fixture = os.path.join(FIXTURES, f"course_{course_match.group(1)}.html")
+        elif listing_match:
+            has_results = int(listing_match.group(1)) < self.server.listing_pages
+            fixture = os.path.join(FIXTURES, "listing.html" if has_results else "listing_empty.html")
+        else:
+            fixture = ""
+
+        if self.server.failures.get(self.path, 0) > 0:
+            self.server.failures[self.path] -= 1
+            self.respond(503, b"Try again later")
+        elif os.path.exists(fixture):
+            with open(fixture, "rb") as fixture_file:
+                body = fixture_file.read()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.respond(304, b"", {"ETag": etag})
+            else:
+                self.respond(200, body, {"ETag": etag})
+        else:
+            self.respond(404, b"<html><body>Not found</body></html>")
+
+    def respond(self, status, body, headers={}):
+        self.send_response(status)
+        for header, value in headers.items():
+            self.send_header(header, value)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def fixture_server():
+    """Local stand-in for www.uio.no, serving the pages in fixtures/."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.requests, server.failures, server.listing_pages = [], {}, 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def course_df():
+    """Courses with pages in fixtures/, and one without, five times over."""
+    codes = ["MAT1110", "IN2010", "FIL1000", "MISSING1000"] * 5
+    return pd.DataFrame({
+        "coursecode": codes,
+        "faculty": ["matnat"] * len(codes),
+        "institute": ["math"] * len(codes),
+    })
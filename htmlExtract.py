@@ -0,0 +1,62 @@
+"""Extraction of the parts of pages the scrapers need, without parsing the rest.
+
+Uses lxml to parse if it is installed, since it is much faster than the parser that
+comes with Python, and falls back to 'html.parser' otherwise.
+"""
+
+import contextlib
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml
+    PARSER = 'lxml'
+except ImportError:
+    PARSER = 'html.parser'
+
+@contextlib.contextmanager
+def region(content, name=None, **attributes):
+    """Parses only the first tag with some name and attributes, and frees it afterwards.
+
+    Everything outside the tag is skipped while parsing, so no tree is built for it.
+    The tree is decomposed when the with-block ends, so nothing from it should be kept
+    except what has been extracted.
+
+        with region(content, id='vrtx-course-content') as course_content:
+            prerequisites = get_prerequisites(course_content)
+
+    :param content: Bytes or string with HTML.
+    :param name: Name of tag, like 'tbody'. Any tag if None.
+    :param **attributes: Attributes of tag, like id='vrtx-course-content'.
+
+    :yield: bs4.Tag instance, or None if there is no such tag.
+    """
+    soup = BeautifulSoup(content, PARSER, parse_only=SoupStrainer(name, attributes))
+    try:
+        yield soup.find(name, attributes)
+    finally:
+        soup.decompose()
+
+def has_tag_id(content, tag_id):
+    """Checks if a page has a tag with some id, without parsing it.
+
+    :param content: Bytes with HTML.
+    :param tag_id: String id.
+
+    :return: Bool.
+    """
+    pattern = rb'\sid\s*=\s*["\']?' + re.escape(tag_id.encode()) + rb'(?![\w\-])'
+    return re.search(pattern, content) is not None
+
+def listing_links(content):
+    """Finds the links in the table of a search page.
+
+    :param content: Bytes with HTML of search page.
+
+    :return: List of 2-tuples with href and text of each link.
+    """
+    with region(content, 'tbody') as tbody:
+        if tbody is None:
+            return []
+        return [(link.get('href'), link.string) for link in tbody.find_all('a')]
@@ -0,0 +1,160 @@
+"""Opt-in timing of the stages of a search, and profiling of single queries.
+
+Functions are marked as stages with the stage() decorator. That only registers them, so
+while timing is off they are called as they are, without any overhead. enable() replaces
+them with timed versions, where they are defined, and disable() puts them back.
+
+Timing is turned on by setting the environment variable COURSE_SEARCH_TIMING to 1, or by
+giving search.py --timing. Each query then gets a line of JSON on stderr with the wall time
+and number of calls of every stage, see query(). COURSE_SEARCH_PROFILE, or --profile, is a
+path to dump a cProfile of each query to, that can be read with pstats.
+"""
+
+import contextlib
+import cProfile
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+TIMING_VARIABLE = "COURSE_SEARCH_TIMING"
+PROFILE_VARIABLE = "COURSE_SEARCH_PROFILE"
+
+# Registered stages, as 3-tuples of module name, qualified name of function and stage name
+_stages = []
+# Original functions of the stages that are timed now, by module and qualified name
+_originals = {}
+# Stage name to list of calls and seconds, for all queries since the last reset()
+_stats = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+_enabled = os.environ.get(TIMING_VARIABLE, "") not in ("", "0")
+profile_path = os.environ.get(PROFILE_VARIABLE) or None
+
+def stage(name=None):
+    """Decorator marking a function or method as a stage of a search, to be timed when enabled.
+
+    Put it below @classmethod or @staticmethod. Recursive calls are counted, but only the
+    outermost call is timed, so time isn't counted twice.
+
+    :param name: String name of stage. The qualified name of the function by default, with
+                 the module in front for functions that aren't methods.
+    """
+    def register(function):
+        qualname = function.__qualname__
+        module = function.__module__
+        if module == "__main__":
+            module = os.path.splitext(os.path.basename(function.__globals__.get("__file__", module)))[0]
+        stage_name = name or (qualname if "." in qualname else f"{module}.{qualname}")
+        _stages.append((function.__module__, qualname, stage_name))
+        if _enabled:
+            _originals[function.__module__, qualname] = function
+            return _timed(function, stage_name)
+        return function
+    return register
+
+def _timed(function, name):
+    """Wraps function, so its calls and time are recorded under name."""
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        depths = _local.__dict__
+        depth = depths.get(name, 0)
+        depths[name] = depth + 1
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            depths[name] = depth
+            with _lock:
+                record = _stats.setdefault(name, [0, 0.0])
+                record[0] += 1
+                if depth == 0:
+                    record[1] += elapsed
+    return timed
+
+def _owner(module_name, qualname):
+    """The module or class a function is defined in, and the name it has there."""
+    owner = sys.modules[module_name]
+    *path, attribute = qualname.split(".")
+    for part in path:
+        owner = getattr(owner, part)
+    return owner, attribute
+
+def _replace(owner, attribute, function):
+    """Sets an attribute to function, keeping it a classmethod or staticmethod if it was one."""
+    current = vars(owner).get(attribute)
+    if isinstance(current, (classmethod, staticmethod)):
+        function = type(current)(function)
+    setattr(owner, attribute, function)
+
+def enable():
+    """Turns on timing of all stages registered so far, and of stages registered after."""
+    global _enabled
+    _enabled = True
+    for module_name, qualname, name in _stages:
+        if (module_name, qualname) in _originals or module_name not in sys.modules:
+            continue
+        owner, attribute = _owner(module_name, qualname)
+        original = getattr(owner, attribute)
+        original = getattr(original, "__func__", original)
+        _originals[module_name, qualname] = original
+        _replace(owner, attribute, _timed(original, name))
+
+def disable():
+    """Turns off timing, putting back the original functions."""
+    global _enabled
+    _enabled = False
+    for (module_name, qualname), original in _originals.items():
+        owner, attribute = _owner(module_name, qualname)
+        _replace(owner, attribute, original)
+    _originals.clear()
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """Forgets all calls and times recorded so far."""
+    with _lock:
+        _stats.clear()
+
+def report():
+    """Dict from stage name to dict with number of calls and milliseconds, since the last reset()."""
+    with _lock:
+        return {name: {"calls": calls, "ms": round(seconds * 1000, 3)}
+                for name, (calls, seconds) in sorted(_stats.items())}
+
+@contextlib.contextmanager
+def query(description, output=sys.stderr):
+    """Times and profiles a query, if timing or profiling is on. Does nothing otherwise.
+
+    With timing on, writes a line of JSON to output when the query is done, with the
+    description, the wall time of the whole query, and report() for the stages in it.
+    With a profile_path, dumps a cProfile of the query there, replacing what was there.
+
+    :param description: String describing the query, like the command that was typed.
+    :param output: File to write the JSON to. stderr by default, since stdout has the answer.
+    """
+    if not _enabled and profile_path is None:
+        yield
+        return
+
+    profiler = cProfile.Profile() if profile_path is not None else None
+    reset()
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        if _enabled:
+            output.write(json.dumps({"query": description,
+                                     "ms": round((time.perf_counter() - start) * 1000, 3),
+                                     "stages": report()}, ensure_ascii=False) + "\n")
+            output.flush()
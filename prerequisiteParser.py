@@ -0,0 +1,144 @@
+"""Parsing of the prerequisites on a course page, in one pass over the text.
+
+The text of the course content is read once to find where the sections with obligatory
+and recommended prerequisites are, and then once more inside each section, where course
+codes and the words between them are read as tokens. Every pattern is compiled once, and
+the sections are scanned in place with the pos and endpos of the patterns, so no part of
+the text is copied.
+
+The parsed lists look like
+    [['either this course', 'or this'], ['also either this', 'or this'], 'and this']
+"""
+
+import re
+
+from bs4 import NavigableString
+
+UNCLEAN = re.compile(r'[<>\\\n]')
+
+# Headings of the sections, in English and Norwegian. A section goes on until the next
+# heading, or until one of the headings in 'end'.
+SECTION = re.compile(
+    r'(?P<obligatory>Formal prerequisites|Obligatoriske forkunnskaper)'
+    r'|(?P<recommended>Recommended previous knowledge|Anbefalte forkunnskaper)'
+    r'|(?P<end>Overlapping courses|Overlappende emner|Undervisning|Teaching)'
+)
+
+# Two course codes are interchangeable when there is an alternative between them, like
+# 'MAT1100/MAT1110' or 'MAT1100 eller MAT1110', unless there is also an 'og'.
+TOKEN = re.compile(
+    r'(?P<code>[A-ZÆØÅ\-]+\d+[A-ZÆØÅ\-]{0,6}\d{0,2})'
+    r'|(?P<alternative>/|(?<=[ (])(?:eller|or) )'
+    r'|(?P<conjunction>og )'
+)
+
+def is_clean(string):
+    """Checks if string has no very special characters.
+
+    :param string: String to check.
+
+    :return: Boolean indicating whether there are special characters or not.
+    """
+    return not UNCLEAN.search(string)
+
+def content_text(content_tag):
+    """Joins the clean strings in the content tag of a course page.
+
+    :param content_tag: bs4.Tag instance of content tag in course page.
+
+    :return: String.
+    """
+    return ' '.join(string for string in content_tag.descendants
+                    if isinstance(string, NavigableString) and is_clean(string))
+
+def sections(text):
+    """Finds where the obligatory and recommended prerequisites are in the text of a course page.
+
+    A section without a heading is None. A section without an end goes on until the
+    second last character of the text.
+
+    :param text: String with text of course page.
+
+    :return: 2-tuple with obligatory and recommended sections, each a 2-tuple with start
+             and end index in text, or None.
+    """
+    obligatory = recommended = None
+    ends = []
+    for match in SECTION.finditer(text):
+        if match.lastgroup == 'end':
+            ends.append(match.start())
+        elif match.lastgroup == 'obligatory' and obligatory is None:
+            obligatory = match
+        elif match.lastgroup == 'recommended' and recommended is None:
+            recommended = match
+
+    # The sections end at the first end after both headings, if any
+    obligatory_start = obligatory.end() if obligatory else None
+    recommended_start = recommended.end() if recommended else None
+    obligatory_end = recommended.start() if recommended else None
+    recommended_end = None
+
+    starts = [start for start in (obligatory_start, recommended_start) if start is not None]
+    if starts:
+        end = next((end for end in ends if end >= max(starts)), None)
+        if end is not None:
+            recommended_end = end
+            if recommended is None:
+                obligatory_end = end
+
+    def span(start, end):
+        if start is None and end is None:
+            return None
+        if start is None:
+            return (end, end)
+        if end is None:
+            end = len(text) - 1
+        return (start, max(start, end))
+
+    return span(obligatory_start, obligatory_end), span(recommended_start, recommended_end)
+
+def parse_section(text, start=0, end=None):
+    """Makes a nested list of the course codes in a section of text, and their relations.
+
+    :param text: String with text of course page.
+    :param start: Index in text where the section starts.
+    :param end: Index in text where the section ends, or None for the end of the text.
+
+    :return: List of course codes, and lists of interchangeable course codes.
+    """
+    courselist, group = [], []
+    previous, alternative, conjunction = None, False, False
+    for match in TOKEN.finditer(text, start, len(text) if end is None else end):
+        kind = match.lastgroup
+        if kind == 'alternative':
+            alternative = True
+        elif kind == 'conjunction':
+            conjunction = True
+        else:
+            if previous is not None:
+                if alternative and not conjunction:
+                    group.append(previous)
+                elif group:
+                    group.append(previous)
+                    courselist.append(group)
+                    group = []
+                else:
+                    courselist.append(previous)
+            previous, alternative, conjunction = match.group(), False, False
+
+    if group:
+        group.append(previous)
+        courselist.append(group)
+    elif previous is not None:
+        courselist.append(previous)
+
+    return courselist
+
+def parse(text):
+    """Makes lists of the obligatory and recommended prerequisites in the text of a course page.
+
+    :param text: String with text of course page.
+
+    :return: 2-tuple of obligatory and recommended lists.
+    """
+    return tuple(parse_section(text, *section) if section else [] for section in sections(text))
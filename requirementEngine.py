@@ -0,0 +1,167 @@
+"""Evaluation of requirements directly on CourseList trees, without enumerating combinations.
+
+A CourseListPrimitive is fulfilled when at least quantity of its courses are taken, and a
+CompoundCourseList when all ('and') or any ('or') of its children are. Everything here
+works by counting courses against that threshold, and with set operations, so the cost
+grows with the size of the tree, not with the number of ways to fulfill it.
+"""
+
+import CourseList
+
+def is_primitive(course_list):
+    return isinstance(course_list, CourseList.CourseListPrimitive)
+
+def distinct_courses(primitive):
+    """List of the courses of a primitive, without duplicates, in order."""
+    return list(dict.fromkeys(primitive.courses))
+
+def is_fulfilled(course_list, taken):
+    """Checks if a set of taken courses fulfills the requirements of a course list.
+
+    :param course_list: CourseListPrimitive or CompoundCourseList.
+    :param taken: Set of course codes.
+
+    :return: Bool.
+    """
+    if is_primitive(course_list):
+        courses = distinct_courses(course_list)
+        return sum(course in taken for course in courses) >= min(course_list.quantity, len(courses))
+
+    fulfilled = (is_fulfilled(child, taken) for child in course_list.children)
+    if course_list.relationship == "and" or not course_list.children:
+        return all(fulfilled)
+    return any(fulfilled)
+
+def guaranteed_courses(course_list):
+    """Set of courses that are taken in every way to fulfill a course list.
+
+    :param course_list: CourseListPrimitive or CompoundCourseList.
+
+    :return: Set of course codes.
+    """
+    if is_primitive(course_list):
+        courses = distinct_courses(course_list)
+        return set(courses) if course_list.quantity >= len(courses) else set()
+
+    child_sets = [guaranteed_courses(child) for child in course_list.children]
+    if not child_sets:
+        return set()
+    if course_list.relationship == "and":
+        return set().union(*child_sets)
+    return set.intersection(*child_sets)
+
+def min_cost(course_list, costed):
+    """The fewest courses among costed that have to be taken to fulfill a course list.
+
+    Exact when the children of every 'and' share no costed courses. When they do, the
+    largest cost of a single child is used, so the result is never higher than the true
+    minimum.
+
+    :param course_list: CourseListPrimitive or CompoundCourseList.
+    :param costed: Set of course codes that count.
+
+    :return: Int.
+    """
+    if is_primitive(course_list):
+        courses = distinct_courses(course_list)
+        free = sum(course not in costed for course in courses)
+        return max(0, min(course_list.quantity, len(courses)) - free)
+
+    costs = [min_cost(child, costed) for child in course_list.children]
+    if not costs:
+        return 0
+    if course_list.relationship == "or":
+        return min(costs)
+
+    seen, overlapping = set(), False
+    for child in course_list.children:
+        child_costed = set(child.courses) & costed
+        if seen & child_costed:
+            overlapping = True
+            break
+        seen |= child_costed
+    return max(costs) if overlapping else sum(costs)
+
+def implies(course_list, other):
+    """Checks if other HAS to be fulfilled for course_list to be fulfilled.
+
+    Decided by splitting up 'and' on the right side and 'or' on the left side, and then
+    checking if the fewest courses of a primitive on the right side that can be taken while
+    fulfilling the left side is enough. Never says True when it isn't.
+
+    :param course_list: CourseListPrimitive or CompoundCourseList.
+    :param other: String course code, CourseListPrimitive or CompoundCourseList.
+
+    :return: Bool.
+    """
+    if isinstance(other, str):
+        return min_cost(course_list, {other}) >= 1
+
+    if not is_primitive(other) and (other.relationship == "and" or not other.children):
+        return all(implies(course_list, child) for child in other.children)
+
+    if not is_primitive(course_list) and course_list.relationship == "or":
+        if not course_list.children:
+            return is_fulfilled(other, set())
+        return all(implies(child, other) for child in course_list.children)
+
+    if is_primitive(other):
+        courses = distinct_courses(other)
+        return min_cost(course_list, set(courses)) >= min(other.quantity, len(courses))
+
+    if any(implies(course_list, child) for child in other.children):
+        return True
+    if not is_primitive(course_list):
+        return any(implies(child, other) for child in course_list.children)
+    return False
+
+def residual(course_list, taken):
+    """Makes the requirements that are still left after some courses are taken.
+
+    :param course_list: CourseListPrimitive or CompoundCourseList.
+    :param taken: Set of course codes.
+
+    :return: New CourseListPrimitive or CompoundCourseList, of the same type as course_list.
+             Empty if the requirements are fulfilled.
+    """
+    if is_primitive(course_list):
+        courses = distinct_courses(course_list)
+        remaining = min(course_list.quantity, len(courses)) - sum(course in taken for course in courses)
+        if remaining <= 0:
+            return CourseList.CourseListPrimitive()
+
+        left = [course for course in courses if course not in taken]
+        if remaining == len(left):
+            return CourseList.CourseListPrimitive(coursecode=left)
+        return CourseList.CourseListPrimitive(coursecode=left, quantity=remaining)
+
+    if course_list.relationship == "or" and is_fulfilled(course_list, taken):
+        return CourseList.CompoundCourseList(relationship="or")
+
+    children = [residual(child, taken) for child in course_list.children
+                if not is_fulfilled(child, taken)]
+    return CourseList.CompoundCourseList(*children, relationship=course_list.relationship)
+
+def requirements_left(course_list, other):
+    """Makes the requirements that are still left when the requirements of other are fulfilled.
+
+    Children that other implies are dropped, and the rest only keep what is left after
+    the courses taken in every way to fulfill other are taken.
+
+    :param course_list: CourseListPrimitive or CompoundCourseList.
+    :param other: CourseListPrimitive or CompoundCourseList.
+
+    :return: New CourseListPrimitive or CompoundCourseList, of the same type as course_list.
+             Empty if other implies course_list.
+    """
+    if is_primitive(course_list):
+        if implies(other, course_list):
+            return CourseList.CourseListPrimitive()
+        return residual(course_list, guaranteed_courses(other))
+
+    if implies(other, course_list):
+        return CourseList.CompoundCourseList(relationship=course_list.relationship)
+
+    children = [requirements_left(child, other) for child in course_list.children
+                if course_list.relationship == "or" or not implies(other, child)]
+    return CourseList.CompoundCourseList(*children, relationship=course_list.relationship)
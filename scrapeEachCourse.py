@@ -1,183 +1,357 @@
 """Functions for scraping courses."""
 
+import argparse
+import concurrent.futures
+import os
+import sys
+import threading
+import time
+
 import requests
-from bs4 import BeautifulSoup
-import re
 import pandas as pd
 
-from scrapeForCourses import make_soup
-from CourseList import CourseListPrimitive, CompoundCourseList
+import prerequisiteParser
+from htmlExtract import region
+from Fetcher import Fetcher, default_fetcher, DEFAULT_TIMEOUT, DEFAULT_RETRIES
+from HttpCache import HttpCache, DEFAULT_DIRECTORY as DEFAULT_CACHE_DIRECTORY
+from PageArchive import PageArchive, DEFAULT_PATH as DEFAULT_ARCHIVE_PATH
+from Checkpoint import Checkpoint
+from CatalogFile import write_catalog, DEFAULT_PATH as CATALOG_PATH
 
-def is_clean(string):
-    """Checks if string has no very special characters.
+COURSE_BASE_URL = 'https://www.uio.no/studier/emner/'
+DEFAULT_PAGES_DIRECTORY = 'pages'
+DEFAULT_CHECKPOINT_PATH = 'scrape.checkpoint'
 
-    :param string: String to check.
+def get_prerequisites(content_tag):
+    """Makes lists of prerequisites for a course, given the content tag of the course.
 
-    :retur: Boolean indicating whether there are special characters or not.
-    """
-    search = re.compile(r'[<>\\\n]').search
-    return not search(string)
-    
-def make_courselist(coursecodes, course_relations):
-    """Merge coursecodes and course_relations into one nested list.
-
-    :param coursecodes: List of course code strings.
-    :param course_relations: List of strings where element i specifies the 
-                             relation between element i-1 and i in the coursecodes list.
-                             Each element can be either 'interchangeable' or 'none'.
-
-    :return: List of coursecodes in a nested list. List looks like
-             [['either this course', 'or this'], ['also either this', 'or this'], 'and this']
+    :param content_tag: bs4.BeautifulSoup instance of content tag in course page.
+
+    :return: 2-tuple of obligatory and recommended lists, with format as described in prerequisiteParser.
     """
-    courselist = []
-    current_group = []
-    for code, relation in zip(coursecodes, course_relations):
-        if relation == 'interchangeable':
-            current_group.append(code)
-        elif current_group != []:
-            current_group.append(code)
-            courselist.append(current_group)
-            current_group = []
-        else:
-            courselist.append(code)
+    if content_tag is None:
+        # Occasional error that isn't impossible to handle,
+        # but that occurs so rarely and with courses UiO has
+        # themselves made an error, so this should do
+        return [], []
 
-    return courselist
+    return prerequisiteParser.parse(prerequisiteParser.content_text(content_tag))
 
-def get_courses(string):
-    """Find all mentions of course codes in a string, and their relations.
+def course_url(course, base_url=COURSE_BASE_URL):
+    """Makes the url of the page of a course.
 
-    Courses can either be interchangeable (eg 'To take this course, you have to
-    take either course A or course B'), or not.
-    
-    :param string: String with possible course codes used.
+    :param course: Row of course data, with faculty, institute and coursecode.
+    :param base_url: String url that course pages are under.
 
-    :return: 2-tuple of course codes list and course relations list.
-             In the course relations list element i specifies the 
-             relation between element i-1 and i in the course codes list.
-             Each element can be either 'interchangeable' or 'none'.
+    :return: String url.
     """
+    return base_url + course['faculty'] + '/' + course['institute'] + '/' + course['coursecode'] + '/'
 
-    # Find all courses mentioned in the string
-    coursecodes, coursecodes_indexes = [], []
-    for match in re.finditer(r"[A-ZÆØÅ\-]+\d+[A-ZÆØÅ\-]{0,6}\d{0,2}", string):
-        coursecodes.append(match.group(0))
-        coursecodes_indexes.append([match.start(), match.end()])
-
-    # Find special cases where interchangeability is implied by something other than '/'
-    special_group_indexes = []
-    for beginning in re.finditer(r"Ett av emnene|One of the courses", string):
-        special_group_indexes.append([beginning.end()])
-        end = re.search(r".", string[special_group_indexes[-1][0]:])
-        if end:
-            special_group_indexes[-1].append(end.start())
-
-    # Find out whether two or more courses are interchangeable
-    course_relations = []
-    e, in_special_group = 0, 0
-    for i in range(0, len(coursecodes_indexes) - 1):
-        start = coursecodes_indexes[i][1]
-        end = coursecodes_indexes[i+1][0]
-
-        # Check if this code is in a special interchangeability group with the previous one
-        if special_group_indexes != [] and course_relations != []:
-            if in_special_group == 1 and end > special_group_indexes[e][0]:
-                e += 1
-            if special_group_indexes[e][0] < start < end < special_group_indexes[e][0]:
-                course_relations[-1] = 'interchangeable'
-                in_special_group = 1
-            else:
-                in_special_group = 0
-        
-        # Check if there's a '/' or an 'or' between the codes, implying interchangeability
-        if re.search(r"\/|[ (]eller |[ (]or ", string[start:end]) and not re.search(r"og ", string[start:end]):
-            course_relations.append('interchangeable')
-        else:
-            course_relations.append('none')
-    course_relations.append('none')
+def scrape_course(url, fetcher=default_fetcher):
+    """Fetches the page of a course, and finds its prerequisites.
 
-    return coursecodes, course_relations
+    :param url: String url of course page.
+    :param fetcher: Fetcher instance to fetch the page with.
 
-def get_prerequisites(content_tag):
-    """Makes lists of prerequisites for a course, given the content tag of the course.
+    :return: 2-tuple of obligatory and recommended lists, as in get_prerequisites(),
+             or None if the page couldn't be fetched.
+    """
+    try:
+        page = fetcher.get(url)
+    except requests.RequestException:
+        return None
 
-    :param content_tag: bs4.BeautifulSoup instance of content tag in course page.
+    with region(page, id='vrtx-course-content') as content:
+        return get_prerequisites(content)
+
+def page_path(course, directory=DEFAULT_PAGES_DIRECTORY):
+    """Makes the path the page of a course is saved to, like the path of its url.
 
-    :return: 2-tuple of obligatory and recommended lists, with format as described in make_courselist().
+    :param course: Row of course data, with faculty, institute and coursecode.
+    :param directory: Path to directory with pages.
+
+    :return: String path.
     """
-    descendants = []
-    if content_tag is None:
-        # Occasional error that isn't impossible to handle,
-        # but that occurs so rarely and with courses UiO has
-        # themselves made an error, so this should do
-        return [], []
-    
-    for child in content_tag.descendants:
-        if child.name == 'a':
-            continue
-        else:
-            descendants.append(str(child))
-
-    pure_text = ' '.join([string for string in descendants if is_clean(string)])
-    #print(f"Pure text: {pure_text}")
-
-    # Find where the sections start and end
-    obligatory_start = -2; obligatory_end = -1
-    recommended_start = -2; recommended_end = -1
-
-    oblig_match = re.search(r'Formal prerequisites|Obligatoriske forkunnskaper', pure_text)
-    if oblig_match:
-        obligatory_start = oblig_match.end()
-
-    recommended_match = re.search(r'Recommended previous knowledge|Anbefalte forkunnskaper', pure_text)
-    if recommended_match:
-        obligatory_end = recommended_match.start()
-        recommended_start = recommended_match.end()
-
-    end_search_beginning = obligatory_start if obligatory_start > recommended_start else recommended_start
-    end_of_prerequisites_match = re.search(r'Overlapping courses|Overlappende emner|Undervisning|Teaching', pure_text[end_search_beginning:])
-    if end_of_prerequisites_match:
-        recommended_end = end_of_prerequisites_match.start() + end_search_beginning
-        if recommended_start == -2:
-            obligatory_end = recommended_end
-
-    # Use get_courses to make a list of all courses in each section, if the section exists
-    if ((obligatory_start, obligatory_end) != (-2, -1)):
-        coursecodes, course_relations = get_courses(pure_text[obligatory_start:obligatory_end])
-        obligatory_list = make_courselist(coursecodes, course_relations)
-    else:
-        obligatory_list = []
+    return os.path.join(directory, course['faculty'], course['institute'], course['coursecode'] + '.html')
 
-    if ((recommended_start, recommended_end) != (-2, -1)):
-        coursecodes, course_relations = get_courses(pure_text[recommended_start:recommended_end])
-        recommended_list = make_courselist(coursecodes, course_relations)
-    else:
-        recommended_list = []
+def fetch_page(url, path, fetcher=default_fetcher):
+    """Fetches a page, and saves it as it is, without parsing it.
 
-    return obligatory_list, recommended_list
+    The page is written through a temporary file, so a page that is there is always whole.
 
-if __name__ == '__main__':
-    courseData = pd.read_pickle('courses.pkl')
-    num_courses = len(courseData.index)
+    :param url: String url of page.
+    :param path: String path to save page to.
+    :param fetcher: Fetcher instance to fetch the page with.
+
+    :return: Bool. Whether or not the page could be fetched.
+    """
+    try:
+        page = fetcher.get(url)
+    except requests.RequestException:
+        return False
 
-    obligatories, recommendeds = [], []
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary_path, 'wb') as page_file:
+        page_file.write(page)
+    os.replace(temporary_path, path)
+    return True
 
-    for i, (code, course) in enumerate(courseData.iterrows()):
-        print(f"\r|{'='*(i*50//num_courses)}{' '*(50-i*50//num_courses)}| {i/num_courses:.2%} Scraping {course['coursecode']}\033[K", flush=True, end='')
+def parse_page(path):
+    """Finds the prerequisites in a saved course page.
 
-        course_url = 'https://www.uio.no/studier/emner/'\
-                   + course['faculty'] + '/'\
-                   + course['institute'] + '/'\
-                   + course['coursecode'] + '/'
-        course_soup = make_soup(course_url)
+    :param path: String path of page, as from page_path().
 
-        content = course_soup.find(id='vrtx-course-content')
-        obligatory, recommended = get_prerequisites(content)
+    :return: 2-tuple of obligatory and recommended lists, as in get_prerequisites(),
+             or None if the page hasn't been fetched.
+    """
+    try:
+        with open(path, 'rb') as page_file:
+            page = page_file.read()
+    except FileNotFoundError:
+        return None
+
+    with region(page, id='vrtx-course-content') as content:
+        return get_prerequisites(content)
+
+def print_progress(i, num_courses, text):
+    print(f"\r|{'='*(i*50//num_courses)}{' '*(50-i*50//num_courses)}| {i/num_courses:.2%} {text}\033[K", flush=True, end='')
+
+def prerequisite_columns(courses, results, progress=True, action="Scraping"):
+    """Makes the results of scraping or parsing into columns of the dataframe.
+
+    :param courses: List of rows of course data.
+    :param results: Iterable with a result for each course, as from get_prerequisites(), or None.
+    :param progress: Whether to print a progress bar.
+    :param action: String shown in the progress bar, like 'Parsing'.
+
+    :return: 3-tuple with lists of obligatory and recommended prerequisites, in the same order
+             as courses and with "" instead of empty lists, and a list with the course
+             codes of the courses without a result. Courses without a result keep the
+             prerequisites they have in their row, if any, so a page that fails doesn't
+             erase what was found before.
+    """
+    obligatories, recommendeds, failed = [], [], []
+    for i, (course, result) in enumerate(zip(courses, results)):
+        if progress:
+            print_progress(i, len(courses), f"{action} {course['coursecode']}")
+
+        if result is None:
+            failed.append(course['coursecode'])
+            result = [course.get(kind) if isinstance(course.get(kind), list) else []
+                      for kind in ('obligatory', 'recommended')]
+        obligatory, recommended = result
         obligatories.append(obligatory if obligatory else "")
         recommendeds.append(recommended if recommended else "")
 
+    return obligatories, recommendeds, failed
+
+def scrape_courses(course_df, fetcher=default_fetcher, base_url=COURSE_BASE_URL, progress=True, checkpoint=None):
+    """Scrapes the prerequisites of all courses, fetching fetcher.workers pages at a time.
+
+    Parses each page as soon as it is fetched, without saving it. See fetch_pages() and
+    parse_pages() for doing it in two stages.
+
+    :param course_df: pandas.DataFrame instance with faculty, institute and coursecode.
+    :param fetcher: Fetcher instance to fetch the pages with.
+    :param base_url: String url that course pages are under.
+    :param progress: Whether to print a progress bar.
+    :param checkpoint: Checkpoint instance that the prerequisites of each page are added to
+                       as soon as they are found, by url, or None. Pages already in it
+                       are not fetched again.
+
+    :return: 3-tuple with lists of obligatory and recommended prerequisites, in the same order
+             as the rows of course_df and with "" instead of empty lists, and a list with
+             the course codes of pages that couldn't be fetched.
+    """
+    courses = [course for _, course in course_df.iterrows()]
+    urls = [course_url(course, base_url) for course in courses]
+
+    def scrape(url):
+        if checkpoint is not None and url in checkpoint:
+            return checkpoint.get(url)
+        result = scrape_course(url, fetcher)
+        if checkpoint is not None and result is not None:
+            checkpoint.add(url, result)
+        return result
+
+    results = fetcher.map(scrape, urls)
+    try:
+        return prerequisite_columns(courses, results, progress)
+    finally:
+        # Stops the pages being scraped, if interrupted, before the checkpoint can be closed
+        if hasattr(results, 'close'):
+            results.close()
+
+def fetch_pages(course_df, directory=DEFAULT_PAGES_DIRECTORY, fetcher=default_fetcher, base_url=COURSE_BASE_URL,
+                progress=True, checkpoint=None):
+    """The fetch stage of scraping. Saves the page of every course, fetcher.workers pages at a time.
+
+    Pages are saved as they are, and parsed later with parse_pages(), so the fetching
+    never waits for parsing. Rows with the same page fetch it once.
+
+    :param course_df: pandas.DataFrame instance with faculty, institute and coursecode.
+    :param directory: Path to directory to save pages in, as in page_path().
+    :param fetcher: Fetcher instance to fetch the pages with.
+    :param base_url: String url that course pages are under.
+    :param progress: Whether to print a progress bar.
+    :param checkpoint: Checkpoint instance that the url of each page is added to as soon
+                       as it is saved, or None. Pages already in it, that are still saved,
+                       are not fetched again, so an interrupted run can be resumed.
+
+    :return: List with the course codes of pages that couldn't be fetched. Pages saved
+             by an earlier run are kept when they can't be fetched again.
+    """
+    pages = {}
+    for _, course in course_df.iterrows():
+        pages.setdefault(page_path(course, directory), (course['coursecode'], course_url(course, base_url)))
+
+    def fetch(page):
+        path, (_, url) = page
+        if checkpoint is not None and url in checkpoint and os.path.exists(path):
+            return True
+        fetched = fetch_page(url, path, fetcher)
+        if checkpoint is not None and fetched:
+            checkpoint.add(url)
+        return fetched
+
+    failed = []
+    results = fetcher.map(fetch, pages.items())
+    try:
+        for i, ((coursecode, _), fetched) in enumerate(zip(pages.values(), results)):
+            if progress:
+                print_progress(i, len(pages), f"Fetching {coursecode}")
+            if not fetched:
+                failed.append(coursecode)
+    finally:
+        # Cancels the pages not started yet, if interrupted, and waits for the ones being
+        # fetched, so none are added to the checkpoint after it is closed
+        if hasattr(results, 'close'):
+            results.close()
+    return failed
+
+def parse_pages(course_df, directory=DEFAULT_PAGES_DIRECTORY, workers=None, progress=True):
+    """The parse stage of scraping. Finds the prerequisites in the saved pages, with a pool of processes.
+
+    Only reads pages saved by fetch_pages(), so it can be run again whenever the parser
+    changes, without the network.
+
+    :param course_df: pandas.DataFrame instance with faculty, institute and coursecode.
+    :param directory: Path to directory with pages, as in page_path().
+    :param workers: Processes to parse with. As many as there are CPUs if None, and in
+                    this process if 1.
+    :param progress: Whether to print a progress bar.
+
+    :return: 3-tuple like scrape_courses(), with the course codes of pages that haven't
+             been fetched as the last element.
+    """
+    courses = [course for _, course in course_df.iterrows()]
+    paths = [page_path(course, directory) for course in courses]
+    unique_paths = list(dict.fromkeys(paths))
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        parsed = map(parse_page, unique_paths)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # Big chunks, since a page takes much less time to parse than to send to a process
+            chunksize = max(1, len(unique_paths) // (workers * 4))
+            parsed = list(executor.map(parse_page, unique_paths, chunksize=chunksize))
+
+    results = dict(zip(unique_paths, parsed))
+    return prerequisite_columns(courses, (results[path] for path in paths), progress, "Parsing")
+
+def save_courses(course_df, pickle_path='courses.pkl', catalog_path=CATALOG_PATH):
+    """Writes course data to the pickle and the catalog file, replacing each of them in one go.
+
+    :param course_df: pandas.DataFrame instance with data.
+    :param pickle_path: Path to write the pickled dataframe to.
+    :param catalog_path: Path to write the catalog file to, see CatalogFile.
+    """
+    temporary_path = f"{pickle_path}.{os.getpid()}.tmp"
+    course_df.to_pickle(temporary_path)
+    os.replace(temporary_path, pickle_path)
+    write_catalog(course_df, catalog_path)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrape the prerequisites of all courses in 'courses.pkl'. "
+                                                 "Fetches every course page to --pages first, and then parses them.")
+    parser.add_argument('--workers', type=int, default=8, help="Pages to fetch at the same time.")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help="Seconds to wait for a page.")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help="Retries for a page that fails.")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIRECTORY,
+                        help="Directory to cache pages in, and revalidate them from.")
+    parser.add_argument('--no-cache', action='store_true', help="Fetch every page in full.")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH, help="File to keep every fetched page in.")
+    parser.add_argument('--no-archive', action='store_true', help="Don't keep the fetched pages.")
+    parser.add_argument('--replay', nargs='?', const='latest', metavar='SCRAPE',
+                        help="Get the pages from the archive instead of the network, as they were in "
+                             "the scrape of a date like 2026-10-18, or in the latest scrape.")
+    parser.add_argument('--pages', default=DEFAULT_PAGES_DIRECTORY, help="Directory to save course pages in.")
+    parser.add_argument('--parse-workers', type=int, default=None,
+                        help="Processes to parse pages with. As many as there are CPUs by default.")
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH,
+                        help="File that fetched pages are noted in, so an interrupted run goes on where it stopped.")
+    parser.add_argument('--restart', action='store_true', help="Fetch every page again, even after an interrupted run.")
+    stages = parser.add_mutually_exclusive_group()
+    stages.add_argument('--fetch-only', action='store_true', help="Only fetch the pages, without parsing them.")
+    stages.add_argument('--parse-only', action='store_true',
+                        help="Only parse the pages fetched before, without the network.")
+    args = parser.parse_args()
+
+    courseData = pd.read_pickle('courses.pkl')
+
+    fetch_failed = []
+    if not args.parse_only:
+        if args.restart and os.path.exists(args.checkpoint):
+            os.remove(args.checkpoint)
+        checkpoint = Checkpoint(args.checkpoint)
+        if len(checkpoint):
+            print(f"Resuming from '{args.checkpoint}', where {len(checkpoint)} pages were fetched.")
+        archive = None if args.no_archive and not args.replay else PageArchive(args.archive)
+        if args.replay:
+            fetcher = archive.replay(None if args.replay == 'latest' else args.replay, args.workers)
+        else:
+            fetcher = Fetcher(workers=args.workers, timeout=args.timeout, retries=args.retries,
+                              cache=None if args.no_cache else HttpCache(args.cache), archive=archive)
+        start = time.perf_counter()
+        try:
+            fetch_failed = fetch_pages(courseData, args.pages, fetcher, checkpoint=checkpoint)
+        except KeyboardInterrupt:
+            checkpoint.close()
+            if archive is not None:
+                archive.close()
+            print(f"\nInterrupted after {len(checkpoint)} pages. Run again to go on from there.")
+            sys.exit(1)
+        checkpoint.close()
+        elapsed = time.perf_counter() - start
+        print(f"\rFetched the pages of all courses to '{args.pages}'. "
+              f"{len(courseData.index)/elapsed:.1f} pages per second.\033[K")
+        if fetch_failed:
+            print(f"Couldn't fetch {len(fetch_failed)} pages: {', '.join(fetch_failed)}")
+        if fetcher.cache is not None:
+            print(fetcher.cache.summary())
+        if archive is not None:
+            print(archive.summary())
+            archive.close()
+    if args.fetch_only:
+        sys.exit()
+
+    start = time.perf_counter()
+    obligatories, recommendeds, failed = parse_pages(courseData, args.pages, args.parse_workers)
+    elapsed = time.perf_counter() - start
+
     courseData['obligatory'] = obligatories
     courseData['recommended'] = recommendeds
 
-    courseData.to_pickle('courses.pkl')
-
-    print("\rScraped all courses, and updated dataframe in 'courses.pkl'\033[K")
+    save_courses(courseData)
+    print(f"\rParsed all courses, and updated dataframe in 'courses.pkl' and '{CATALOG_PATH}'. "
+          f"{len(obligatories)/elapsed:.1f} pages per second.\033[K")
+
+    if failed or fetch_failed:
+        if failed:
+            print(f"Missing {len(failed)} pages, that kept the prerequisites they had: {', '.join(failed)}")
+        print(f"Run again to fetch the pages that failed, keeping the others in '{args.checkpoint}'.")
+    elif not args.parse_only:
+        # Everything fetched is in the catalog now, so the next run starts from the beginning
+        checkpoint.remove()
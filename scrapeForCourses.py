@@ -1,22 +1,38 @@
 """Functions for scraping for courses."""
 
-import requests
+import argparse
+
 from bs4 import BeautifulSoup
 import re
 import pandas as pd
 
-def make_soup(url):
+from Fetcher import Fetcher, default_fetcher
+from htmlExtract import has_tag_id, listing_links
+from HttpCache import HttpCache, DEFAULT_DIRECTORY as DEFAULT_CACHE_DIRECTORY
+from PageArchive import PageArchive, DEFAULT_PATH as DEFAULT_ARCHIVE_PATH
+
+def make_soup(url, fetcher=default_fetcher):
     """Makes bs4.BeautifulSoup instance of content of url.
 
     :param url: url to make bs4.BeautifulSoup instance from.
+    :param fetcher: Fetcher instance to fetch the page with.
     
     :return: bs4.BeautifulSoup instance of content of url.
     """
-    coursepage = requests.get(url)
-    coursecontent = coursepage.content
+    coursecontent = fetcher.get(url)
     return BeautifulSoup(coursecontent, 'html.parser')
 
-def has_results(coursepage_url, tag_id="vrtx-listing-filter-no-results"):
+def page_has_results(content, tag_id="vrtx-listing-filter-no-results"):
+    """Returns True if the content of a search page doesn't have a tag with id tag_id.
+
+    :param content: Bytes with content of search page.
+    :param tag_id: Id of tag that is on site when there are no results.
+
+    :return: True if there are results, False if not.
+    """
+    return not has_tag_id(content, tag_id)
+
+def has_results(coursepage_url, tag_id="vrtx-listing-filter-no-results", fetcher=default_fetcher):
     """Returns True if site has tag with id tag_id.
     
     Used in this case to find out if a search page has results, because
@@ -25,31 +41,81 @@ def has_results(coursepage_url, tag_id="vrtx-listing-filter-no-results"):
 
     :param coursepage_url: String representation of url to check if exists.
     :param tag_id: Id of tag that is on site when there are no results.
+    :param fetcher: Fetcher instance to fetch the page with.
 
     :return: True if there are results, False if not.
     """
-    soup = make_soup(coursepage_url)
-    return not soup.find(id=tag_id)
+    return page_has_results(fetcher.get(coursepage_url), tag_id)
+
+def count_result_pages(base_url, fetcher=default_fetcher, pages=None):
+    """Finds how many search pages have results, with a logarithmic number of probes.
+
+    Probes pages 0, 1, 2, 4, 8 and so on until one has no results, and then does a binary
+    search between the last page with results and that one. Assumes that all pages up to
+    some number have results, and none after.
+
+    :param base_url: String representation of url to append ints to to make search page.
+    :param fetcher: Fetcher instance to fetch the pages with.
+    :param pages: Dict that the content of probed pages is stored in, by url, if given.
+
+    :return: Int number of pages with results.
+    """
+    pages = {} if pages is None else pages
+
+    def probe(i):
+        print(f"\rChecking if there are courses on page: {i}\033[K", end="", flush=True)
+        url = base_url + str(i)
+        pages[url] = fetcher.get(url)
+        return page_has_results(pages[url])
+
+    if not probe(0):
+        return 0
+
+    # Page low has results, page high might not
+    low, high = 0, 1
+    while probe(high):
+        low, high = high, high * 2
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        if probe(middle):
+            low = middle
+        else:
+            high = middle
+
+    return high
+
+def get_course_pages(base_url="https://www.uio.no/studier/emner/alle/?page=", fetcher=default_fetcher):
+    """Fetches all search pages that have results.
+
+    Finds how many there are with count_result_pages(), and then fetches the rest of them
+    fetcher.workers at a time, reusing the ones already fetched while probing.
+
+    :param base_url: String representation of url to append ints to to make search page.
+    :param fetcher: Fetcher instance to fetch the pages with.
+
+    :return: List of 2-tuples with string url and bytes content, for every page with results.
+    """
+    pages = {}
+    num_pages = count_result_pages(base_url, fetcher, pages)
+    print(f"\rCompleted. Found {num_pages} pages of courses.\033[K", flush=True)
+
+    url_list = [base_url + str(i) for i in range(num_pages)]
+    contents = fetcher.map(lambda url: pages[url] if url in pages else fetcher.get(url), url_list)
+    return list(zip(url_list, contents))
 
-def get_course_url_list(base_url="https://www.uio.no/studier/emner/alle/?page="):
+def get_course_url_list(base_url="https://www.uio.no/studier/emner/alle/?page=", fetcher=default_fetcher):
     """Constructs a list with all pages that have results.
     
     :param base_url: String representation of url to append ints to to make search page.
+    :param fetcher: Fetcher instance to fetch the pages with.
 
     :return: List of string urls that have valid pages with results.
     """
-    url_list = []
-    i = 0
-    url = base_url + str(i)
-    while has_results(url):
-        url_list.append(url)
-        i += 1
-        url = base_url + str(i)
-        print(f"\rChecking if there are courses on page: {i}", end="", flush=True)
-    
-    print(f"\rCompleted. Found {len(url_list)} pages of courses.\033[K", flush=True)
+    num_pages = count_result_pages(base_url, fetcher)
+    print(f"\rCompleted. Found {num_pages} pages of courses.\033[K", flush=True)
 
-    return url_list
+    return [base_url + str(i) for i in range(num_pages)]
 
 def get_course_url_info(course_url):
     """Finds faculty, institute and coursecode given some course url.
@@ -68,27 +134,28 @@ def get_course_url_info(course_url):
     raise ValueError("Course url is invalid, and doesn't follow the format"
                      "'/studier/emner/<faculty>/<institute>/<coursecode>/index.html'.")
 
-def find_coursecodes(coursepage_url):
+def find_coursecodes(coursepage_url, fetcher=default_fetcher, content=None):
     """Scrapes search page for courses on it.
 
     :param coursepage_url: Url with search results of courses.
                            Like the ones generated by get_course_url_list.
+    :param fetcher: Fetcher instance to fetch the page with.
+    :param content: Bytes with content of the page, if it has already been fetched.
     
     :return: 4-tuple of lists with faculties, institutes, course codes and course names.
              The lists have the same length, meaning they eg repeat faculties for each course.
     """
-    coursepage_soup = make_soup(coursepage_url)
+    if content is None:
+        content = fetcher.get(coursepage_url)
 
     faculties, institutes, coursecodes, coursenames = [], [], [], []
-    for link in coursepage_soup.tbody.find_all('a'):
-        course_url = link.get('href')
-        
+    for course_url, link_string in listing_links(content):
         faculty, institute, coursecode = get_course_url_info(course_url)
 
         # The regex search is based on the pattern course codes at UiO had in spring 2020, but it
         # is a bit random, and can probably change over time. If a new code is added that doesn't
         # follow this pattern, this function will break.
-        coursename_search = re.search(r"^[A-ZÆØÅ\-]+\d*[A-ZÆØÅ\-]{0,6}\d{0,2} *.? *(.*)", link.string)
+        coursename_search = re.search(r"^[A-ZÆØÅ\-]+\d*[A-ZÆØÅ\-]{0,6}\d{0,2} *.? *(.*)", link_string)
         coursename = coursename_search.group(1)
         
         faculties.append(faculty)
@@ -99,11 +166,30 @@ def find_coursecodes(coursepage_url):
     return faculties, institutes, coursecodes, coursenames
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scrape the list of all courses into 'courses.pkl'.")
+    parser.add_argument('--workers', type=int, default=8, help="Pages to fetch at the same time.")
+    parser.add_argument('--cache', default=DEFAULT_CACHE_DIRECTORY,
+                        help="Directory to cache pages in, and revalidate them from.")
+    parser.add_argument('--no-cache', action='store_true', help="Fetch every page in full.")
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH, help="File to keep every fetched page in.")
+    parser.add_argument('--no-archive', action='store_true', help="Don't keep the fetched pages.")
+    parser.add_argument('--replay', nargs='?', const='latest', metavar='SCRAPE',
+                        help="Get the pages from the archive instead of the network, as they were in "
+                             "the scrape of a date like 2026-10-18, or in the latest scrape.")
+    args = parser.parse_args()
+
+    archive = None if args.no_archive and not args.replay else PageArchive(args.archive)
+    if args.replay:
+        fetcher = archive.replay(None if args.replay == 'latest' else args.replay, args.workers)
+    else:
+        fetcher = Fetcher(workers=args.workers, cache=None if args.no_cache else HttpCache(args.cache),
+                          archive=archive)
     faculties, institutes, coursecodes, coursenames = [], [], [], []
 
-    for coursepage_url in get_course_url_list():
+    for coursepage_url, content in get_course_pages(fetcher=fetcher):
         print(f"\rGoing through {coursepage_url}. Have so far found {len(coursecodes)} courses.", flush=True, end='')
-        new_faculties, new_institutes, new_coursecodes, new_coursenames = find_coursecodes(coursepage_url)
+        new_faculties, new_institutes, new_coursecodes, new_coursenames = \
+            find_coursecodes(coursepage_url, fetcher, content)
         
         faculties.extend(new_faculties)
         institutes.extend(new_institutes)
@@ -120,3 +206,8 @@ if __name__ == '__main__':
     courseData.to_pickle('courses.pkl')
 
     print(f"\rFound {len(coursecodes)} courses on those pages, and saved them in 'courses.pkl'\033[K", flush=True)
+    if fetcher.cache is not None:
+        print(fetcher.cache.summary())
+    if archive is not None:
+        print(archive.summary())
+        archive.close()
@@ -1,140 +1,531 @@
 """Interface for searching through course data."""
 
-import pandas as pd
+import argparse
+import json
 import re
+import sys
+import threading
+import time
+import weakref
 import itertools
 
 from CourseList import CourseListPrimitive, CompoundCourseList
-
+from Catalog import catalog
+from CourseGraph import CourseGraph, Reachability, KINDS
+from CodeIndex import CodeIndex, is_course_code
+from NameIndex import NameIndex
+from LRUCache import LRUCache
+import studyPlanner
+from instrumentation import stage
+import instrumentation
+
+REQUIREMENT_CACHE_SIZE = 4096
+
+# Indexes of dataframes that aren't the catalog's, by id() of the dataframe, each with a
+# weak reference to it. An entry is dropped when its dataframe is
+_dataframe_indexes = {}
+_dataframe_lock = threading.RLock()
+
+def indexed(name, builder, course_df):
+    """Gets an index of course_df, made the first time it is asked for and then kept.
+
+    Indexes of the catalog are kept by the catalog, and of other dataframes for as long
+    as the dataframe exists, so a dataframe must not be changed after it is searched.
+    Search a copy with the changes instead.
+
+    :param name: String key the index is kept under.
+    :param builder: Callable taking course_df and returning the index.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: Whatever builder returns.
+    """
+    if course_df is None or (catalog.is_loaded and course_df is catalog.df):
+        return catalog.derived(name, builder)
+
+    entry = _dataframe_indexes.get(id(course_df))
+    if entry is None or entry[0]() is not course_df:
+        with _dataframe_lock:
+            entry = _dataframe_indexes.get(id(course_df))
+            if entry is None or entry[0]() is not course_df:
+                entry = (weakref.ref(course_df), {})
+                _dataframe_indexes[id(course_df)] = entry
+                weakref.finalize(course_df, _dataframe_indexes.pop, id(course_df), None)
+
+    indexes = entry[1]
+    if name not in indexes:
+        with _dataframe_lock:
+            if name not in indexes:
+                indexes[name] = builder(course_df)
+    return indexes[name]
+
+def column(course_df, name):
+    """The values in a column of course_df, or of the catalog if course_df is None."""
+    if course_df is None:
+        return catalog.column(name)
+    return course_df[name].values
+
+@stage()
 def grow_roots(course, checked_courses, course_df):
     """Makes lists of courses that are obligatory and recommended precursors to a course.
 
-    Works recursively with new_root() to walk down the tree. To prevent it from infinite 
-    loops it also returns courses checked.
+    Walks down the tree of obligatory precursors in the compiled CourseGraph, and
+    collects the requirements of every course it passes. Courses are only walked through
+    once, so loops in the data are no problem.
 
     :param course: Course code, string.
     :param checked_courses: List of course codes to ignore.
-    :param course_df: pandas.DataFrame instance with data.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
 
     :return: 3-tuple of lists of obligatory, recommended, and checked courses.
+             The first two are nested lists, as described in
+             CompoundCourseList.from_nested_list().
+    """
+    graph = indexed('graph', CourseGraph.from_dataframe, course_df)
+    if course not in graph or course in checked_courses:
+        return [], [], []
+
+    visited = {graph.ids[checked] for checked in checked_courses if checked in graph.ids}
+    walked = [course_id for course_id in graph.walk([graph.ids[course]], visited=visited)
+              if graph.known[course_id]]
+
+    obligatory_list, recommended_list = [], []
+    for nested_list, kind in [(obligatory_list, 'obligatory'), (recommended_list, 'recommended')]:
+        seen = set()
+        for course_id in walked:
+            for element in graph.nested_list(course_id, kind):
+                key = tuple(element) if isinstance(element, list) else element
+                if key not in seen:
+                    seen.add(key)
+                    nested_list.append(element)
+
+    return obligatory_list, recommended_list, [graph.codes[course_id] for course_id in walked]
+
+def reachable_courses(course, course_df, direction):
+    """Finds all courses upstream or downstream of a course, any number of steps away.
+
+    Looks them up in the reachability index, instead of walking the graph.
+
+    :param course: Course code, string.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+    :param direction: 'upstream' for courses that lead to the course, or 'downstream'
+                      for courses the course leads to.
+
+    :return: List of 2-tuples with course code, and whether the courses are connected
+             through obligatory precursors only. In the same order as in course_df,
+             with codes not in course_df last.
     """
-    if course in course_df.index and course not in checked_courses:
-        checked_courses.append(course)
-        obligatory_list = course_df.at[course, 'obligatory']
-        recommended_list = course_df.at[course, 'recommended']
-        if obligatory_list != []:
-            for obligatory_element in obligatory_list:
-                if isinstance(obligatory_element, list):
-                    for obligatory_course in obligatory_element:
-                        obligatory_list, recommended_list, checked_courses = \
-                            new_root(
-                                obligatory_course,
-                                obligatory_list,
-                                recommended_list,
-                                checked_courses,
-                                course_df
-                            )
-                else:
-                    obligatory_list, recommended_list, checked_courses = \
-                        new_root(
-                            obligatory_element,
-                            obligatory_list,
-                            recommended_list,
-                            checked_courses,
-                            course_df
-                        )
-
-        return obligatory_list, recommended_list, checked_courses
-    return [], [], []
-
-def search_single_course(course, course_df, flags):
+    graph = indexed('graph', CourseGraph.from_dataframe, course_df)
+    obligatory_reach = indexed('reachability', lambda _: Reachability(graph), course_df)
+    any_reach = indexed('reachability_all', lambda _: Reachability(graph, KINDS), course_df)
+
+    obligatory_courses = set(getattr(obligatory_reach, direction)(course))
+    return [(other, other in obligatory_courses)
+            for other in getattr(any_reach, direction)(course)]
+
+def code_index(course_df=None):
+    """CodeIndex of every course code in course_df, including those only mentioned as precursors.
+
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: CodeIndex instance.
+    """
+    return indexed('code_index',
+                   lambda course_df: CodeIndex(indexed('graph', CourseGraph.from_dataframe, course_df).codes),
+                   course_df)
+
+def find_code(course, course_df=None):
+    """The course code as it is written in the data, or None if it isn't a course code.
+
+    A code typed as it is written is found in the graph, without making the code index,
+    which indexes every code for suggestions.
+
+    :param course: Course code, string, in any case.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+    """
+    if course in indexed('graph', CourseGraph.from_dataframe, course_df).ids and is_course_code(course):
+        return course
+    return code_index(course_df).get(course)
+
+def name_index(course_df=None):
+    """NameIndex of the course names in course_df.
+
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: NameIndex instance.
+    """
+    return indexed('name_index',
+                   lambda course_df: NameIndex(column(course_df, 'coursecode'), column(course_df, 'coursename')),
+                   course_df)
+
+def search_names(query, course_df=None, limit=10):
+    """Prints out the courses with names matching a query, best first.
+
+    :param query: String with words, or the start of words, in the course name.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+    :param limit: Int. Most courses to print.
+
+    :return: Bool. Whether or not any courses were found.
+    """
+    found = name_index(course_df).search(query, limit)
+    if not found:
+        print(f"Fant dessverre ingen emner med navn som passer til '{query.strip()}'.")
+        return False
+
+    print(f"\n---\nEmner med navn som passer til '{query.strip()}':")
+    for code, name, score in found:
+        print(f"{code} - {name}")
+    print("---\n")
+    return True
+
+def completer(codes):
+    """Makes a function completing course codes for readline.set_completer().
+
+    :param codes: CodeIndex instance.
+
+    :return: Function taking the text to complete and the number of the completion, and
+             returning the completion, or None when there are no more.
+    """
+    completions = []
+
+    def complete(text, state):
+        if state == 0:
+            completions[:] = codes.complete(text) if text and text[0] != '-' else []
+        return completions[state] if state < len(completions) else None
+
+    return complete
+
+def course_names(course_df):
+    """Dict from course code to course name."""
+    return dict(zip(column(course_df, 'coursecode'), column(course_df, 'coursename')))
+
+def print_reachable(course, course_df, direction):
+    """Prints all courses upstream or downstream of a course, as found by reachable_courses().
+
+    :param course: Course code, string.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+    :param direction: 'upstream' or 'downstream'.
+    """
+    names = indexed('names', course_names, course_df)
+    reachable = reachable_courses(course, course_df, direction)
+
+    if direction == 'upstream':
+        header = f"Emner som leder til {course}"
+        kind_text = ["anbefalt", "obligatorisk"]
+    else:
+        header = f"Emner {course} leder til, ett eller flere hakk frem"
+        kind_text = ["via anbefalte forkunnskaper", "via obligatoriske forkunnskaper"]
+
+    if not reachable:
+        print(f"{header}: ingen.")
+        return
+
+    print(f"{header}:")
+    for other, obligatory in reachable:
+        name = f" - {names[other]}" if other in names else ""
+        print(f"  {other}{name} ({kind_text[obligatory]})")
+
+@stage()
+def make_dependents_index(course_df):
+    """Makes an index from course codes to the rows that have them as precursors.
+
+    Both courses listed directly, and courses in a group of interchangeable courses, are
+    indexed. Each row is listed only once per course, in the same order as in course_df.
+
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: Dict from course code to list of 3-tuples, with the position of the row in
+             course_df, and whether the course is an obligatory and a recommended
+             precursor to the course in that row.
+    """
+    index = {}
+    columns = zip(column(course_df, 'obligatory'), column(course_df, 'recommended'))
+    for position, (obligatory_list, recommended_list) in enumerate(columns):
+        row_flags = {}
+        for flag_index, nested_list in enumerate((obligatory_list, recommended_list)):
+            for element in nested_list:
+                for precursor in (element if isinstance(element, list) else [element]):
+                    row_flags.setdefault(precursor, [False, False])[flag_index] = True
+
+        for precursor, (obligatory, recommended) in row_flags.items():
+            index.setdefault(precursor, []).append((position, obligatory, recommended))
+
+    return index
+
+@stage()
+def find_dependents(course, course_df):
+    """Finds the rows that have a course as an obligatory or recommended precursor.
+
+    Uses the index kept by the catalog when course_df is the catalog dataframe, so that
+    only the rows that actually match are looked at.
+
+    :param course: Course code, string.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: List of 3-tuples, with the row as a pandas.Series, or a dict if it is read from
+             the catalog file, and whether the course is an obligatory and a recommended
+             precursor to the course in that row.
+    """
+    index = indexed('dependents', make_dependents_index, course_df)
+    row = catalog.row if course_df is None else (lambda position: course_df.iloc[position])
+    return [(row(position), obligatory, recommended)
+            for position, obligatory, recommended in index.get(course, [])]
+
+def memoized(key, make, course_df):
+    """Gets a requirement tree from the cache kept with the catalog, making it if it isn't there.
+
+    The trees are shared between queries, so they must not be changed. They are kept
+    with the catalog, or with course_df, like the indexes of indexed().
+
+    :param key: Tuple identifying the tree.
+    :param make: Callable taking no arguments, and making the tree.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: Whatever make returns.
+    """
+    cache = indexed('requirement_trees', lambda _: LRUCache(REQUIREMENT_CACHE_SIZE), course_df)
+    tree = cache.get(key)
+    if tree is None:
+        tree = make()
+        cache.put(key, tree)
+    return tree
+
+@stage()
+def requirement_tree(row, kind, course_df=None):
+    """The requirements of a course as a CompoundCourseList, made once and then shared.
+
+    Rows with the same course code have the same requirements, like in CourseGraph.
+
+    :param row: Row of course data, with coursecode and kind.
+    :param kind: 'obligatory' or 'recommended'.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: CompoundCourseList instance, that must not be changed.
+    """
+    return memoized((kind, row['coursecode']),
+                    lambda: CompoundCourseList.from_nested_list(row[kind]), course_df)
+
+@stage()
+def root_trees(course, course_df=None):
+    """The obligatory and recommended requirements of all courses leading up to a course.
+
+    Made from grow_roots() and simplified once, and then shared.
+
+    :param course: Course code, string.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: 2-tuple of CompoundCourseList instances, that must not be changed.
+    """
+    def make():
+        trees = tuple(CompoundCourseList.from_nested_list(nested_list)
+                      for nested_list in grow_roots(course, [], course_df)[:2])
+        for tree in trees:
+            tree.simplify()
+        return trees
+
+    return memoized(('roots', course), make, course_df)
+
+def study_plan(course, taken=(), course_df=None):
+    """The fewest courses to take to be able to take a course, made once and then shared.
+
+    :param course: Course code, string.
+    :param taken: Iterable of course codes already taken.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: 2-tuple with list of semesters, each a list of course codes, and whether
+             the plan is known to be the smallest, as from studyPlanner.plan().
+    """
+    taken = frozenset(taken)
+    graph = indexed('graph', CourseGraph.from_dataframe, course_df)
+    return memoized(('plan', course, taken), lambda: studyPlanner.plan(graph, course, taken), course_df)
+
+def print_plan(course, taken, course_df):
+    """Prints the fewest courses to take to be able to take a course, semester by semester.
+
+    :param course: Course code, string.
+    :param taken: List of course codes already taken.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+    """
+    semesters, optimal = study_plan(course, taken, course_df)
+    if semesters is None:
+        print(f"Fant ingen måte å oppfylle forkunnskapskravene til {course} på.")
+        return
+    if not semesters:
+        print(f"Du har allerede tatt {course}.")
+        return
+
+    count = sum(len(semester) for semester in semesters)
+    print(f"\n---\nFor å ta {course} må du ta {count} emne{'r' if count > 1 else ''}"
+          f"{' til' if taken else ''}, i denne rekkefølgen:")
+    for number, semester in enumerate(semesters, 1):
+        print(f"  {number}. semester: {', '.join(semester)}")
+    if not optimal:
+        print("Søket ble avbrutt, så det kan finnes en plan med færre emner.")
+    print("---\n")
+
+def course_dependents(course, course_df=None):
+    """Finds the courses that have a course as a precursor, and what else they require.
+
+    :param course: Course code, string.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: Iterator of 4-tuples, with the row of the other course, whether the course is
+             an obligatory and a recommended precursor to it, and the obligatory
+             requirements of the other course that are left after taking the course, as
+             a simplified CompoundCourseList that must not be changed.
+    """
+    course_primitive = CourseListPrimitive(coursecode=[course])
+
+    def residual(row):
+        not_done = requirement_tree(row, 'obligatory', course_df).requirements_not_implied_by(course_primitive)
+        not_done.simplify()
+        return not_done
+
+    for row, obligatory, recommended in find_dependents(course, course_df):
+        not_done = memoized(('residual', row['coursecode'], course), lambda: residual(row), course_df)
+        yield row, obligatory, recommended, not_done
+
+@stage()
+def course_record(course, course_df=None):
+    """Makes a dict with everything search_single_course() prints about a course, for JSON.
+
+    :param course: Course code, string.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+
+    :return: Dict with the course code and name, whether the course was found, and a list
+             of dependents, each a dict with the code and name of a course that has the
+             course as a precursor, whether it is an obligatory and a recommended
+             precursor, and the residual requirements as in CompoundCourseList.to_dict(),
+             or None if there are none. A course that isn't found has no name or dependents.
+    """
+    found = find_code(course, course_df)
+    if found is None:
+        return {'coursecode': course, 'found': False, 'coursename': None, 'dependents': []}
+    course = found
+
+    names = indexed('names', course_names, course_df)
+    dependents = []
+    for row, obligatory, recommended, not_done in course_dependents(course, course_df):
+        dependents.append({
+            'coursecode': row['coursecode'],
+            'coursename': row['coursename'],
+            'obligatory': bool(obligatory),
+            'recommended': bool(recommended),
+            'residual': not_done.to_dict() if not_done else None,
+        })
+
+    return {'coursecode': course, 'found': True, 'coursename': names.get(course), 'dependents': dependents}
+
+def search_batch(courses, course_df=None, output=sys.stdout):
+    """Writes a line of JSON for each course, as made by course_record(), as soon as it is made.
+
+    :param courses: Iterable of course codes. Can be read lazily, like from stdin.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+    :param output: File to write to.
+
+    :return: Int. How many courses were written.
+    """
+    count = 0
+    for course in courses:
+        with instrumentation.query(course):
+            record = course_record(course, course_df)
+        output.write(json.dumps(record, ensure_ascii=False) + '\n')
+        output.flush()
+        count += 1
+    return count
+
+def read_courses(lines):
+    """Finds the course codes in lines of text, like a file or stdin, separated by spaces or commas.
+
+    :param lines: Iterable of strings.
+
+    :return: Iterator of course codes, in upper case, yielded as soon as their line is read.
+    """
+    for line in lines:
+        for word in re.split(r"[\s,;]+", line.strip()):
+            if word:
+                yield word.upper()
+
+@stage()
+def search_single_course(course, course_df, flags, taken=()):
     """Prints out text describing what courses must be taken before taking a given course.
 
     :param course: Course code, string.
-    :param course_df: pandas.DataFrame instance with data.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
     :param flags: Flags that change what's printed out. Supported flags are:
                         'compact' or 'c': Removes whitespace and other courses required
                                           to take a course the input is a precursor to.
                         'roots' or 'r': Also prints out info about courses that themselves
                                         are precursors to the input course.
+                        'leaves' or 'l': Also prints out all courses the input course leads
+                                         to, one or more steps ahead.
+                        'forest' or 'f': Also prints out all courses upstream and downstream
+                                         of the input course.
+                        'plan' or 'p': Only prints out the fewest courses to take before
+                                       the input course, given the ones in taken.
+    :param taken: List of course codes already taken, for the 'plan' flag.
     
     :return: Bool. Whether or not any results could be found.
     """
+    found = find_code(course, course_df)
+    if found is None:
+        print("Couldn't find a course with that course code, please try another.")
+        suggestions = code_index(course_df).suggestions(course)
+        if suggestions:
+            print(f"Did you mean {', '.join(suggestions)}?")
+        return False
+    course = found
+
+    if 'plan' in flags or 'p' in flags:
+        codes = code_index(course_df)
+        print_plan(course, [codes.get(other) or other for other in taken], course_df)
+        return True
+
     text_index = 0
     for flag in flags:
         if flag == 'compact' or flag == 'c':
             text_index = 1
         elif flag == 'roots' or flag == 'r':
-            messy_roots = grow_roots(course, [], course_df)[:2]
-            compound_obligatory = CompoundCourseList.from_nested_list(messy_roots[0])
-            compound_recommended = CompoundCourseList.from_nested_list(messy_roots[1])
-
-            compound_obligatory.simplify()
-            compound_recommended.simplify()
+            compound_obligatory, compound_recommended = root_trees(course, course_df)
 
             if compound_obligatory and compound_recommended:
                 print(f"For å ta {course} må du først ta {compound_obligatory},"
                       f"og det anbefales også at du tar {compound_recommended}")
-            elif compound_obligatoy:
+            elif compound_obligatory:
                 print(f"For å ta {course} må du først ta {compound_obligatory}.")
             elif compound_recommended:
-                print(f"For å ta {course} anbefales de å ta {compound_obligatory}.")
+                print(f"For å ta {course} anbefales det å ta {compound_recommended}.")
             else:
                 print(f"Finner ingen forkunnskapskrav til {course}")
+        elif flag == 'leaves' or flag == 'l':
+            print_reachable(course, course_df, 'downstream')
+        elif flag == 'forest' or flag == 'f':
+            print_reachable(course, course_df, 'upstream')
+            print_reachable(course, course_df, 'downstream')
 
     results = False
     print(f'\n---\nSøker etter emner {course} peker mot...')
 
-    course_primitive = CourseListPrimitive(coursecode=[course])
-    if not course_primitive:
-        print("Couldn't find a course with that course code, please try another.")
-        return results
-
     total_text = ['', '']
 
-    for index, other_course_row in course_df.iterrows():
-
-        obligatory = False
-        if course in other_course_row['obligatory']:
-            obligatory = True
-        else:
-            for element in other_course_row['obligatory']:
-                if isinstance(element, list) and course in element:
-                    obligatory = True
-
-        recommended = False
-        if course in other_course_row['recommended']:
-            recommended = True
-        else:
-            for element in other_course_row['recommended']:
-                if isinstance(element, list) and course in element:
-                    recommended = True
-        
+    for other_course_row, obligatory, recommended, not_done in course_dependents(course, course_df):
 
         if obligatory:
-            obligatory_compound = CompoundCourseList.from_nested_list(other_course_row['obligatory'])
-            not_done = obligatory_compound.requirements_not_implied_by(course_primitive)
-            not_done.simplify()
-
             total_text[0] += f"\nEmnet leder til {other_course_row['coursecode']} - {other_course_row['coursename']}"\
                            + f"{f', hvis du også tar {not_done}' if not_done else ''}."
             total_text[1] += f"{other_course_row['coursecode']} - {other_course_row['coursename']} (obligatorisk)"
 
-            recommended_compound = CompoundCourseList.from_nested_list(other_course_row['recommended'])
+            recommended_compound = requirement_tree(other_course_row, 'recommended', course_df)
             total_text[0] += f"\n{recommended_compound} er anbefalt forkunnskaper." if recommended_compound else ""
             total_text[0] += "\n\n"
             total_text[1] += "\n"
 
         elif recommended:
-            recommended_compound = CompoundCourseList.from_nested_list(other_course_row['obligatory'])
-            not_done = recommended_compound.requirements_not_implied_by(course_primitive)
-            not_done.simplify()
             total_text[0] += f"Emnet er en anbefalt forkunnskap til {other_course_row['coursecode']} - {other_course_row['coursename']}"\
                            + f"{f', sammen med {not_done}' if not_done else ''}."
 
             total_text[1] += f"{other_course_row['coursecode']} - {other_course_row['coursename']} (anbefalt)"
 
-            obligatory_compound = CompoundCourseList.from_nested_list(other_course_row['obligatory'])
+            obligatory_compound = requirement_tree(other_course_row, 'obligatory', course_df)
             total_text[0] += f"\n{obligatory_compound} er den nødvendige forkunnskapen." if obligatory_compound else ""
             total_text[0] += "\n\n"
             total_text[1] += "\n"
@@ -149,34 +540,151 @@ def search_single_course(course, course_df, flags):
 
     return results
 
-if __name__ == '__main__':
-    course_df = pd.read_pickle('courses.pkl')
-    course_df.set_index('coursecode', drop=False, inplace=True)
-
-    print('Skriv inn en emnekode du vil se hva slags muligheter gir senere. Skriv \"-help\" for å se kommandoer og få hjelp.')
-
-    help_text = """---\nSkriv inn emnekode for å se hva slags andre emner du kan ta senere, hvis du tar det emnet først. Du kan også bruke følgende kommandoer:\n
+HELP_TEXT = """---\nSkriv inn emnekode for å se hva slags andre emner du kan ta senere, hvis du tar det emnet først. Du kan også bruke følgende kommandoer:\n
     -help eller -h tar deg med hit\n
     -compact eller -c viser deg en mer kompakt oversikt over emnene, hvor du ikke ser andre krav, men ser om emnet du drøfter er anbefalt eller obligatorisk forkunnskap
-    -leaves eller -l viser et tre med emner lengre frem enn ett hakk (ikke lagt til ennå)
+    -leaves eller -l viser alle emner lengre frem enn ett hakk
     -roots eller -r viser et tre med alle emnene du må ta for å kunne ta det emnet
     -old eller -o tar med emner som ikke lengre holdes (ikke lagt til ennå)
-    -multiple eller -m lar deg oppgi en liste med emner istedenfor bare ett (ikke lagt til ennå)
-    -forest eller -f lager en skog med alle koblinger enten i røtter eller i grener, til emnet du oppgir (ikke lagt til ennå)
+    -multiple eller -m lar deg oppgi en liste med emner istedenfor bare ett
+    -forest eller -f viser alle koblinger enten i røtter eller i grener, til emnet du oppgir
+    -name eller -n søker etter emner med ord i navnet som begynner med ordene du skriver, istedenfor emnekode
+    -plan eller -p viser de færreste emnene du må ta før emnet, og i hvilken rekkefølge. Skriv emnene du har tatt etter, som "MAT2400 -p MAT1100 MAT1110"
     \n---"""
 
-    run = True
-    while(run):
-        command = input('Emnekode: ')
-        course = re.search(r"^ *([A-ZÆØÅ\-]+\d*[A-ZÆØÅ\-]{0,6}\d{0,2})", command.upper()).group(1)
+def run_command(command, course_df=None):
+    """Runs one command, as typed in at the prompt, like 'MAT1100 -c'.
+
+    :param command: String with course code and flags. With the flag 'multiple' or 'm',
+                    every course code in it is searched for, and with 'name' or 'n', the
+                    words in it are searched for in the course names instead. With 'plan'
+                    or 'p', the course codes after the first are the courses already taken.
+    :param course_df: pandas.DataFrame instance with data, or None for the catalog.
+    """
+    match = re.search(r"^ *([A-ZÆØÅ\-]+\d*[A-ZÆØÅ\-]{0,6}\d{0,2})", command.upper())
+    course = match.group(1) if match else ''
+
+    flags = []
+    for flag in re.finditer(r"-(\w+)", command):
+        flag_str = flag.group(1)
+        flags.append(flag_str)
 
-        flags = []
-        for flag in re.finditer(r"-(\w+)", command):
-            flag_str = flag.group(1)
-            flags.append(flag_str)
+        if flag_str == 'h' or flag_str == 'help':
+            print(HELP_TEXT)
 
-            if flag_str == 'h' or flag_str == 'help':
-                print(help_text)
+    with instrumentation.query(command.strip()):
+        if 'n' in flags or 'name' in flags:
+            search_names(re.sub(r"(^|\s)-\w+", " ", command), course_df)
+            return
+
+        taken = []
+        if 'm' in flags or 'multiple' in flags:
+            courses = [word for word in read_courses([command]) if word[0] != '-']
+        else:
+            courses = [course] if course and course[0] != '-' else []
+            if 'p' in flags or 'plan' in flags:
+                taken = [word for word in read_courses([command]) if word[0] != '-'][1:]
+
+        for course in courses:
+            search_single_course(course, course_df, flags, taken)
+
+def run_batch(arguments):
+    """Runs search.py in batch mode, writing JSON lines to stdout, and throughput to stderr.
+
+    :param arguments: List of command line arguments after '-m'.
+    """
+    parser = argparse.ArgumentParser(
+        prog='search.py -m',
+        description="Writes a line of JSON for each course, with the courses it is a precursor "
+                    "to, and what else they require. Reads course codes from stdin if none are given.")
+    parser.add_argument('courses', nargs='*', help="Course codes.")
+    parser.add_argument('--file', help="File with course codes, separated by spaces, commas or lines.")
+    args = parser.parse_args(arguments)
+
+    # The courses are read as they are searched, so the file is open until all are done
+    start = time.perf_counter()
+    if args.courses:
+        count = search_batch(read_courses(args.courses))
+    elif args.file:
+        with open(args.file, encoding='utf-8') as course_file:
+            count = search_batch(read_courses(course_file))
+    else:
+        count = search_batch(read_courses(sys.stdin))
+    elapsed = time.perf_counter() - start
+    print(f"{count} emner på {elapsed:.2f} s, {count / elapsed if elapsed else 0:.1f} emner per sekund.",
+          file=sys.stderr)
+
+def run_server(arguments):
+    """Runs search.py as a local HTTP service, until it is interrupted.
+
+    :param arguments: List of command line arguments after '--serve'.
+    """
+    import SearchServer
+
+    parser = argparse.ArgumentParser(prog='search.py --serve',
+                                     description="Answers searches with JSON over HTTP, on localhost.")
+    parser.add_argument('--port', type=int, default=SearchServer.DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=SearchServer.DEFAULT_WORKERS,
+                        help="Requests to handle at the same time.")
+    parser.add_argument('--cache-size', type=int, default=SearchServer.DEFAULT_CACHE_SIZE,
+                        help="Answers to keep in the cache.")
+    args = parser.parse_args(arguments)
+
+    server = SearchServer.SearchServer(('127.0.0.1', args.port), args.workers, args.cache_size)
+    print(f"Svarer på http://127.0.0.1:{server.server_port}/course/<emnekode> og /stats", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+def instrumentation_options(arguments):
+    """Turns on timing and profiling as asked for with --timing and --profile PATH.
+
+    They can be given before or after anything else, with any command.
+
+    :param arguments: List of command line arguments.
+
+    :return: List of the other arguments.
+    """
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--timing', action='store_true',
+                        help="Write the time of each stage of each query as JSON to stderr.")
+    parser.add_argument('--profile', metavar='PATH', help="Dump a cProfile of each query to PATH.")
+    args, rest = parser.parse_known_args(arguments)
+    if args.timing:
+        instrumentation.enable()
+    if args.profile:
+        instrumentation.profile_path = args.profile
+    return rest
+
+if __name__ == '__main__':
+    sys.argv[1:] = instrumentation_options(sys.argv[1:])
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--serve':
+        run_server(sys.argv[2:])
+        sys.exit()
+
+    # A command given as arguments is answered straight from the catalog file, and the
+    # dataframe is only made if something needs it
+    if len(sys.argv) > 1 and sys.argv[1] in ('-m', '-multiple', '--multiple'):
+        run_batch(sys.argv[2:])
+        sys.exit()
+    if len(sys.argv) > 1:
+        run_command(' '.join(sys.argv[1:]))
+        sys.exit()
+
+    print('Skriv inn en emnekode du vil se hva slags muligheter gir senere. Skriv \"-help\" for å se kommandoer og få hjelp.')
 
-        if course[0] != '-':
-            results = search_single_course(course, course_df, flags)
+    try:
+        import readline
+    except ImportError:
+        readline = None
+    if readline is not None:
+        readline.set_completer(completer(code_index()))
+        readline.set_completer_delims(' ,;')
+        readline.parse_and_bind('tab: complete')
+
+    while True:
+        run_command(input('Emnekode: '))
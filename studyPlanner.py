@@ -0,0 +1,189 @@
+"""Planning the fewest courses to take to reach a course, given the courses already taken.
+
+Every obligatory group of a course in the plan has to be fulfilled by a course that is
+already taken, or that is in the plan and taken in an earlier semester. Finding the
+smallest such plan is a set cover problem, so it is found with branch and bound on the
+compiled CourseGraph, with explicit stacks so long chains of precursors don't hit the
+recursion limit: the search only branches on groups with alternatives, tries the
+alternatives that need the fewest courses first, never visits the same set of courses
+twice, and prunes plans that can't beat the best one found so far. It gives up after a
+time limit, returning the best plan found by then.
+"""
+
+import itertools
+import time
+
+from instrumentation import stage
+
+# Seconds to search before settling for the best plan found
+TIME_LIMIT = 1.0
+
+def requirement_groups(graph, course_id):
+    """Obligatory groups of a course, as frozensets of ids.
+
+    Some courses are listed among their own precursors in the data. The course is left
+    out of its groups, and groups with only the course itself are left out.
+    """
+    groups = (frozenset(group) - {course_id} for group in graph.requirements["obligatory"].groups(course_id))
+    return [group for group in groups if group]
+
+def semesters(graph, plan, taken):
+    """Orders the courses of a plan into semesters, each as early as its precursors allow.
+
+    Courses that require each other in a loop, like courses that are meant to be taken
+    together, are put in the same semester.
+
+    :param graph: CourseGraph instance.
+    :param plan: Iterable of course ids to order.
+    :param taken: Set of course ids already taken.
+
+    :return: List of semesters, each a sorted list of course ids, or None if the plan
+             can't be ordered, because some course needs a course that isn't in it.
+    """
+    left, before, ordered = set(plan), set(taken), []
+
+    # Groups of each course not fulfilled yet, and the groups each course would fulfill
+    open_groups, fulfills = {}, {}
+    for course_id in left:
+        open_groups[course_id] = {group for group in requirement_groups(graph, course_id) if before.isdisjoint(group)}
+        for group in open_groups[course_id]:
+            for member in group:
+                fulfills.setdefault(member, []).append((course_id, group))
+
+    def reach(course_id):
+        """Courses left that a course needs, directly or through other courses left."""
+        found, stack = set(), [course_id]
+        while stack:
+            for group in open_groups[stack.pop()]:
+                new = left.intersection(group) - found
+                found |= new
+                stack.extend(new)
+        return found
+
+    ready = [course_id for course_id in left if not open_groups[course_id]]
+    while left:
+        semester = ready
+        if not semester:
+            reaches = {course_id: reach(course_id) for course_id in left}
+            for course_id in left:
+                loop = {other for other in reaches[course_id] if course_id in reaches[other]} | {course_id}
+                if all(loop.intersection(group) for member in loop for group in open_groups[member]):
+                    semester.append(course_id)
+        if not semester:
+            return None
+        semester.sort(key=graph.codes.__getitem__)
+        ordered.append(semester)
+        left.difference_update(semester)
+        before.update(semester)
+
+        ready = []
+        for course_id in semester:
+            for other, group in fulfills.get(course_id, ()):
+                if other in left and group in open_groups[other]:
+                    open_groups[other].discard(group)
+                    if not open_groups[other]:
+                        ready.append(other)
+    return ordered
+
+@stage()
+def plan(graph, target, taken=(), time_limit=TIME_LIMIT):
+    """Finds the fewest courses to take to be able to take a course, and when to take them.
+
+    :param graph: CourseGraph instance.
+    :param target: Course code, string, of the course to reach.
+    :param taken: Iterable of course codes already taken. Codes not in graph are ignored.
+    :param time_limit: Float. Seconds to search for the smallest plan.
+
+    :return: 2-tuple with the plan, as a list of semesters each with a sorted list of
+             course codes, the target last, and whether the plan is known to be the
+             smallest. The plan is None if there is no way to reach the target.
+    """
+    if target not in graph.ids:
+        raise ValueError(f"Unknown course code '{target}'")
+
+    taken = {graph.ids[code] for code in taken if code in graph.ids}
+    target_id = graph.ids[target]
+    if target_id in taken:
+        return [], True
+
+    open_groups = {}
+
+    def groups(course_id):
+        """Groups of a course not fulfilled by the courses taken, as frozensets of ids."""
+        if course_id not in open_groups:
+            open_groups[course_id] = [group for group in requirement_groups(graph, course_id)
+                                      if taken.isdisjoint(group)]
+        return open_groups[course_id]
+
+    def members(course_id):
+        """Iterator over the courses in the open groups of a course."""
+        return iter(set(itertools.chain.from_iterable(groups(course_id))))
+
+    depths = {}
+
+    def depth(course_id):
+        """Fewest courses it takes to take a course, itself included, counting only the
+        longest chain of groups. Never more than the real number, so it can be used to
+        order alternatives without missing the best one.
+
+        Found with an iterative depth first search, like in CourseGraph.walk()."""
+        if course_id in depths:
+            return depths[course_id]
+
+        # Courses in loops are counted as one while their depth is found
+        depths[course_id] = 1
+        work = [(course_id, members(course_id))]
+        while work:
+            current, unvisited = work[-1]
+            for member in unvisited:
+                if member not in depths:
+                    depths[member] = 1
+                    work.append((member, members(member)))
+                    break
+            else:
+                work.pop()
+                depths[current] = 1 + max((min(depths[member] for member in group) for group in groups(current)),
+                                          default=0)
+        return depths[course_id]
+
+    def lower_bound(unfulfilled):
+        """Fewest new courses that fulfill groups, as the number of groups without common courses."""
+        count, used = 0, set()
+        for group in sorted(unfulfilled, key=len):
+            if used.isdisjoint(group):
+                count += 1
+                used |= group
+        return count
+
+    best, best_size, optimal = None, float("inf"), True
+    visited = set()
+    deadline = time.perf_counter() + time_limit
+
+    # Depth first, with the most promising alternative on top of the stack
+    stack = [(frozenset([target_id]), list(groups(target_id)))]
+    while stack:
+        chosen, unfulfilled = stack.pop()
+        if chosen in visited:
+            continue
+        visited.add(chosen)
+        if len(visited) % 256 == 0 and time.perf_counter() > deadline:
+            optimal = False
+            break
+        if len(chosen) + lower_bound(unfulfilled) >= best_size:
+            continue
+
+        if not unfulfilled:
+            ordered = semesters(graph, chosen, taken)
+            if ordered is not None:
+                best, best_size = ordered, len(chosen)
+            continue
+
+        group = min(unfulfilled, key=len)
+        for member in sorted(group, key=lambda member: (depth(member), graph.codes[member]), reverse=True):
+            stack.append((chosen | {member},
+                          [other for other in unfulfilled if member not in other]
+                          + [new for new in groups(member) if chosen.isdisjoint(new)]))
+
+    if best is None:
+        return None, optimal
+    return [[graph.codes[course_id] for course_id in semester] for semester in best], optimal
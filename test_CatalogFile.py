@@ -0,0 +1,52 @@
+import pytest
+import pandas as pd
+
+from Catalog import Catalog
+from CatalogFile import CatalogFile, write_catalog, HEADER
+from CourseGraph import CourseGraph
+from search import make_dependents_index
+
+def test_round_trip(tmp_path):
+    """Test that the catalog file gives back the same dataframe and graph as the pickle."""
+
+    course_df = pd.read_pickle("courses.pkl")
+    path = str(tmp_path / "courses.catalog")
+    write_catalog(course_df, path)
+
+    catalog_file = CatalogFile(path)
+    assert catalog_file.to_dataframe().equals(course_df)
+
+    graph, expected = catalog_file.graph(), CourseGraph.from_dataframe(course_df)
+    assert graph.codes == expected.codes and graph.known == expected.known
+    for course_id in range(len(graph)):
+        for kind in ("obligatory", "recommended"):
+            assert graph.nested_list(course_id, kind) == expected.nested_list(course_id, kind)
+    assert graph.walk([graph.ids["MAT1110"]]) == expected.walk([expected.ids["MAT1110"]])
+
+    assert dict(catalog_file.dependents()) == make_dependents_index(course_df)
+    assert catalog_file.row(5) == course_df.iloc[5].to_dict()
+
+def test_catalog_formats():
+    """Test that the catalog loads the same data from both formats, and keeps the graph of the file."""
+
+    from_file, from_pickle = Catalog("courses.catalog"), Catalog("courses.pkl")
+    assert from_file.df.equals(from_pickle.df)
+    assert from_file.file is not None and from_pickle.file is None
+    assert from_file.derived("graph", CourseGraph.from_dataframe) is from_file.file.graph()
+
+    from_file.set_dataframe(from_pickle.df)
+    assert from_file.file is None
+
+def test_wrong_version(tmp_path):
+    """Test that files of other versions, or that aren't catalog files, are refused."""
+
+    path = tmp_path / "courses.catalog"
+    write_catalog(pd.read_pickle("courses.pkl")[:10], str(path))
+    content = bytearray(path.read_bytes())
+    magic, _, manifest_length = HEADER.unpack_from(content)
+    path.write_bytes(HEADER.pack(magic, 99, manifest_length) + content[HEADER.size:])
+
+    with pytest.raises(ValueError, match="version 99"):
+        CatalogFile(str(path))
+    with pytest.raises(ValueError, match="not a catalog file"):
+        CatalogFile("courses.pkl")
@@ -0,0 +1,26 @@
+from Checkpoint import Checkpoint
+
+def test_checkpoint_resume(tmp_path):
+    """Test that results are there after reopening, and a half written last line is cut off."""
+
+    path = str(tmp_path / "scrape.checkpoint")
+    checkpoint = Checkpoint(path, sync_every=2)
+    checkpoint.add("https://a/", [[["MAT1100", "MAT1110"], "IN1000"], []])
+    checkpoint.add("https://b/")
+    checkpoint.add("https://c/", "første")
+    # Killed while writing the next line
+    checkpoint._file.write('{"key": "https://d/", "res')
+    checkpoint._file.flush()
+
+    resumed = Checkpoint(path)
+    assert len(resumed) == 3
+    assert resumed.get("https://a/") == [[["MAT1100", "MAT1110"], "IN1000"], []]
+    assert "https://b/" in resumed and "https://d/" not in resumed
+    assert resumed.get("https://c/") == "første"
+
+    resumed.add("https://d/", 4)
+    resumed.close()
+    assert Checkpoint(path).get("https://d/") == 4
+
+    resumed.remove()
+    assert len(Checkpoint(path)) == 0
@@ -0,0 +1,63 @@
+import pytest
+
+from CodeIndex import CodeIndex, edit_distance
+from search import completer
+
+CODES = ["MAT1100", "MAT1110", "MAT1120", "MAT2400", "FYS-MEK1110", "IN1000", "IN1010", "ara2011"]
+
+@pytest.mark.parametrize(
+    "first, second, expected",
+    [
+        ("MAT1100", "MAT1100", 0),
+        ("MAT1100", "MAT1101", 1),
+        ("MAT1100", "MAT1010", 1),
+        ("MAT1100", "MTA1100", 1),
+        ("MAT11", "MAT1100", 2),
+        ("IN1000", "MAT1100", 4),
+    ],
+)
+def test_edit_distance(first, second, expected):
+    """Test the distance, and that it is cut off at limit + 1."""
+
+    assert edit_distance(first, second, 3) == expected
+    assert edit_distance(first, second, 1) == min(expected, 2)
+
+def test_lookup_and_complete():
+    """Test that codes are found in any case, and completed from a prefix."""
+
+    codes = CodeIndex(CODES)
+    assert "mat1100" in codes and "ARA2011" in codes and "MAT1" not in codes
+    assert codes.get("ARA2011") == "ara2011"
+    assert codes.complete("mat11") == ["MAT1100", "MAT1110", "MAT1120"]
+    assert codes.complete("FYS-") == ["FYS-MEK1110"]
+    assert codes.complete("MAT", limit=2) == ["MAT1100", "MAT1110"]
+    assert codes.complete("X") == []
+
+def test_suggestions():
+    """Test that close codes are suggested, closest and completions first."""
+
+    codes = CodeIndex(CODES)
+    assert codes.suggestions("MAT1101")[:1] == ["MAT1100"]
+    assert codes.suggestions("MTA1100")[:1] == ["MAT1100"], "Typo in the letters found nothing"
+    assert codes.suggestions("MAT11") == ["MAT1100", "MAT1110", "MAT1120"]
+    assert codes.suggestions("FYS-MEK111") == ["FYS-MEK1110"]
+    assert codes.suggestions("XYZ9999") == []
+    assert codes.suggestions("MAT1101", max_distance=1) == ["MAT1100", "MAT1110"]
+    with pytest.raises(ValueError):
+        codes.suggestions("MAT1101", max_distance=3)
+
+def test_not_course_codes():
+    """Test that what the parser took for codes, like '-1', is left out of the index."""
+
+    codes = CodeIndex(CODES + ["-1", "-10", "-2017", "1100"])
+    assert len(codes) == len(CODES)
+    assert "-1" not in codes and "1100" not in codes
+    assert codes.suggestions("-1") == []
+    assert codes.suggestions("1100") == []
+
+def test_completer():
+    """Test the readline completer, that is asked for one completion at a time."""
+
+    complete = completer(CodeIndex(CODES))
+    assert [complete("IN", state) for state in range(3)] == ["IN1000", "IN1010", None]
+    assert complete("-c", 0) is None
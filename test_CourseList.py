@@ -1,6 +1,7 @@
 import pytest
 
 from CourseList import CourseListPrimitive, CompoundCourseList
+from Catalog import catalog
 
 @pytest.mark.parametrize(
     "test_case, str_course_parameters, quantity, course_parameters",
@@ -60,6 +61,26 @@ def test_CourseListPrimitive_str():
     assert set(strCourseList.courses) == set(courseList.courses), "Courses don't match"
     assert strCourseList == courseList, "Equality failed"
 
+def test_CourseListPrimitive_interned():
+    """Test that equal primitives are one object, that can't be changed."""
+
+    primitive = CourseListPrimitive(coursecode=["MAT1100", "MAT1110"], quantity=1)
+    assert CourseListPrimitive(coursecode=("MAT1100", "MAT1110"), quantity=1) is primitive
+    assert CourseListPrimitive(coursecode=["MAT1110", "MAT1100"], quantity=1) is not primitive
+    assert CourseListPrimitive(coursecode=["MAT1100", "MAT1110"]) * 1 is primitive
+    assert len({primitive, CourseListPrimitive(coursecode=["MAT1100", "MAT1110"], quantity=1)}) == 1
+
+    with pytest.raises(AttributeError):
+        primitive.parent = None
+    assert not hasattr(primitive, "__dict__"), "Primitive has a __dict__"
+
+    left = primitive.assume_taken("MAT1100")
+    assert left.quantity == 0 and primitive.quantity == 1, "assume_taken changed the primitive"
+
+    compound = CompoundCourseList(primitive, CourseListPrimitive(coursecode=["IN1000"]))
+    compound.assume_taken("IN1000")
+    assert compound.children == [primitive], "Taken course not removed from compound"
+
 def test_CourseListPrimitive_to_Compound():
     """Tests __mul__, __and__ and __or__"""
 
@@ -110,7 +131,62 @@ def test_implies():
     implies_3_compound = implied_1 & CourseListPrimitive(coursecode=["MAT1110", "MAT1120"])
     assert implies_3_compound.implies(implied_3), "Missed 'and'-implication"
 
-# TODO: Make tests for: requirements_not_fulfilled_by and assume_taken 
+    not_implied = CourseListPrimitive(coursecode=["MAT1100", "MAT1110", "MAT1120"], quantity=2)
+    assert not CourseListPrimitive(coursecode=["MAT1100"]).implies(not_implied), "False implication"
+    assert not (implied_1 | implies_1).implies(implies_1), "False 'or'-implication"
+
+def test_is_fulfilled_by():
+    """Test that requirements are checked by counting courses, for both classes."""
+
+    courseList_1 = CourseListPrimitive(coursecode=["MAT1100", "MAT1110", "MAT1120"], quantity=2)
+    assert courseList_1.is_fulfilled_by(["MAT1100", "MAT1120", "IN1000"])
+    assert not courseList_1.is_fulfilled_by(["MAT1100", "IN1000"])
+
+    compound = CompoundCourseList.from_nested_list([["STK1100", "STK1110"], "IN1000"])
+    assert compound.is_fulfilled_by(["STK1110", "IN1000"])
+    assert not compound.is_fulfilled_by(["STK1110", "STK1100"])
+    assert (compound | courseList_1).is_fulfilled_by(["MAT1100", "MAT1110"])
+
+def test_requirements_not_implied_by():
+    """Test that what is left of the requirements is found, for both classes."""
+
+    courseList_1 = CourseListPrimitive(coursecode=["MAT1100", "MAT1110", "MAT1120"], quantity=2)
+    left = courseList_1.requirements_not_implied_by(CourseListPrimitive(coursecode=["MAT1110"]))
+    assert left.courses == ["MAT1100", "MAT1120"] and left.quantity == 1
+
+    done = courseList_1.requirements_not_implied_by(CourseListPrimitive(coursecode=["MAT1100", "MAT1120"]))
+    assert not done, "Fulfilled requirements not empty"
+
+    compound = CompoundCourseList.from_nested_list([["STK1100", "STK1110"], ["IN1000", "IN1900"], "MAT1100"])
+    left = compound.requirements_not_implied_by(CourseListPrimitive(coursecode=["STK1100", "MAT1100"]))
+    assert str(left) == "1 of [Coursecode: IN1000, IN1900]"
+
+    either = CourseListPrimitive(coursecode=["IN1000", "IN1900"], quantity=1)
+    left = compound.requirements_not_implied_by(either)
+    assert str(left) == "1 of [Coursecode: STK1100, STK1110] and all of [Coursecode: MAT1100]", \
+        "Implied requirements not removed"
+
+    left = compound.requirements_not_implied_by(CourseListPrimitive(search=["IN1..0"], quantity=2))
+    assert "IN1000" in left, "Courses that might not be taken counted"
+
+def test_simplify():
+    """Test that redundancy is removed from compounds."""
+
+    compound = CompoundCourseList(
+        CourseListPrimitive(coursecode=["MAT1100", "MAT1110"], quantity=1),
+        CourseListPrimitive(coursecode=["MAT1100"]),
+        CompoundCourseList(CourseListPrimitive(coursecode=["IN1000"]), relationship="or"),
+    )
+    compound.simplify()
+    assert str(compound) == "all of [Coursecode: MAT1100, IN1000]"
+
+    compound = CompoundCourseList(
+        CourseListPrimitive(coursecode=["MAT1100", "MAT1110"]),
+        CourseListPrimitive(coursecode=["MAT1100"]),
+        relationship="or"
+    )
+    compound.simplify()
+    assert str(compound) == "all of [Coursecode: MAT1100]"
 
 def test_course_combinations():
     """Test course_combinations method, for both classes."""
@@ -140,17 +216,16 @@ def test_course_combinations():
     ]
     assert list(compound_2.course_combinations) == expected, "Couldn't find compound 'and'-combinations"
 
+def test_catalog_shared():
+    """Test that primitives resolve against the one shared catalog."""
 
+    course_df = catalog.df
+    assert catalog.df is course_df, "Catalog loaded the dataframe twice"
 
+    try:
+        catalog.set_dataframe(course_df[course_df["faculty"] == "hf"])
+        assert CourseListPrimitive(search=["MAT1..."]).courses == [], "Didn't use injected dataframe"
+    finally:
+        catalog.set_dataframe(course_df)
 
-
-
-
-
-
-
-
-
-
-
-
+    assert CourseListPrimitive(search=["MAT1100"]).courses, "Didn't use restored dataframe"
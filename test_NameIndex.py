@@ -0,0 +1,41 @@
+import pytest
+
+from NameIndex import NameIndex, fold, words
+
+CODES = ["MAT1110", "MAT1120", "ECON1410", "INEC1800", "FIL2000", "FIL2000", "KJM1000"]
+NAMES = ["Kalkulus og lineær algebra", "Lineær algebra", "Internasjonal økonomi",
+         "Økonomi, finans og regnskap", "Idéhistorie", "Ikke denne", ""]
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [("økonomi", "okonomi"), ("lineær", "lineaer"), ("år", "ar"), ("idé", "ide"), ("matte", "matte")],
+)
+def test_fold(word, expected):
+    """Test that æ, ø, å and accents are folded away."""
+
+    assert fold(word) == expected
+
+def test_words():
+    """Test that words are split and lower cased, keeping Norwegian letters."""
+
+    assert words("Økonomi, finans og REGNSKAP") == ["økonomi", "finans", "og", "regnskap"]
+    assert words("Lineær  algebra 1") == ["lineær", "algebra", "1"]
+
+def test_search():
+    """Test ranked searches for whole words, starts of words, and folded letters."""
+
+    names = NameIndex(CODES, NAMES)
+    assert len(names) == 6, "Code in two rows indexed twice"
+
+    assert [code for code, _, _ in names.search("lineær algebra")] == ["MAT1120", "MAT1110"], \
+        "Shorter name not ranked first"
+    assert [code for code, _, _ in names.search("LINEAER ALG")] == ["MAT1120", "MAT1110"]
+    assert [code for code, _, _ in names.search("kalk alg")] == ["MAT1110"], "Terms not all required"
+    assert {code for code, _, _ in names.search("okonomi")} == {"ECON1410", "INEC1800"}
+    assert [code for code, _, _ in names.search("idehist")] == ["FIL2000"]
+    assert names.search("denne") == [], "Name of second row of a code indexed"
+    assert names.search("algebra", limit=1)[0][:2] == ("MAT1120", "Lineær algebra")
+    assert names.search("") == [] and names.search("xyz") == []
+
+    whole, start = names.search("økonomi")[0][2], names.search("økono")[0][2]
+    assert whole > start, "Whole word didn't score more than the start of it"
@@ -0,0 +1,87 @@
+import sqlite3
+
+import pytest
+import requests
+
+from Fetcher import Fetcher
+from PageArchive import PageArchive
+from scrapeEachCourse import scrape_courses
+from scrapeForCourses import get_course_pages
+
+PAGE = b"<html><body>" + b"<p>MAT1100 Kalkulus</p>" * 100 + b"</body></html>"
+
+def test_archive_scrapes(tmp_path):
+    """Test that pages are found as they were in each scrape, and stored once per content."""
+
+    path = str(tmp_path / "pages.archive")
+    spring = PageArchive(path, "2026-01-10")
+    spring.put("https://a/", PAGE)
+    spring.put("https://b/", PAGE + b"b")
+    spring.close()
+
+    autumn = PageArchive(path, "2026-08-10")
+    autumn.put("https://a/", PAGE)
+    autumn.put("https://b/", PAGE + b"changed")
+
+    assert autumn.get("https://b/") == PAGE + b"changed"
+    assert autumn.get("https://b/", "2026-01-10") == PAGE + b"b"
+    assert autumn.get("https://b/", "2026-05-01") == PAGE + b"b"
+    assert autumn.get("https://b/", "2025-12-31") is None
+    assert autumn.get("https://c/") is None
+    assert "https://a/" in autumn and "https://c/" not in autumn
+    assert autumn.scrapes() == ["2026-01-10", "2026-08-10"]
+    assert autumn.urls() == ["https://a/", "https://b/"]
+    autumn.close()
+
+    with sqlite3.connect(path) as connection:
+        contents, size, stored = connection.execute(
+            "SELECT COUNT(*), SUM(size), SUM(LENGTH(data)) FROM contents").fetchone()
+    assert contents == 3, "Unchanged page stored again"
+    assert stored < size / 5
+
+def test_archive_batched(tmp_path):
+    """Test that pages are committed in batches, and found before they are committed."""
+
+    path = str(tmp_path / "pages.archive")
+    archive = PageArchive(path, "2026-10-18", commit_every=3)
+
+    def committed():
+        with sqlite3.connect(path) as connection:
+            return connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    archive.put("https://a/", PAGE)
+    archive.put("https://b/", PAGE)
+    assert committed() == 0
+    assert archive.get("https://b/") == PAGE
+    archive.put("https://c/", PAGE + b"c")
+    assert committed() == 3
+
+    archive.put("https://d/", PAGE)
+    archive.flush()
+    assert committed() == 4
+    archive.put("https://e/", PAGE)
+    archive.close()
+    assert committed() == 5
+
+def test_archive_replay(fixture_server, course_df, tmp_path):
+    """Test that a scrape can be replayed from the archive, without the network."""
+
+    archive = PageArchive(str(tmp_path / "pages.archive"))
+    base_url = f"http://127.0.0.1:{fixture_server.server_port}/studier/emner/"
+    fixture_server.listing_pages = 3
+    listing_url = base_url + "alle/?page="
+
+    pages = get_course_pages(listing_url, Fetcher(workers=2, archive=archive))
+    scraped = scrape_courses(course_df, Fetcher(workers=2, archive=archive), base_url, progress=False)
+    requests_made = len(fixture_server.requests)
+    assert base_url + "matnat/math/MISSING1000/" not in archive, "Page not found archived"
+
+    replay = archive.replay(workers=2)
+    assert get_course_pages(listing_url, replay) == pages
+    assert scrape_courses(course_df, replay, base_url, progress=False) == scraped
+    assert len(fixture_server.requests) == requests_made, "Replay used the network"
+
+    # Pages that were never fetched are like pages that couldn't be fetched
+    with pytest.raises(requests.RequestException):
+        replay.get(base_url + "matnat/math/NEW1000/")
+    replay.close()
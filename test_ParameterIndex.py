@@ -0,0 +1,57 @@
+import pytest
+import pandas as pd
+
+from Catalog import catalog
+from CourseGraph import CourseGraph
+from ParameterIndex import ParameterIndex, bitset
+
+def mask_courses(course_df, included, excluded):
+    """The courses selected with boolean masks over the dataframe, as a set."""
+    def selected(pairs):
+        mask = pd.Series(False, index=course_df.index)
+        for parameter, value in pairs:
+            if parameter == "search":
+                mask |= course_df["coursecode"].str.contains(value)
+            else:
+                mask |= course_df[parameter] == value
+        return set(course_df.loc[mask, "coursecode"])
+    return selected(included) - selected(excluded)
+
+@pytest.mark.parametrize(
+    "included, excluded",
+    [
+        ([("faculty", "matnat")], []),
+        ([("faculty", "matnat"), ("search", r"MAT3...")], []),
+        ([("institute", "ifi"), ("institute", "math")], [("search", r"IN1...")]),
+        ([("search", r"STK\d\d\d\d")], [("faculty", "matnat")]),
+        ([("faculty", "hf")], [("institute", "ilos"), ("coursecode", "FIL1000")]),
+        ([("faculty", "nofaculty")], []),
+    ],
+)
+def test_select_matches_masks(included, excluded):
+    """Test that bitsets select the same courses as boolean masks over the dataframe."""
+
+    index = ParameterIndex.from_catalog(catalog)
+    courses = index.select(included, excluded)
+    assert len(courses) == len(set(courses)), "Course selected twice"
+    assert set(courses) == mask_courses(catalog.df, included, excluded)
+
+def test_select_order_and_unknown_codes():
+    """Test that courses come in the order of the data, with codes not in it last."""
+
+    course_df = pd.DataFrame({
+        "coursecode": ["B1000", "A1000", "C1000", "B1000"],
+        "faculty": ["mn", "mn", "hf", "mn"],
+        "institute": ["x", "y", "y", "x"],
+        "obligatory": ["", "", ["D1"], ""],
+        "recommended": ["", "", "", ""],
+    })
+    index = ParameterIndex(CourseGraph.from_dataframe(course_df), course_df["coursecode"].values,
+                           {"faculty": course_df["faculty"].values, "institute": course_df["institute"].values})
+
+    assert index.select([("faculty", "mn")], []) == ("B1000", "A1000")
+    assert index.select([("institute", "y"), ("coursecode", "X9"), ("coursecode", "B1000")],
+                        [("faculty", "hf")]) == ("B1000", "A1000", "X9")
+    assert index.select([("search", "1000")], [("coursecode", "A1000")]) == ("B1000", "C1000")
+    assert index.select([("search", "D1")], []) == (), "Matched code that isn't in the data"
+    assert index.codes(bitset([True, False, True])) == ["B1000", "C1000"]
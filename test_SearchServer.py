@@ -0,0 +1,111 @@
+import concurrent.futures
+import json
+import shutil
+import socket
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+import pandas as pd
+
+import search
+from Catalog import Catalog
+from CatalogFile import write_catalog
+from LRUCache import LRUCache
+from SearchServer import SearchServer, SearchHandler
+
+def test_lru_cache():
+    """Test that the entry used longest ago is dropped, and that hits and misses are counted."""
+
+    cache = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache and cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses, len(cache)) == (3, 1, 2)
+    assert cache.hit_rate == 0.75
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Search server on a free port, answering from a copy of the catalog file."""
+    path = str(tmp_path / "courses.catalog")
+    shutil.copy("courses.catalog", path)
+    monkeypatch.setattr(search, "catalog", Catalog(path))
+
+    server = SearchServer(("127.0.0.1", 0), workers=4, cache_size=16)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def get(server, path):
+    """Status and JSON of a GET request to the server."""
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}{path}") as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+def test_search_server(server):
+    """Test that searches are answered like the batch mode, from the cache when asked again."""
+
+    status, answer = get(server, "/course/mat1110?flags=r,leaves")
+    assert status == 200
+    assert answer["dependents"] == search.course_record("MAT1110")["dependents"]
+    assert answer["roots"]["recommended"] is not None and "downstream" in answer and "upstream" not in answer
+
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        answers = list(executor.map(lambda _: get(server, "/course/MAT1110?flags=l,roots"), range(20)))
+    assert answers == [(200, answer)] * 20
+
+    assert get(server, "/course/NOTACOURSE1000")[0] == 404
+    assert get(server, "/nothing")[0] == 404
+
+    stats = get(server, "/stats")[1]
+    assert stats["requests"] == 22
+    assert stats["cache"]["misses"] == 2 and stats["cache"]["hits"] == 20
+    assert stats["latency_ms"]["p50"] <= stats["latency_ms"]["p99"] <= stats["latency_ms"]["max"]
+
+def test_search_server_names(server):
+    """Test that courses are found by name."""
+
+    status, answer = get(server, "/names?q=line%C3%A6r%20alg&limit=1")
+    assert status == 200
+    assert answer["courses"] == [{"coursecode": "MAT1120", "coursename": "Lineær algebra",
+                                  "score": answer["courses"][0]["score"]}]
+    assert get(server, "/names?q=xyzzy")[1]["courses"] == []
+
+def test_search_server_catalog_changed(server):
+    """Test that cached answers are dropped when the catalog file changes."""
+
+    assert get(server, "/course/MAT4010")[0] == 200
+
+    # No other course has MAT4010 as a precursor, so it is gone from the catalog
+    course_df = pd.read_pickle("courses.pkl")
+    write_catalog(course_df[course_df["coursecode"] != "MAT4010"], search.catalog.path)
+
+    status, answer = get(server, "/course/MAT4010")
+    assert status == 404 and "MAT4110" in answer["suggestions"]
+    stats = get(server, "/stats")[1]
+    assert stats["catalog"]["changes"] == 1 and stats["cache"]["hits"] == 0
+
+def test_idle_connections(server, monkeypatch):
+    """Test that connections left idle are closed, so they don't hold every worker."""
+
+    assert 0 < SearchHandler.timeout <= 30
+    monkeypatch.setattr(SearchHandler, "timeout", 0.5)
+    idle = [socket.create_connection(("127.0.0.1", server.server_port)) for _ in range(server.workers)]
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/stats", timeout=5) as response:
+            assert response.status == 200
+        for connection in idle:
+            connection.settimeout(5)
+            assert connection.recv(1) == b"", "Idle connection not closed"
+    finally:
+        for connection in idle:
+            connection.close()
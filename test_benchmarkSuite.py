@@ -0,0 +1,20 @@
+from benchmarkSuite import regressions
+
+def test_regressions():
+    """Test that only increases over the threshold, and above the noise, are regressions."""
+
+    baseline = {
+        "slower": {"median_ms": 10.0, "min_ms": 10.0, "peak_kib": 100.0},
+        "within": {"median_ms": 10.0, "min_ms": 10.0, "peak_kib": 100.0},
+        "noise": {"median_ms": 0.01, "min_ms": 0.01, "peak_kib": 1.0},
+        "removed": {"median_ms": 1.0, "min_ms": 1.0, "peak_kib": 1.0},
+    }
+    results = {
+        "slower": {"median_ms": 12.0, "min_ms": 12.6, "peak_kib": 200.0},
+        "within": {"median_ms": 20.0, "min_ms": 12.4, "peak_kib": 120.0},
+        "noise": {"median_ms": 0.04, "min_ms": 0.04, "peak_kib": 1.5},
+        "added": {"median_ms": 1.0, "min_ms": 1.0, "peak_kib": 1.0},
+    }
+    assert regressions(results, baseline, 0.25) == [("slower", "min_ms", 10.0, 12.6),
+                                                    ("slower", "peak_kib", 100.0, 200.0)]
+    assert regressions(results, baseline, 1.0) == []
@@ -0,0 +1,66 @@
+import io
+import json
+import pstats
+
+import pytest
+
+import instrumentation
+import search
+from Catalog import Catalog
+from CourseList import CourseListPrimitive, CompoundCourseList
+
+@pytest.fixture
+def timing():
+    instrumentation.enable()
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+
+def test_stages_untouched_when_disabled():
+    """Test that stages are the plain functions while timing is off."""
+
+    assert not instrumentation.is_enabled()
+    assert not hasattr(search.grow_roots, "__wrapped__")
+    assert not hasattr(CompoundCourseList.simplify, "__wrapped__")
+    assert not hasattr(vars(Catalog)["_dataframe"].__func__, "__wrapped__")
+
+def test_query_breakdown(timing):
+    """Test that a query gets a line of JSON with the calls and time of its stages."""
+
+    output = io.StringIO()
+    with instrumentation.query("MAT1120 -r", output):
+        search.grow_roots("MAT1120", [], None)
+        inner = CompoundCourseList.from_nested_list([["STK1100", "STK1110"], "IN1000"])
+        CompoundCourseList(inner, CourseListPrimitive(coursecode=["MAT1100"]), relationship="or").simplify()
+
+    breakdown = json.loads(output.getvalue())
+    assert breakdown["query"] == "MAT1120 -r"
+    stages = breakdown["stages"]
+    assert stages["search.grow_roots"]["calls"] == 1
+    assert stages["CompoundCourseList.from_nested_list"]["calls"] == 1
+    # Recursive calls are counted, but only the outermost is timed
+    assert stages["CompoundCourseList.simplify"]["calls"] == 2
+    assert 0 <= stages["CompoundCourseList.simplify"]["ms"] <= breakdown["ms"]
+
+def test_disable_restores(timing):
+    """Test that disabling puts back the functions, keeping classmethods classmethods."""
+
+    assert hasattr(search.grow_roots, "__wrapped__")
+    instrumentation.disable()
+    assert not hasattr(search.grow_roots, "__wrapped__")
+    assert isinstance(vars(CompoundCourseList)["from_nested_list"], classmethod)
+    assert isinstance(vars(Catalog)["_dataframe"], staticmethod)
+
+def test_profile(tmp_path, monkeypatch):
+    """Test that a query can be profiled without timing it."""
+
+    path = tmp_path / "query.prof"
+    monkeypatch.setattr(instrumentation, "profile_path", str(path))
+    output = io.StringIO()
+    with instrumentation.query("MAT1120", output):
+        search.grow_roots("MAT1120", [], None)
+
+    assert output.getvalue() == ""
+    functions = {function for _, _, function in pstats.Stats(str(path)).stats}
+    assert "grow_roots" in functions
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+import prerequisiteParser
+from scrapeEachCourse import get_prerequisites
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+@pytest.mark.parametrize("text, expected", [
+    ("Obligatoriske forkunnskaper MAT1100/MAT-INF1100 og IN1900. Anbefalte forkunnskaper IN1000 eller IN1900 Undervisning",
+     ([["MAT1100", "MAT-INF1100"], "IN1900"], [["IN1000", "IN1900"]])),
+    ("Formal prerequisites MAT1100 (or MAT1001), IN1000 or IN1900 og IN1150 Teaching MAT9999",
+     ([["MAT1100", "MAT1001"], ["IN1000", "IN1900"], "IN1150"], [])),
+    ("Recommended previous knowledge MAT1100, MAT1110. Overlapping courses MAT1111",
+     ([], ["MAT1100", "MAT1110"])),
+    ("No prerequisites here: MAT1100/MAT1110 Teaching", ([], [])),
+    ("", ([], [])),
+])
+def test_parse(text, expected):
+    """Test that sections, codes and alternatives are found like on the course pages."""
+    assert prerequisiteParser.parse(text) == expected
+
+def test_parse_section_in_place():
+    """Test that a section is parsed inside the text, without reading past its end."""
+
+    text = "IN1000 MAT1100/MAT1110/MAT1120 og IN1900"
+    assert prerequisiteParser.parse_section(text) == ["IN1000", ["MAT1100", "MAT1110", "MAT1120"], "IN1900"]
+    assert prerequisiteParser.parse_section(text, 7, 22) == [["MAT1100", "MAT1110"]]
+
+def test_get_prerequisites_fixtures():
+    """Test that the text of a course page is only taken from clean strings, links included."""
+
+    with open(os.path.join(FIXTURES, "course_IN2010.html"), "rb") as page_file:
+        content = BeautifulSoup(page_file.read(), "html.parser").find(id="vrtx-course-content")
+
+    assert get_prerequisites(content) == ([["IN1000", "IN1900"], "IN1150"], ["MAT1100", "MAT1001"])
+    assert get_prerequisites(None) == ([], [])
+    assert not prerequisiteParser.is_clean("<b>") and prerequisiteParser.is_clean("MAT1100")
@@ -0,0 +1,179 @@
+import threading
+import time
+
+import pytest
+
+from Fetcher import Fetcher
+from HttpCache import HttpCache
+from Checkpoint import Checkpoint
+from scrapeEachCourse import scrape_courses, fetch_pages, parse_pages
+from scrapeForCourses import get_course_pages, find_coursecodes
+
+class InterruptedFetcher(Fetcher):
+    """Fetcher that is interrupted, like with Ctrl-C, when it gets to a page."""
+
+    def __init__(self, interrupt_at, **kwargs):
+        super().__init__(**kwargs)
+        self.interrupt_at = interrupt_at
+
+    def get(self, url):
+        if self.interrupt_at in url:
+            raise KeyboardInterrupt
+        return super().get(url)
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_scrape_courses(fixture_server, workers, course_df):
+    """Test that pages are scraped, in the same order as the courses."""
+
+    base_url = f"http://127.0.0.1:{fixture_server.server_port}/studier/emner/"
+    fixture_server.failures["/studier/emner/matnat/math/IN2010/"] = 2
+    fetcher = Fetcher(workers=workers, retries=3, backoff=0)
+
+    obligatories, recommendeds, failed = scrape_courses(course_df, fetcher, base_url, progress=False)
+
+    assert obligatories[:4] == [[["MAT1100", "MAT-INF1100"], "IN1900"], [["IN1000", "IN1900"], "IN1150"], "", ""]
+    assert recommendeds[:4] == [[["MAT1120", "MAT1001"], "IN1000"], ["MAT1100", "MAT1001"], "", ""]
+    assert obligatories[4:] == obligatories[:4] * 4, "Results out of order"
+    assert failed == ["MISSING1000"] * 5, "Page not found not reported"
+    assert len(fixture_server.requests) == 22, "Failing page not retried"
+
+def test_scrape_courses_failing(fixture_server, course_df):
+    """Test that pages that keep failing are reported, and don't stop the rest."""
+
+    base_url = f"http://127.0.0.1:{fixture_server.server_port}/studier/emner/"
+    fixture_server.failures["/studier/emner/matnat/math/FIL1000/"] = 100
+    fetcher = Fetcher(workers=2, retries=1, backoff=0)
+
+    obligatories, _, failed = scrape_courses(course_df, fetcher, base_url, progress=False)
+
+    assert failed == ["FIL1000", "MISSING1000"] * 5
+    assert obligatories[2] == "" and obligatories[0] != ""
+
+    # Pages that fail, or are answered with 404, keep the prerequisites they had
+    previous = course_df.copy()
+    previous["obligatory"] = [["MAT1000"], "", ["IN1000"], ["IN1010"]] * 5
+    previous["recommended"] = [""] * 20
+    obligatories, recommendeds, failed = scrape_courses(previous, fetcher, base_url, progress=False)
+    assert failed == ["FIL1000", "MISSING1000"] * 5
+    assert obligatories[2] == ["IN1000"] and recommendeds[2] == ""
+    assert obligatories[3] == ["IN1010"], "Page not found erased the prerequisites"
+    assert obligatories[0] != ["MAT1000"]
+
+    fetcher = Fetcher(workers=2, retries=0, timeout=1)
+    _, _, failed = scrape_courses(course_df[:2], fetcher, "http://127.0.0.1:1/", progress=False)
+    assert failed == ["MAT1110", "IN2010"]
+
+def test_scrape_courses_cached(fixture_server, tmp_path, course_df):
+    """Test that unchanged pages are revalidated, and read from the cache."""
+
+    base_url = f"http://127.0.0.1:{fixture_server.server_port}/studier/emner/"
+    results = []
+    for run in range(2):
+        cache = HttpCache(str(tmp_path))
+        results.append(scrape_courses(course_df, Fetcher(cache=cache), base_url, progress=False))
+
+    assert results[0] == results[1]
+    assert (cache.hits, cache.misses, cache.revalidations) == (15, 5, 15)
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_fetch_then_parse(fixture_server, tmp_path, workers, course_df):
+    """Test that fetching pages and parsing them later gives the same as scraping them."""
+
+    base_url = f"http://127.0.0.1:{fixture_server.server_port}/studier/emner/"
+    expected = scrape_courses(course_df, Fetcher(), base_url, progress=False)
+    fixture_server.requests.clear()
+
+    failed = fetch_pages(course_df, str(tmp_path), Fetcher(workers=2), base_url, progress=False)
+    assert failed == ["MISSING1000"]
+    assert not (tmp_path / "matnat" / "math" / "MISSING1000.html").exists(), "Page not found saved"
+    assert len(fixture_server.requests) == 4, "Page fetched more than once"
+
+    obligatories, recommendeds, failed = parse_pages(course_df, str(tmp_path), workers, progress=False)
+    assert (obligatories, recommendeds, failed) == expected
+    assert len(fixture_server.requests) == 4, "Parsing used the network"
+
+    (tmp_path / "matnat" / "math" / "FIL1000.html").unlink()
+    _, _, failed = parse_pages(course_df, str(tmp_path), workers, progress=False)
+    assert failed == ["FIL1000", "MISSING1000"] * 5
+
+def test_scrape_resumed(fixture_server, tmp_path, course_df):
+    """Test that an interrupted scrape goes on where it stopped, with the same results."""
+
+    base_url = f"http://127.0.0.1:{fixture_server.server_port}/studier/emner/"
+    expected = scrape_courses(course_df, Fetcher(), base_url, progress=False)
+
+    # The first run only gets the first rows done before it is stopped
+    checkpoint = Checkpoint(str(tmp_path / "scrape.checkpoint"))
+    scrape_courses(course_df[:2], Fetcher(), base_url, progress=False, checkpoint=checkpoint)
+    checkpoint.close()
+    fixture_server.requests.clear()
+
+    checkpoint = Checkpoint(str(tmp_path / "scrape.checkpoint"))
+    resumed = scrape_courses(course_df, Fetcher(), base_url, progress=False, checkpoint=checkpoint)
+    assert resumed == expected
+    assert not any("MAT1110" in path or "IN2010" in path for path in fixture_server.requests)
+
+    # The fetch stage is interrupted partway, like with Ctrl-C, and closes the checkpoint like __main__
+    pages = tmp_path / "pages"
+    checkpoint = Checkpoint(str(tmp_path / "fetch.checkpoint"))
+    with pytest.raises(KeyboardInterrupt):
+        fetch_pages(course_df, str(pages), InterruptedFetcher("FIL1000", workers=2), base_url,
+                    progress=False, checkpoint=checkpoint)
+    checkpoint.close()
+    fixture_server.requests.clear()
+
+    checkpoint = Checkpoint(str(tmp_path / "fetch.checkpoint"))
+    done = len(checkpoint)
+    assert 0 < done < 4
+    failed = fetch_pages(course_df, str(pages), Fetcher(workers=2), base_url, progress=False, checkpoint=checkpoint)
+    assert failed == ["MISSING1000"]
+    assert len(fixture_server.requests) == 4 - done, "Page in checkpoint fetched again"
+    assert any("FIL1000" in path for path in fixture_server.requests)
+    assert parse_pages(course_df, str(pages), 1, progress=False) == expected
+
+def test_fetcher_map_interrupted():
+    """Test that an interrupted map cancels what isn't started, and waits for what is running."""
+
+    started, finished = [], []
+    slow_started = threading.Event()
+
+    def work(element):
+        started.append(element)
+        if element == "interrupt":
+            slow_started.wait(5)
+            raise KeyboardInterrupt
+        if element == "slow":
+            slow_started.set()
+            time.sleep(0.3)
+        else:
+            time.sleep(0.05)
+        finished.append(element)
+        return element
+
+    elements = ["fast", "interrupt", "slow"] + [f"later{i}" for i in range(20)]
+    with pytest.raises(KeyboardInterrupt):
+        for result in Fetcher(workers=2).map(work, elements):
+            pass
+
+    assert "slow" in finished, "Running call not waited for"
+    assert len(started) < len(elements), "Calls not started were not cancelled"
+    assert set(started) - {"interrupt"} == set(finished)
+
+@pytest.mark.parametrize("listing_pages", [0, 1, 2, 37, 64])
+def test_get_course_pages(fixture_server, listing_pages):
+    """Test that all listing pages are found with few probes, and fetched only once."""
+
+    fixture_server.listing_pages = listing_pages
+    base_url = f"http://127.0.0.1:{fixture_server.server_port}/studier/emner/alle/?page="
+
+    pages = get_course_pages(base_url, Fetcher(workers=4))
+
+    assert [url for url, _ in pages] == [base_url + str(i) for i in range(listing_pages)]
+    assert len(fixture_server.requests) == len(set(fixture_server.requests)), "Page fetched twice"
+    probes_without_results = len(fixture_server.requests) - listing_pages
+    assert probes_without_results <= max(1, 2 * listing_pages.bit_length())
+
+    for url, content in pages:
+        faculties, institutes, coursecodes, coursenames = find_coursecodes(url, content=content)
+        assert coursecodes == ["MAT1100", "MAT1110", "IN2010", "FIL1000", "MAT-INF1100"]
+        assert coursenames[0] == "Kalkulus"
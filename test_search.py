@@ -0,0 +1,204 @@
+import gc
+import json
+import subprocess
+import sys
+
+import pytest
+import pandas as pd
+
+import search
+from Catalog import Catalog, catalog
+from CourseGraph import CourseGraph
+from search import find_dependents, grow_roots, reachable_courses, read_courses, search_batch
+
+def scan_dependents(course, course_df):
+    """The plain scan through all rows that the dependents index replaces."""
+    dependents = []
+    for position in range(len(course_df.index)):
+        row = course_df.iloc[position]
+        flags = []
+        for column in ['obligatory', 'recommended']:
+            flags.append(any(course == element or (isinstance(element, list) and course in element)
+                             for element in row[column]))
+        if any(flags):
+            dependents.append((row['coursecode'], *flags))
+    return dependents
+
+@pytest.mark.parametrize("course", ["MAT1100", "IN1000", "R1", "ANT2210", "NOTACOURSE"])
+def test_find_dependents(course):
+    """Test that the index finds the same rows as scanning through all of them."""
+
+    found = [(row['coursecode'], obligatory, recommended)
+             for row, obligatory, recommended in find_dependents(course, catalog.df)]
+    assert found == scan_dependents(course, catalog.df)
+
+def test_find_dependents_other_dataframe():
+    """Test that dependents are found in dataframes that aren't the catalog."""
+
+    course_df = pd.DataFrame({
+        "coursecode": ["A1000", "B1000", "C1000"],
+        "coursename": ["A", "B", "C"],
+        "obligatory": ["", ["A1000"], [["A1000", "B1000"]]],
+        "recommended": ["", "", ["A1000"]],
+    })
+    found = [(row['coursecode'], obligatory, recommended)
+             for row, obligatory, recommended in find_dependents("A1000", course_df)]
+    assert found == [("B1000", True, False), ("C1000", True, True)]
+
+def test_grow_roots():
+    """Test that roots are collected through groups and loops, each only once."""
+
+    course_df = pd.DataFrame({
+        "coursecode": ["A1000", "B1000", "C1000", "D1000"],
+        "coursename": ["A", "B", "C", "D"],
+        "obligatory": [["D1000"], ["A1000"], [["A1000", "B1000"], "X1"], ["A1000", "D1000"]],
+        "recommended": ["", ["C1000"], "", ""],
+    })
+    obligatory, recommended, checked = grow_roots("C1000", [], course_df)
+    assert obligatory == [["A1000", "B1000"], "X1", "D1000", "A1000"]
+    assert recommended == ["C1000"]
+    assert checked == ["C1000", "A1000", "D1000", "B1000"]
+
+    assert grow_roots("X1", [], course_df) == ([], [], []), "Course not in data has roots"
+
+def test_reachable_courses():
+    """Test that the reachability index finds courses any number of steps away."""
+
+    course_df = pd.DataFrame({
+        "coursecode": ["A1000", "B1000", "C1000", "D1000", "E1000"],
+        "coursename": ["A", "B", "C", "D", "E"],
+        "obligatory": ["", ["A1000"], [["B1000", "X1"]], ["C1000", "E1000"], ["D1000"]],
+        "recommended": ["", "", "", "", ["A1000"]],
+    })
+    assert reachable_courses("A1000", course_df, "downstream") == \
+        [("B1000", True), ("C1000", True), ("D1000", True), ("E1000", True)]
+    assert reachable_courses("D1000", course_df, "upstream") == \
+        [("A1000", True), ("B1000", True), ("C1000", True), ("E1000", True), ("X1", True)]
+    assert reachable_courses("B1000", course_df, "upstream") == [("A1000", True)]
+    assert reachable_courses("C1000", course_df, "downstream") == [("D1000", True), ("E1000", True)]
+    assert reachable_courses("X2", course_df, "downstream") == []
+
+    # Indexes are kept with the dataframe, so a changed dataframe is a copy
+    course_df = course_df.copy()
+    course_df.at[4, "obligatory"] = ""
+    assert reachable_courses("A1000", course_df, "downstream")[-1] == ("E1000", False), \
+        "Recommended precursor counted as obligatory"
+
+def test_indexes_of_dataframe():
+    """Test that indexes and trees of a dataframe that isn't the catalog are made once, and dropped with it."""
+
+    course_df = pd.DataFrame({
+        "coursecode": ["A1000", "B1000"],
+        "coursename": ["A", "B"],
+        "obligatory": ["", ["A1000"]],
+        "recommended": ["", ""],
+    })
+    graph = search.indexed("graph", CourseGraph.from_dataframe, course_df)
+    assert search.indexed("graph", CourseGraph.from_dataframe, course_df) is graph
+    assert search.indexed("graph", CourseGraph.from_dataframe, course_df.copy()) is not graph
+    row = course_df.iloc[1]
+    assert search.requirement_tree(row, "obligatory", course_df) is search.requirement_tree(row, "obligatory", course_df)
+
+    key = id(course_df)
+    del course_df, row
+    gc.collect()
+    assert key not in search._dataframe_indexes, "Indexes kept after the dataframe is gone"
+
+@pytest.mark.parametrize("command", ["MAT1100", "MAT1110 -c -r", "IN1000 -f", "NOTACOURSE1000"])
+def test_search_from_catalog_file(command, capsys):
+    """Test that lookups answered from the catalog file are the same as from the dataframe."""
+
+    from_file = Catalog()
+    from_file.open()
+    outputs = []
+    for use_dataframe in [False, True]:
+        course_df = from_file.df if use_dataframe else None
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(search, "catalog", from_file)
+            search.run_command(command, course_df)
+        outputs.append(capsys.readouterr().out)
+        assert from_file.is_loaded == use_dataframe, "Dataframe made for lookup"
+
+    assert outputs[0] == outputs[1]
+    if command == "NOTACOURSE1000":
+        assert "Couldn't find a course" in outputs[0]
+    else:
+        assert "Søker etter emner" in outputs[0]
+
+def test_one_shot_without_pandas():
+    """Test that a command given as arguments is answered without importing pandas."""
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "search.py", "IN2010", "-c"],
+                            capture_output=True, text=True)
+    assert "TEK5010 - Multiagent-systemer (anbefalt)" in result.stdout
+    assert "CatalogFile" in result.stderr and "pandas" not in result.stderr
+
+def test_search_batch():
+    """Test that a JSON line is written for each course as soon as it is read."""
+
+    class Output(list):
+        write = list.append
+        def flush(self):
+            pass
+
+    output, written = Output(), []
+    def courses():
+        for course in read_courses(["MAT1100, IN1000", "NOTACOURSE1000"]):
+            yield course
+            assert len(output) == len(written) + 1, "Line not written before next course"
+            written.append(course)
+
+    assert search_batch(courses(), output=output) == 3
+    records = [json.loads(line) for line in output]
+    assert [record["coursecode"] for record in records] == ["MAT1100", "IN1000", "NOTACOURSE1000"]
+    assert records[0]["coursename"] == "Kalkulus" and records[0]["found"]
+    assert records[2] == {"coursecode": "NOTACOURSE1000", "found": False, "coursename": None, "dependents": []}
+
+    dependents = {dependent["coursecode"]: dependent for dependent in records[0]["dependents"]}
+    assert [(row["coursecode"], obligatory, recommended) for row, obligatory, recommended
+            in find_dependents("MAT1100", None)] == \
+           [(d["coursecode"], d["obligatory"], d["recommended"]) for d in records[0]["dependents"]]
+    assert dependents["FYS1120"]["residual"] == {"relationship": "and", "children": [
+        {"courses": ["FYS1120", "HMS0503", "HMS0505"], "quantity": 3}]}
+
+def test_requirement_trees_memoized(monkeypatch, capsys):
+    """Test that requirement trees are made once and shared, without being changed by queries."""
+
+    fresh = Catalog()
+    monkeypatch.setattr(search, "catalog", fresh)
+
+    first = [search.course_record(course) for course in ["MAT1100", "MAT1110", "IN1000"]]
+    search.run_command("MAT1100 -r")
+    printed = capsys.readouterr().out
+
+    cache = fresh.derived("requirement_trees", None)
+    misses = cache.misses
+    assert [search.course_record(course) for course in ["MAT1100", "MAT1110", "IN1000"]] == first
+    search.run_command("MAT1100 -r")
+    assert capsys.readouterr().out == printed
+    assert cache.misses == misses and cache.hits > 0
+
+    row = fresh.row(0)
+    assert search.requirement_tree(row, "obligatory") is search.requirement_tree(row, "obligatory")
+    assert search.requirement_tree(row, "obligatory", fresh.df) is not search.requirement_tree(row, "obligatory", fresh.df.copy())
+
+def test_search_names(capsys):
+    """Test the name search mode, and that a course code is still searched without it."""
+
+    search.run_command("lineær alg -n")
+    output = capsys.readouterr().out
+    assert "MAT1120 - Lineær algebra" in output and "Søker etter emner" not in output
+
+    search.run_command("-name xyzzy")
+    assert "Fant dessverre ingen emner" in capsys.readouterr().out
+
+def test_study_plan(capsys):
+    """Test that -plan prints the courses left to take, with the courses taken after the target."""
+
+    search.run_command("IN2010 -p in1000")
+    output = capsys.readouterr().out
+    assert "1. semester: IN1010\n" in output
+    assert "2. semester: IN2010\n" in output
+
+    search.run_command("IN1000 -plan IN1000")
+    assert "Du har allerede tatt IN1000" in capsys.readouterr().out
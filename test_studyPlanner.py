@@ -0,0 +1,104 @@
+import itertools
+
+import pytest
+import pandas as pd
+
+import search
+from CourseGraph import CourseGraph
+from studyPlanner import plan, requirement_groups
+
+def make_graph(requirements):
+    """CourseGraph of a dict from course code to its obligatory requirements, as a nested list."""
+    return CourseGraph.from_dataframe(pd.DataFrame({
+        "coursecode": list(requirements),
+        "obligatory": list(requirements.values()),
+        "recommended": [[] for _ in requirements],
+    }, dtype=object))
+
+def check_order(graph, semesters, taken):
+    """Asserts that every course in a plan can be taken when it is, or together with a loop."""
+    before = {graph.ids[code] for code in taken}
+    for semester in semesters:
+        ids = {graph.ids[code] for code in semester}
+        for course_id in ids:
+            assert all((before | ids).intersection(group) for group in requirement_groups(graph, course_id))
+        before |= ids
+
+def smallest_plan(graph, target, taken):
+    """Size of the smallest plan, found by trying every set of courses."""
+    others = [code for code in graph.codes if code != target and code not in taken]
+    for size in range(len(others) + 1):
+        for courses in itertools.combinations(others, size):
+            chosen = {graph.ids[code] for code in (target, *courses, *taken)}
+            if all(chosen.intersection(group) for course_id in chosen if graph.codes[course_id] not in taken
+                   for group in requirement_groups(graph, course_id)):
+                return size + 1
+
+def test_plan_alternatives():
+    """Test that the alternative needing the fewest courses is chosen, not the first one."""
+
+    graph = make_graph({
+        "T": [["A", "B"], "C"],
+        "A": ["X", "Y"],
+        "B": ["C"],
+        "C": [],
+    })
+    assert plan(graph, "T") == ([["C"], ["B"], ["T"]], True)
+    assert plan(graph, "T", ["X", "Y", "C"]) == ([["A"], ["T"]], True)
+    assert plan(graph, "T", ["T"]) == ([], True)
+
+    with pytest.raises(ValueError):
+        plan(graph, "NOTACOURSE")
+
+def test_plan_loops():
+    """Test that courses requiring each other are taken together, and courses requiring themselves alone."""
+
+    graph = make_graph({
+        "T": ["P"],
+        "P": ["Q", "P"],
+        "Q": ["P"],
+    })
+    assert plan(graph, "T") == ([["P", "Q"], ["T"]], True)
+
+def test_plan_smallest():
+    """Test that the plan is as small as when trying every set of courses."""
+
+    graph = make_graph({
+        "T": [["A", "B", "C"], ["D", "E"]],
+        "A": ["F", "G"],
+        "B": [["F", "H"], "D"],
+        "C": ["E", "I"],
+        "D": ["I"],
+        "E": [],
+        "F": [["I", "J"]],
+        "G": [],
+        "H": [],
+        "I": [],
+        "J": ["E"],
+    })
+    for taken in [(), ("I",), ("E",), ("F", "G")]:
+        semesters, optimal = plan(graph, "T", taken)
+        assert optimal
+        assert sum(len(semester) for semester in semesters) == smallest_plan(graph, "T", taken)
+        assert semesters[-1] == ["T"]
+        check_order(graph, semesters, taken)
+
+@pytest.mark.parametrize("course", ["IN2010", "MAT2400", "FARM5110"])
+def test_plan_catalog(course):
+    """Test that plans on the course data are ordered, and done within the time limit."""
+
+    graph = search.indexed('graph', CourseGraph.from_dataframe, None)
+    semesters, optimal = plan(graph, course, ["MAT1100"])
+    assert optimal
+    assert semesters[-1] == [course]
+    check_order(graph, semesters, ["MAT1100"])
+
+def test_plan_deep():
+    """Test that a very long chain of precursors is planned without recursion."""
+
+    length = 1200
+    graph = make_graph({f"C{i}": [f"C{i + 1}", [f"C{i + 1}", f"D{i}"]] if i < length - 1 else []
+                        for i in range(length)})
+    semesters, optimal = plan(graph, "C0", time_limit=10)
+    assert optimal
+    assert semesters == [[f"C{i}"] for i in reversed(range(length))]